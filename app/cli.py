@@ -0,0 +1,75 @@
+"""Command line tools, run with `python -m app.cli`."""
+import argparse
+import asyncio
+import logging
+import sys
+
+from collections.abc import AsyncIterator
+from pathlib import Path
+
+import aiofiles
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .internal.database import database
+from .internal.importer import VaultImporter, DEFAULT_BATCH_SIZE
+from .models.dbtables import Users
+from .models.vault import ImportFormat, ImportReport
+
+READ_CHUNK_SIZE: int = 1024 * 1024  # 1 MiB
+
+
+async def _read_file(path: Path) -> AsyncIterator[bytes]:
+    async with aiofiles.open(path, 'rb') as file:
+        while chunk := await file.read(READ_CHUNK_SIZE):
+            yield chunk
+
+
+async def import_vault(args: argparse.Namespace) -> int:
+    import_format: ImportFormat = args.format or (
+        ImportFormat.csv if args.file.suffix.lower() == '.csv' else ImportFormat.ndjson
+    )
+
+    await database.setup()
+    try:
+        async with AsyncSession(database.async_engine) as session:
+            user: Users | None = await database.get_user(session, args.username)
+            if not user:
+                print(f"User '{args.username}' does not exist", file=sys.stderr)
+                return 1
+
+            importer = VaultImporter(session, user.user_id, batch_size=args.batch_size)
+            try:
+                report: ImportReport = await importer.run(_read_file(args.file), import_format)
+            except ValueError as exc:
+                print(f"Could not import '{args.file}': {exc}", file=sys.stderr)
+                return 1
+    finally:
+        await database.close()
+
+    print(report.model_dump_json(indent=4))
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog='python -m app.cli')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import', help='Import a CSV file or NDJSON export into a vault')
+    import_parser.add_argument('file', type=Path)
+    import_parser.add_argument('--username', required=True, help='Owner of the imported entries')
+    import_parser.add_argument(
+        '--format', type=ImportFormat, choices=list(ImportFormat),
+        help='Input format, guessed from the file extension by default'
+    )
+    import_parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    match args.command:
+        case 'import':
+            return asyncio.run(import_vault(args))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,14 +1,16 @@
 import logging
+import math
 
 from functools import lru_cache
 from typing import Annotated
 import uuid
 
-from fastapi import Depends, HTTPException, status, Path
+from fastapi import Depends, HTTPException, status, Path, Request, Response
 from fastapi.security import OAuth2PasswordBearer
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from .models.common import UserInfo
+from .internal.cache import STICKY_COOKIE, StickyClients
 from .internal.database import async_engine, database
 
 
@@ -19,7 +21,47 @@ InvalidCredentialsExc = HTTPException(
     headers={"WWW-Authenticate": "Bearer"},
 )
 
-async def get_session():
+# Requests with these methods never write, so they skip the SQLite writer queue
+READ_ONLY_METHODS: frozenset[str] = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+
+async def get_session(request: Request, response: Response):
+    # The bearer token identifies the client for read-your-writes on replicas
+    client_key: str | None = request.headers.get('Authorization')
+    if request.method in READ_ONLY_METHODS:
+        engine = database.read_engine(client_key, request.cookies.get(STICKY_COOKIE))
+        async with AsyncSession(engine) as session:
+            yield session
+
+        return
+
+    if client_key:
+        database.sticky_clients.mark(client_key)
+
+    # Reaches the other workers, the window counts from the start of the request here
+    sticky_clients: StickyClients = database.sticky_clients
+    if database.replica_engines and sticky_clients.window > 0:
+        response.set_cookie(
+            STICKY_COOKIE, f'{sticky_clients.cookie_deadline():.3f}',
+            max_age=math.ceil(sticky_clients.window), path='/api',
+            httponly=True, samesite='strict'
+        )
+
+    async with AsyncSession(async_engine) as session:
+        async with database.writer():
+            yield session
+
+    # Marked again so the window counts from the commit, not the start of a slow write
+    if client_key:
+        database.sticky_clients.mark(client_key)
+
+
+async def get_unqueued_session():
+    """Session that leaves `database.writer()` to the endpoint.
+
+    For endpoints doing slow work before a short write, so they don't hold up
+    other writers meanwhile.
+    """
     async with AsyncSession(async_engine) as session:
         yield session
 
@@ -30,14 +72,27 @@ def get_logger():
 
 
 async def get_current_user(session: 'SessionDep', token: str = Depends(oauth2_scheme)) -> UserInfo:
+    return await _authenticate(session, token)
+
+
+async def get_unqueued_user(session: 'UnqueuedSessionDep', token: str = Depends(oauth2_scheme)) -> UserInfo:
+    """Same as `get_current_user`, for endpoints that use `UnqueuedSessionDep`."""
+    return await _authenticate(session, token)
+
+
+async def _authenticate(session: AsyncSession, token: str) -> UserInfo:
     if not token:
         raise InvalidCredentialsExc
 
-    session_valid: bool = await database.sessions.check_session_validity(session, token)
-    if not session_valid:
+    user_info: UserInfo | None = await database.sessions.get_valid_token_info(session, token)
+    if not user_info and database.is_replica(session):
+        # A token created moments ago may not have reached the replica yet
+        async with AsyncSession(async_engine) as primary_session:
+            user_info = await database.sessions.get_valid_token_info(primary_session, token)
+
+    if not user_info:
         raise InvalidCredentialsExc
 
-    user_info: UserInfo = await database.sessions.get_token_info(session, token)
     return user_info
 
 
@@ -46,7 +101,7 @@ async def check_group_is_valid(
     group_id: Annotated[uuid.UUID, Path()]
 ) -> str:
     group_exists: bool = await database.groups.check_group_exists(
-        session, user.username, group_id
+        session, user.user_id, group_id
     )
     if not group_exists:
         raise HTTPException(status_code=400, detail="Provided group_id is invalid")
@@ -54,9 +109,35 @@ async def check_group_is_valid(
     return group_id
 
 
+async def check_etag(
+    request: Request, response: Response,
+    session: 'SessionDep', user: 'UserAuthDep'
+) -> str:
+    """Handles conditional GETs with an ETag derived from the user's sync revision.
+
+    Any change to the user's groups or entries bumps the revision, so a matching
+    `If-None-Match` is answered with 304 before the endpoint loads anything.
+    """
+    revision: int = await database.sync.get_revision(session, user.user_id)
+    etag: str = f'"{user.user_id.hex}-{revision}"'
+
+    if_none_match: str | None = request.headers.get('if-none-match')
+    if if_none_match:
+        client_etags: set[str] = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+        if etag in client_etags or '*' in client_etags:
+            raise HTTPException(status_code=304, headers={'ETag': etag})
+
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return etag
+
+
 UserAuthDep = Annotated[UserInfo, Depends(get_current_user)]
+UnqueuedUserAuthDep = Annotated[UserInfo, Depends(get_unqueued_user)]
+ETagDep = Annotated[str, Depends(check_etag)]
 
 LoggerDep = Annotated[logging.Logger, Depends(get_logger)]
 SessionDep = Annotated[AsyncSession, Depends(get_session)]
+UnqueuedSessionDep = Annotated[AsyncSession, Depends(get_unqueued_session)]
 
 CheckGroupValidDep = Annotated[uuid.UUID, Depends(check_group_is_valid)]
@@ -0,0 +1,124 @@
+import time
+
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from ..models.common import UserInfo
+
+# Carries a client's sticky deadline to every worker, as a Unix timestamp
+STICKY_COOKIE: str = 'pm_primary_until'
+
+
+class SessionCache:
+    """Bounded LRU cache of session tokens to their `UserInfo`.
+
+    A cached token is served until the earlier of the cache TTL and the
+    session's own `expiry_date`. The cache lives in the worker process, so
+    a revocation done by another worker is only seen once the TTL runs out.
+    """
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size: int = max_size
+        self.ttl: float = ttl
+
+        self._entries: OrderedDict[str, tuple[UserInfo, float]] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> UserInfo | None:
+        cached: tuple[UserInfo, float] | None = self._entries.get(token)
+        if not cached:
+            self.misses += 1
+            return None
+
+        user_info, valid_until = cached
+        if time.monotonic() >= valid_until:
+            del self._entries[token]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return user_info
+
+    def set(self, token: str, user_info: UserInfo, expiry_date: datetime) -> None:
+        if self.max_size <= 0:
+            return
+
+        remaining: float = (expiry_date - datetime.now(timezone.utc)).total_seconds()
+        lifetime: float = min(self.ttl, remaining)
+        if lifetime <= 0:
+            return
+
+        self._entries[token] = (user_info, time.monotonic() + lifetime)
+        self._entries.move_to_end(token)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, token: str) -> None:
+        self._entries.pop(token, None)
+
+    def invalidate_user(self, username: str) -> None:
+        tokens: list[str] = [
+            token for token, (user_info, _) in self._entries.items()
+            if user_info.username == username
+        ]
+        for token in tokens:
+            del self._entries[token]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class StickyClients:
+    """Remembers clients that wrote recently, so their reads can avoid lagging replicas.
+
+    Bounded like `SessionCache`, the least recently marked client is forgotten first.
+    The map only covers this worker, so writes also hand the client a `STICKY_COOKIE`
+    deadline that any worker honors.
+    """
+    def __init__(self, window: float, max_size: int):
+        self.window: float = window
+        self.max_size: int = max_size
+
+        self._deadlines: OrderedDict[str, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def mark(self, client_key: str) -> None:
+        if self.window <= 0 or self.max_size <= 0:
+            return
+
+        self._deadlines[client_key] = time.monotonic() + self.window
+        self._deadlines.move_to_end(client_key)
+
+        while len(self._deadlines) > self.max_size:
+            self._deadlines.popitem(last=False)
+
+    def cookie_deadline(self) -> float:
+        return time.time() + self.window
+
+    def cookie_is_sticky(self, cookie: str | None) -> bool:
+        """Checks a `STICKY_COOKIE` value, ignoring deadlines further away than a write sets."""
+        try:
+            deadline: float = float(cookie)
+        except (TypeError, ValueError):
+            return False
+
+        now: float = time.time()
+        return now < deadline <= now + self.window
+
+    def is_sticky(self, client_key: str) -> bool:
+        deadline: float | None = self._deadlines.get(client_key)
+        if deadline is None:
+            return False
+
+        if time.monotonic() >= deadline:
+            del self._deadlines[client_key]
+            return False
+
+        return True
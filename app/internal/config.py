@@ -1,6 +1,8 @@
 import warnings
 import logging.config
+import logging.handlers
 import json
+import queue
 
 import aiofiles
 
@@ -11,6 +13,14 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, computed_field, PostgresDsn, DirectoryPath, model_validator
 from pydantic_core import MultiHostUrl
 
+from .crypto import decode_master_key
+from .logs import DroppingQueueHandler, JSONFormatter
+from .metrics import metrics
+
+
+# 'helloworld' repeated to 32 bytes, only allowed with ENVIRONMENT=local like the other defaults
+DEFAULT_ENTRY_MASTER_KEY: str = 'aGVsbG93b3JsZGhlbGxvd29ybGRoZWxsb3dvcmxkaGU='
+
 
 class AppSettings(BaseSettings):
     model_config = SettingsConfigDict(
@@ -24,6 +34,11 @@ class AppSettings(BaseSettings):
     )
     ENVIRONMENT: Literal['local', 'dev', 'prod'] = 'local'
 
+    # 'sqlite' stores the database in DATA_DIRECTORY, for single-node and offline installs
+    DATABASE_BACKEND: Literal['postgres', 'sqlite'] = 'postgres'
+    SQLITE_FILENAME: str = 'password_manager.db'
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+
     POSTGRES_HOST: str = "127.0.0.1"
     POSTGRES_PORT: int = 5432
     POSTGRES_USER: str = "password_manager"
@@ -32,7 +47,10 @@ class AppSettings(BaseSettings):
 
     @computed_field  # type: ignore[prop-decorator]
     @property
-    def SQLALCHEMY_DATABASE_URI(self) -> PostgresDsn:
+    def SQLALCHEMY_DATABASE_URI(self) -> PostgresDsn | str:
+        if self.DATABASE_BACKEND == 'sqlite':
+            return f"sqlite+aiosqlite:///{self.DATA_DIRECTORY / self.SQLITE_FILENAME}"
+
         return MultiHostUrl.build(
             scheme="postgresql+asyncpg",
             username=self.POSTGRES_USER,
@@ -41,13 +59,84 @@ class AppSettings(BaseSettings):
             port=self.POSTGRES_PORT,
             path=self.POSTGRES_DB,
         )
+
+    # Read replicas as "host" or "host:port", using the primary's credentials and database.
+    # GET requests go to a replica, except from clients that wrote in the last few seconds.
+    # Each worker remembers its own writers, other workers only know through a cookie, so
+    # clients that drop cookies can read stale data when their next request hits another worker
+    POSTGRES_REPLICA_HOSTS: list[str] = []
+    REPLICA_STICKY_SECONDS: float = 5.0
+    REPLICA_STICKY_MAX_CLIENTS: int = 100_000
+
+    @property
+    def SQLALCHEMY_REPLICA_URIS(self) -> list[str]:
+        if self.DATABASE_BACKEND != 'postgres':
+            return []
+
+        replica_uris: list[str] = []
+        for replica_host in self.POSTGRES_REPLICA_HOSTS:
+            host, _, port = replica_host.partition(':')
+            replica_uris.append(str(MultiHostUrl.build(
+                scheme="postgresql+asyncpg",
+                username=self.POSTGRES_USER,
+                password=self.POSTGRES_PASSWORD,
+                host=host,
+                port=int(port) if port else self.POSTGRES_PORT,
+                path=self.POSTGRES_DB,
+            )))
+
+        return replica_uris
     
     FIRST_USER_NAME: str = 'admin'
     FIRST_USER_PASSWORD: str = 'helloworld'
 
-    def _check_value_default(self, key_name: str, value: str):
-        if value == 'helloworld':
-            msg = (f"The value of '{key_name}' is the default 'helloworld', "
+    # Per-worker cache of session token lookups, a TTL of 0 disables it. Revoking a token
+    # only clears the cache of the worker handling it, the others keep it for up to the TTL
+    SESSION_CACHE_MAX_SIZE: int = 10_000
+    SESSION_CACHE_TTL: float = 3.0
+
+    # Dedicated argon2 process pool, logins get a 503 once the queue is full
+    HASH_POOL_WORKERS: int = 2
+    HASH_POOL_MAX_QUEUE: int = 32
+    HASH_POOL_RETRY_AFTER: int = 1
+
+    # Token buckets checked before a login spends any time on argon2
+    LOGIN_RATE_LIMIT_ENABLED: bool = True
+    LOGIN_IP_BURST: int = 20
+    LOGIN_IP_PER_MINUTE: float = 60
+    LOGIN_USERNAME_BURST: int = 5
+    LOGIN_USERNAME_PER_MINUTE: float = 10
+    LOGIN_LIMITER_MAX_KEYS: int = 100_000
+
+    # Background deletion of expired sessions, an interval of 0 disables it
+    SESSION_REAPER_INTERVAL: float = 3600
+    SESSION_REAPER_BATCH_SIZE: int = 1000
+
+    # Deleting a subtree with at least this many groups and entries returns 202 and is purged in batches
+    GROUP_DELETE_ASYNC_THRESHOLD: int = 5000
+    GROUP_DELETE_BATCH_SIZE: int = 1000
+    GROUP_PURGER_INTERVAL: float = 60
+
+    # Wraps the per-user keys that encrypt entries, changing it makes existing entries unreadable.
+    # 32 random bytes encoded as base64, generate one with `openssl rand -base64 32`
+    ENTRY_MASTER_KEY: str = DEFAULT_ENTRY_MASTER_KEY
+    ENTRY_KEY_CACHE_SIZE: int = 10_000
+
+    # Prometheus metrics at /metrics, unauthenticated so keep it off the public network
+    METRICS_ENABLED: bool = True
+
+    # Requests running more queries than this are logged, 0 disables the check
+    QUERY_BUDGET: int = 20
+
+    # Log records are written by a background thread, a full queue drops records instead of blocking
+    LOG_QUEUE_ENABLED: bool = True
+    LOG_QUEUE_SIZE: int = 10_000
+    LOG_QUEUE_SAMPLE_RATE: int = 10  # Keep every Nth INFO record once the queue is half full
+    LOG_FORMAT: Literal['text', 'json'] = 'text'
+
+    def _check_value_default(self, key_name: str, value: str, default: str = 'helloworld'):
+        if value == default:
+            msg = (f"The value of '{key_name}' is the default '{default}', "
                     "changing it to a different value is recommended.")
 
             if self.ENVIRONMENT == 'local':
@@ -57,8 +146,12 @@ class AppSettings(BaseSettings):
 
     @model_validator(mode="after")
     def _check_values_okay(self) -> Self:
-        self._check_value_default('POSTGRES_PASSWORD', self.POSTGRES_PASSWORD)
+        if self.DATABASE_BACKEND == 'postgres':
+            self._check_value_default('POSTGRES_PASSWORD', self.POSTGRES_PASSWORD)
+
         self._check_value_default('FIRST_USER_PASSWORD', self.FIRST_USER_PASSWORD)
+        self._check_value_default('ENTRY_MASTER_KEY', self.ENTRY_MASTER_KEY, DEFAULT_ENTRY_MASTER_KEY)
+        decode_master_key(self.ENTRY_MASTER_KEY)
 
         return self
 
@@ -67,6 +160,9 @@ class LogConfigManager:
     def __init__(self):
         self.log_config: Path = (settings.DATA_DIRECTORY / 'log.json').resolve()
         self.log_file: Path = (settings.DATA_DIRECTORY / 'app.log').resolve()
+
+        self.queue_handler: DroppingQueueHandler | None = None
+        self._listener: logging.handlers.QueueListener | None = None
     
     def make_logging_config(self):
         return {
@@ -120,8 +216,49 @@ class LogConfigManager:
             async with aiofiles.open(self.log_config, 'r') as file:
                 log_config = json.loads(await file.read())
 
+        self.stop_logging()
         logging.config.dictConfig(log_config)
 
+        logger: logging.Logger = logging.getLogger("password_manager")
+        if settings.LOG_FORMAT == 'json':
+            for handler in logger.handlers:
+                handler.setFormatter(JSONFormatter())
+
+        if settings.LOG_QUEUE_ENABLED:
+            self._start_queue(logger)
+
+    def _start_queue(self, logger: logging.Logger) -> None:
+        """Moves the handlers from `log.json` behind a queue served by a background thread."""
+        handlers: list[logging.Handler] = logger.handlers[:]
+        log_queue: queue.Queue = queue.Queue(settings.LOG_QUEUE_SIZE)
+
+        self.queue_handler = DroppingQueueHandler(log_queue, settings.LOG_QUEUE_SAMPLE_RATE)
+        self._listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+
+        logger.handlers = [self.queue_handler]
+        self._listener.start()
+
+    def stop_logging(self) -> None:
+        """Writes out the queued records and stops the listener thread."""
+        if not self._listener:
+            return
+
+        self._listener.stop()
+
+        # Anything logged after shutdown is written directly again
+        logger: logging.Logger = logging.getLogger("password_manager")
+        logger.handlers = list(self._listener.handlers)
+
+        if self.queue_handler.dropped:
+            logger.warning("Dropped %d log records while the log queue was busy", self.queue_handler.dropped)
+
+        self.queue_handler = None
+        self._listener = None
+
+    def collect_metrics(self) -> None:
+        if self.queue_handler:
+            metrics.log_records_dropped.set(self.queue_handler.dropped)
+
 
 settings = AppSettings()
 log_conf = LogConfigManager()
@@ -0,0 +1,132 @@
+import base64
+import binascii
+import os
+import uuid
+
+from collections import OrderedDict
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+
+CIPHERTEXT_PREFIX: str = 'v1:'
+NONCE_SIZE: int = 12
+MASTER_KEY_SIZE: int = 32
+
+# Entry columns stored encrypted, `entry_name` stays plaintext since pages are ordered by it
+ENCRYPTED_ENTRY_FIELDS: tuple[str, ...] = ('entry_username', 'entry_password', 'entry_url')
+_FIELD_AAD: tuple[tuple[str, bytes], ...] = tuple((field, field.encode()) for field in ENCRYPTED_ENTRY_FIELDS)
+
+
+def decode_master_key(encoded: str) -> bytes:
+    """Decodes the `ENTRY_MASTER_KEY` setting, a random 256-bit key encoded as base64.
+
+    The key is used as is, since a passphrase would only protect the data keys as well as
+    its own entropy does.
+    """
+    try:
+        master_key: bytes = base64.b64decode(encoded, validate=True)
+    except binascii.Error as exc:
+        raise ValueError("ENTRY_MASTER_KEY is not valid base64") from exc
+
+    if len(master_key) != MASTER_KEY_SIZE:
+        raise ValueError(
+            f"ENTRY_MASTER_KEY must be {MASTER_KEY_SIZE} random bytes encoded as base64, "
+            "generate one with `openssl rand -base64 32`"
+        )
+
+    return master_key
+
+
+class EntryCipher:
+    """Envelope encryption of password entry fields.
+
+    Each user has a random AES-256 data key, stored wrapped by the master key in
+    `Users.wrapped_data_key`. Fields are encrypted with AES-GCM using the entry ID
+    and field name as associated data, so a ciphertext cannot be moved to another
+    entry or column. Unwrapped keys are kept in a bounded LRU so the database is
+    only asked for a user's key once.
+
+    Rows carry the stored `encrypted` flag, rows written before encryption was
+    added are returned as is until they are re-encrypted.
+    """
+    def __init__(self, master_key: bytes, cache_size: int):
+        self._master: AESGCM = AESGCM(master_key)
+        self.cache_size: int = cache_size
+
+        self._keys: OrderedDict[uuid.UUID, AESGCM] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def new_data_key(self, user_id: uuid.UUID) -> tuple[AESGCM, str]:
+        """Returns a fresh data key for the user and its wrapped form to store."""
+        data_key: bytes = AESGCM.generate_key(bit_length=256)
+        nonce: bytes = os.urandom(NONCE_SIZE)
+
+        wrapped: bytes = nonce + self._master.encrypt(nonce, data_key, user_id.bytes)
+        return AESGCM(data_key), base64.b64encode(wrapped).decode('ascii')
+
+    def unwrap_data_key(self, user_id: uuid.UUID, wrapped_key: str) -> AESGCM:
+        wrapped: bytes = base64.b64decode(wrapped_key)
+        data_key: bytes = self._master.decrypt(wrapped[:NONCE_SIZE], wrapped[NONCE_SIZE:], user_id.bytes)
+
+        return AESGCM(data_key)
+
+    def get_cached_key(self, user_id: uuid.UUID) -> AESGCM | None:
+        data_key: AESGCM | None = self._keys.get(user_id)
+        if not data_key:
+            self.misses += 1
+            return None
+
+        self._keys.move_to_end(user_id)
+        self.hits += 1
+        return data_key
+
+    def cache_key(self, user_id: uuid.UUID, data_key: AESGCM) -> None:
+        if self.cache_size <= 0:
+            return
+
+        self._keys[user_id] = data_key
+        self._keys.move_to_end(user_id)
+
+        while len(self._keys) > self.cache_size:
+            self._keys.popitem(last=False)
+
+    def forget_key(self, user_id: uuid.UUID) -> None:
+        self._keys.pop(user_id, None)
+
+    def encrypt_rows(self, data_key: AESGCM, rows: list[dict]) -> list[dict]:
+        """Encrypts the `ENCRYPTED_ENTRY_FIELDS` of each row dict in place and sets `encrypted`."""
+        encrypt = data_key.encrypt
+        for row in rows:
+            entry_id: bytes = row['entry_id'].bytes
+            for field, field_aad in _FIELD_AAD:
+                nonce: bytes = os.urandom(NONCE_SIZE)
+                ciphertext: bytes = encrypt(nonce, row[field].encode('utf-8'), entry_id + field_aad)
+                row[field] = CIPHERTEXT_PREFIX + binascii.b2a_base64(nonce + ciphertext, newline=False).decode('ascii')
+
+            row['encrypted'] = True
+
+        return rows
+
+    def decrypt_rows(self, data_key: AESGCM, rows: list[dict]) -> list[dict]:
+        """Decrypts the `ENCRYPTED_ENTRY_FIELDS` of each row dict in place.
+
+        The `encrypted` flag of each row decides if it is decrypted and is removed
+        from the dict, so the rows can be returned as they are.
+        """
+        decrypt = data_key.decrypt
+        prefix_length: int = len(CIPHERTEXT_PREFIX)
+
+        for row in rows:
+            if not row.pop('encrypted'):
+                continue
+
+            entry_id: bytes = row['entry_id'].bytes
+            for field, field_aad in _FIELD_AAD:
+                raw: bytes = binascii.a2b_base64(row[field][prefix_length:])
+                row[field] = decrypt(raw[:NONCE_SIZE], raw[NONCE_SIZE:], entry_id + field_aad).decode('utf-8')
+
+        return rows
@@ -1,40 +1,147 @@
 import asyncio
+import contextlib
+import itertools
 import typing
 import logging
+import time
+
+from collections import Counter
+from collections.abc import AsyncIterator, Iterator
 
 import secrets
 
 from datetime import datetime, timezone
 import uuid
 
-from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy import Integer, case, event, false, inspect, literal, literal_column, tuple_, insert, update, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased, raiseload, selectinload
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.ext.asyncio import create_async_engine
 
-from sqlmodel import select, SQLModel, true
+from sqlmodel import select, SQLModel, true, func
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from .cache import SessionCache, StickyClients
 from .config import settings
-
-from ..models.dbtables import Users, UserSessions, PasswordGroups, PasswordEntry
+from .crypto import EntryCipher, decode_master_key
+from .hashing import PasswordHasher
+from .metrics import metrics, InstrumentedQueuePool
+from .migrations import COUNT_COLUMNS, create_schema
+from .querystats import install_query_hooks
+from .pagination import InvalidCursorError, encode_cursor, decode_cursor
+
+from ..models.dbtables import (
+    Users, UserSessions, PasswordGroups, GroupClosure, 
+    GroupDeleteJobs, PasswordEntry, SyncTombstones
+)
 from ..models.common import UserInfo
-from ..models.pwdcontext import pwd_context
 
-from ..models.entries import EntryPublicGet
-from ..models.groups import GroupPublicGet, GroupPublicChildren, GroupPublicModify
+from ..models.entries import (
+    EntryPublicGet, EntryPage, BulkEntryOperation, BulkEntryResult,
+    BulkEntryCreate, BulkEntryUpdate, BulkEntryDelete
+)
+from ..models.groups import (
+    GroupPublic, GroupPublicGet, GroupPublicChildren, 
+    GroupPublicModify, GroupTreeNode, GroupDeleteJob
+)
+from ..models.sync import SyncPage, SyncGroup, SyncEntry, SyncTombstone
 
 if typing.TYPE_CHECKING:
-    from sqlalchemy.ext.asyncio import AsyncEngine
+    from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+    from sqlmodel.sql.expression import SelectOfScalar
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 
 
 logger: logging.Logger = logging.getLogger("password_manager")
-async_engine: 'AsyncEngine' = create_async_engine(
-    str(settings.SQLALCHEMY_DATABASE_URI),
-    poolclass=AsyncAdaptedQueuePool,
-    echo=False
+
+# Applied to every SQLite connection, WAL lets readers run alongside the single writer
+SQLITE_PRAGMAS: tuple[str, ...] = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA foreign_keys=ON',
+    f'PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}',
+    'PRAGMA cache_size=-65536',  # 64 MiB
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA mmap_size=268435456'  # 256 MiB
 )
 
 
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+
+    cursor.close()
+
+
+def create_engine(database_uri: str) -> 'AsyncEngine':
+    """Creates the async engine for a Postgres or SQLite database URI."""
+    engine: 'AsyncEngine' = create_async_engine(
+        database_uri,
+        poolclass=InstrumentedQueuePool,
+        echo=False
+    )
+    if engine.dialect.name == 'sqlite':
+        event.listen(engine.sync_engine, 'connect', _set_sqlite_pragmas)
+
+    return engine
+
+
+async_engine: 'AsyncEngine' = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+replica_engines: list['AsyncEngine'] = [create_engine(uri) for uri in settings.SQLALCHEMY_REPLICA_URIS]
+
+
 DEFAULT_CHUNK_SIZE: int = 25 * 1024 * 1024  # 25 MiB
+MAX_GROUP_TREE_DEPTH: int = 100
+
+# Smaller batches are encrypted or decrypted inline, a thread hop costs more than they do
+CRYPTO_THREAD_MIN_ROWS: int = 32
+
+# Postgres advisory lock held by the worker creating the schema and first user on startup
+STARTUP_LOCK_KEY: int = 0x504D5F5354415254  # 'PM_START'
+
+# Column order of the rows passed to `PasswordEntryMethods.insert_entry_rows()`,
+# the revision and encrypted columns are filled in by the method itself
+ENTRY_COPY_COLUMNS: tuple[str, ...] = (
+    'entry_id', 'group_id', 'entry_name',
+    'entry_username', 'entry_password', 'entry_url',
+    'revision', 'encrypted'
+)
+
+# Loader profiles, so each endpoint only loads the rows it returns
+GROUP_LISTING_LOAD = (
+    # Children of a listed group are always owned by the same user, unless queued for deletion
+    selectinload(PasswordGroups.child_groups.and_(PasswordGroups.user_id.is_not(None))),
+    raiseload('*')
+)
+ENTRY_PAGE_LOAD = (raiseload('*'),)
+
+
+class GroupTooDeepError(ValueError):
+    """Raised when a group would end up more than `MAX_GROUP_TREE_DEPTH` levels below Root."""
+
+
+@contextlib.contextmanager
+def _timed(timings: dict[str, float], phase: str) -> Iterator[None]:
+    started: float = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] = (time.perf_counter() - started) * 1000
+
+
+def _group_counts(group: PasswordGroups) -> dict[str, int]:
+    return {
+        'entry_count': group.entry_count,
+        'child_count': group.child_count,
+        'subtree_entry_count': group.subtree_entry_count
+    }
+
+
+def _subtree_ids(group_id: uuid.UUID) -> 'SelectOfScalar[uuid.UUID]':
+    """Subquery of the IDs of `group_id` and all of its descendants."""
+    return select(GroupClosure.descendant_id).where(GroupClosure.ancestor_id == group_id)
 
 
 class MainDatabase:
@@ -42,9 +149,27 @@ class MainDatabase:
     
     `override_engine()` is available for tests or to allow changing
     the database engine before calling `async setup()`.
+
+    Replica engines only serve read-only requests, picked by `read_engine()`.
     """
-    def __init__(self, async_engine: 'AsyncEngine'):
+    def __init__(self, async_engine: 'AsyncEngine', replica_engines: list['AsyncEngine'] | None = None):
         self.async_engine: 'AsyncEngine' = async_engine
+        self.replica_engines: list['AsyncEngine'] = replica_engines or []
+
+        self._replica_cycle: Iterator['AsyncEngine'] = itertools.cycle(self.replica_engines)
+        self.sticky_clients: StickyClients = StickyClients(
+            settings.REPLICA_STICKY_SECONDS,
+            settings.REPLICA_STICKY_MAX_CLIENTS
+        )
+        self.hasher: PasswordHasher = PasswordHasher(
+            settings.HASH_POOL_WORKERS,
+            settings.HASH_POOL_MAX_QUEUE
+        )
+        self.cipher: EntryCipher = EntryCipher(
+            decode_master_key(settings.ENTRY_MASTER_KEY),
+            settings.ENTRY_KEY_CACHE_SIZE
+        )
+        self._write_lock: asyncio.Lock = asyncio.Lock()
     
     def override_engine(self, async_engine: 'AsyncEngine'):
         self.async_engine: 'AsyncEngine' = async_engine
@@ -52,22 +177,86 @@ class MainDatabase:
     async def setup(self):
         """Sets up the database and runs first-run checks.
         
-        This must be called first before using the child methods.
+        This must be called first before using the child methods. On Postgres only the
+        worker that gets `STARTUP_LOCK_KEY` creates the schema and first user, workers
+        starting alongside it wait for it to finish and only check the schema.
         """
-        # Let Alembic handle creating the schema
-        async with self.async_engine.begin() as conn:
-            # await conn.run_sync(SQLModel.metadata.drop_all)
-            await conn.run_sync(SQLModel.metadata.create_all)
+        started: float = time.perf_counter()
+        timings: dict[str, float] = {}
+
+        install_query_hooks(self.async_engine)
+        for replica_engine in self.replica_engines:
+            install_query_hooks(replica_engine)
+
+        self.hasher.start()
 
         self.users = UserMethods(self)
         self.sessions = SessionMethods(self)
 
         self.groups = PasswordGroupMethods(self)
         self.entries = PasswordEntryMethods(self)
-        
+        self.vault = VaultMethods(self)
+        self.sync = SyncMethods(self)
+
+        leader: bool = True
+        if self.async_engine.dialect.name != 'postgresql':
+            await self._bootstrap(timings)
+        else:
+            async with self.async_engine.connect() as lock_conn:
+                leader = await lock_conn.scalar(select(func.pg_try_advisory_lock(STARTUP_LOCK_KEY)))
+                try:
+                    if leader:
+                        await self._bootstrap(timings)
+                    else:
+                        # Shared, so waiting workers don't queue behind each other
+                        with _timed(timings, 'wait'):
+                            await lock_conn.scalar(select(func.pg_advisory_lock_shared(STARTUP_LOCK_KEY)))
+
+                        with _timed(timings, 'verify'):
+                            await self._verify_schema(lock_conn)
+                finally:
+                    unlock = func.pg_advisory_unlock if leader else func.pg_advisory_unlock_shared
+                    await lock_conn.scalar(select(unlock(STARTUP_LOCK_KEY)))
+
+        logger.info(
+            "Database ready in %.1f ms as the startup %s (%s)",
+            (time.perf_counter() - started) * 1000, 'leader' if leader else 'follower',
+            ', '.join(f'{phase} {elapsed:.1f} ms' for phase, elapsed in timings.items())
+        )
+
+    async def _bootstrap(self, timings: dict[str, float]) -> None:
+        # Let Alembic handle creating the schema
+        with _timed(timings, 'schema'):
+            async with self.async_engine.begin() as conn:
+                # await conn.run_sync(SQLModel.metadata.drop_all)
+                added_columns: set[str] = await conn.run_sync(create_schema)
+
         async with AsyncSession(self.async_engine) as session:
-            if not await self.get_user(session, settings.FIRST_USER_NAME):
-                await self.users.add_user(session, settings.FIRST_USER_NAME, settings.FIRST_USER_PASSWORD)
+            with _timed(timings, 'closure'):
+                await self.groups.ensure_closure(session)
+
+                if added_columns & COUNT_COLUMNS:
+                    await self.groups.recount_groups(session)
+
+            with _timed(timings, 'encrypt'):
+                await self.entries.encrypt_legacy_entries(session)
+
+            with _timed(timings, 'first_user'):
+                if await self.get_user(session, settings.FIRST_USER_NAME):
+                    return
+
+                try:
+                    await self.users.add_user(session, settings.FIRST_USER_NAME, settings.FIRST_USER_PASSWORD)
+                except IntegrityError:
+                    # Another worker created it first, only possible without the advisory lock
+                    await session.rollback()
+
+    async def _verify_schema(self, conn: 'AsyncConnection') -> None:
+        table_names: list[str] = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+        missing: set[str] = set(SQLModel.metadata.tables) - set(table_names)
+
+        if missing:
+            raise RuntimeError(f"Database schema is missing tables {sorted(missing)}")
 
     async def get_user(self, session: AsyncSession, username: str) -> Users | None:
         if not isinstance(username, str):
@@ -82,9 +271,61 @@ class MainDatabase:
 
         return user
     
+    def read_engine(self, client_key: str | None = None, sticky_cookie: str | None = None) -> 'AsyncEngine':
+        """Returns the engine for a read-only request, a replica unless the client wrote recently."""
+        if not self.replica_engines:
+            return self.async_engine
+
+        if client_key and self.sticky_clients.is_sticky(client_key):
+            return self.async_engine
+
+        # Written through another worker
+        if self.sticky_clients.cookie_is_sticky(sticky_cookie):
+            return self.async_engine
+
+        return next(self._replica_cycle)
+
+    def is_replica(self, session: AsyncSession) -> bool:
+        return session.bind in self.replica_engines
+
+    def writer(self) -> typing.AsyncContextManager:
+        """Serializes write transactions on SQLite, a no-op on Postgres.
+
+        SQLite allows a single writer and makes the others poll until `busy_timeout`
+        runs out. Holding this around a write transaction queues writers in arrival
+        order on the event loop instead, without tying up a connection meanwhile.
+        """
+        if self.async_engine.dialect.name == 'sqlite':
+            return self._write_lock
+
+        return contextlib.nullcontext()
+
+    def collect_metrics(self) -> None:
+        """Copies pool, hashing and cache state into `metrics`, called on every scrape."""
+        pool = self.async_engine.pool
+        if isinstance(pool, QueuePool):
+            metrics.pool_connections.set(pool.checkedout(), 'checked_out')
+            metrics.pool_connections.set(pool.checkedin(), 'idle')
+            metrics.pool_connections.set(max(pool.overflow(), 0), 'overflow')
+            metrics.pool_connections.set(pool.size(), 'size')
+
+        metrics.hash_pool.set(self.hasher.in_flight, 'in_flight')
+        metrics.hash_pool.set(self.hasher.completed, 'completed')
+        metrics.hash_pool.set(self.hasher.rejected, 'rejected')
+        metrics.hash_pool.set(self.hasher.restarts, 'restarts')
+
+        for cache_name, cache in (('session', self.sessions.cache), ('entry_key', self.cipher)):
+            metrics.cache_lookups.set(cache.hits, cache_name, 'hit')
+            metrics.cache_lookups.set(cache.misses, cache_name, 'miss')
+            metrics.cache_size.set(len(cache), cache_name)
+
     async def close(self):
+        self.hasher.shutdown()
         await self.async_engine.dispose()
 
+        for replica_engine in self.replica_engines:
+            await replica_engine.dispose()
+
 
 class UserMethods:
     def __init__(self, parent: MainDatabase):
@@ -102,14 +343,17 @@ class UserMethods:
         if stored_user:
             return False
 
-        hashed_pw: str = await asyncio.to_thread(pwd_context.hash, password)
+        hashed_pw: str = await self.parent.hasher.hash(password)
         user = Users(username=username, hashed_password=hashed_pw)
+        user_id: uuid.UUID = user.user_id
+
+        _, user.wrapped_data_key = self.parent.cipher.new_data_key(user_id)
 
         session.add(user)
         await session.commit()
 
         # Auto-create the Root group
-        await self.parent.groups.create_group(session, username, 'Root', parent_id=None)
+        await self.parent.groups.create_group(session, user_id, 'Root', parent_id=None)
         return True
     
     async def verify_user(self, session: AsyncSession, username: str, password: str) -> str | bool:
@@ -123,8 +367,7 @@ class UserMethods:
         if not user:
             return False
 
-        hash_valid, new_hash = await asyncio.to_thread(
-            pwd_context.verify_and_update,
+        hash_valid, new_hash = await self.parent.hasher.verify_and_update(
             password, user.hashed_password
         )
 
@@ -155,15 +398,61 @@ class UserMethods:
 
         await session.delete(user)
         await session.commit()
-        
+
+        self.parent.sessions.cache.invalidate_user(username)
+        self.parent.cipher.forget_key(existing_user.user_id)
         return True
 
+    async def get_data_key(self, session: AsyncSession, user_id: uuid.UUID, create: bool = False) -> 'AESGCM | None':
+        """Returns the user's unwrapped entry data key, or None if the user has none yet.
+
+        Users created before entries were encrypted get a key on their first write with
+        `create=True`. A new key is stored without committing and is not cached, so a
+        rolled back transaction cannot leave a key in memory that the database never saw.
+        """
+        cipher: EntryCipher = self.parent.cipher
+        data_key: 'AESGCM | None' = cipher.get_cached_key(user_id)
+        if data_key:
+            return data_key
+
+        result = await session.exec(
+            select(Users.wrapped_data_key).where(Users.user_id == user_id)
+        )
+        wrapped_key: str | None = result.one()
+
+        if wrapped_key:
+            data_key = cipher.unwrap_data_key(user_id, wrapped_key)
+            cipher.cache_key(user_id, data_key)
+            return data_key
+
+        if not create:
+            return None
+
+        data_key, wrapped_key = cipher.new_data_key(user_id)
+        result = await session.exec(
+            update(Users)
+            .where(Users.user_id == user_id, Users.wrapped_data_key.is_(None))
+            .values(wrapped_data_key=wrapped_key)
+            .execution_options(synchronize_session=False)
+        )
+
+        # Another request stored a key first, use that one instead
+        if result.rowcount == 0:
+            return await self.get_data_key(session, user_id)
+
+        return data_key
+
 
 class SessionMethods:
     def __init__(self, parent: MainDatabase):
         self.parent = parent
         self.async_engine = parent.async_engine
 
+        self.cache: SessionCache = SessionCache(
+            settings.SESSION_CACHE_MAX_SIZE,
+            settings.SESSION_CACHE_TTL
+        )
+
     async def create_session_token(self, session: AsyncSession, username: str, expiry_date: datetime) -> str:
         if not isinstance(username, str):
             raise TypeError("username is not a string")
@@ -187,38 +476,53 @@ class SessionMethods:
 
         return session_token
     
-    async def get_token_info(self, session: AsyncSession, token: str) -> UserInfo | str:
+    async def get_valid_token_info(self, session: AsyncSession, token: str) -> UserInfo | None:
+        """Returns the user of a valid session token, or None if it is invalid or expired.
+
+        Checks the expiry date and loads the user in one query, and serves
+        repeated lookups from the session cache.
+        """
         if not isinstance(token, str):
             raise TypeError("token is not a string")
-        
+
+        cached_info: UserInfo | None = self.cache.get(token)
+        if cached_info:
+            return cached_info
+
         result = await session.exec(
-            select(UserSessions).where(UserSessions.session_token == token)
+            select(UserSessions.expiry_date, Users.user_id, Users.username)
+            .join(Users)
+            .where(UserSessions.session_token == token)
         )
-        user_session: UserSessions | None = result.one_or_none()
+        row = result.one_or_none()
 
-        if not user_session:
-            raise ValueError("session token invalid")
-
-        userinfo = UserInfo(username=user_session.user.username)
-        return userinfo
+        if not row:
+            return None
 
-    async def check_session_validity(self, session: AsyncSession, token: str) -> bool:
-        if not isinstance(token, str):
-            raise TypeError("token is not a string")
+        expiry_date, user_id, username = row
+        if expiry_date <= datetime.now(timezone.utc):
+            return None
 
-        statement = select(UserSessions).where(UserSessions.session_token == token)
-        result = await session.exec(statement)
+        userinfo = UserInfo(user_id=user_id, username=username)
+        self.cache.set(token, userinfo, expiry_date)
 
-        user_session: UserSessions | None = result.one_or_none()
-        if not user_session:
-            return False
+        return userinfo
+    
+    async def purge_expired_sessions(self, session: AsyncSession, batch_size: int) -> int:
+        """Deletes up to `batch_size` expired sessions and returns how many were deleted."""
+        expired_tokens = (
+            select(UserSessions.session_token)
+            .where(UserSessions.expiry_date <= datetime.now(timezone.utc))
+            .limit(batch_size)
+        )
+        result = await session.exec(
+            delete(UserSessions)
+            .where(UserSessions.session_token.in_(expired_tokens.scalar_subquery()))
+        )
+        await session.commit()
 
-        expiry_date: datetime = user_session.expiry_date
-        current_date: datetime = datetime.now(timezone.utc)
+        return result.rowcount
 
-        is_not_expired: bool = expiry_date > current_date
-        return is_not_expired
-    
     async def revoke_session(self, session: AsyncSession, token: str):
         if not isinstance(token, str):
             raise TypeError("token is not a string")
@@ -232,7 +536,8 @@ class SessionMethods:
         
         await session.delete(user_session)
         await session.commit()
-        
+
+        self.cache.invalidate(token)
         return True
 
 
@@ -243,24 +548,23 @@ class PasswordGroupMethods:
 
     async def create_group(
         self, session: AsyncSession, 
-        username: str, group_name: str,
+        user_id: uuid.UUID, group_name: str,
         parent_id: uuid.UUID | None = None
     ) -> GroupPublicModify | bool:
-        user: Users = await self.parent.get_user(session, username)
-        if not user:
-            raise ValueError("user does not exist")
-
         # So the 'Root' group can be created without a parent
         if parent_id:
             result2 = await session.exec(
                 select(PasswordGroups)
                 .where(
-                    PasswordGroups.user_id == user.user_id,
+                    PasswordGroups.user_id == user_id,
                     PasswordGroups.group_id == parent_id
                 )
             )
             parent_model = result2.one()
             existing_parent_id = parent_model.group_id
+
+            if await self._group_depth(session, existing_parent_id) + 1 > MAX_GROUP_TREE_DEPTH:
+                raise GroupTooDeepError(f"groups can't be nested more than {MAX_GROUP_TREE_DEPTH} levels deep")
         else:
             assert group_name == 'Root', 'Cannot create group without parent unless its Root'
             existing_parent_id = None
@@ -268,7 +572,7 @@ class PasswordGroupMethods:
             result3 = await session.exec(
                 select(PasswordGroups)
                 .where(
-                    PasswordGroups.user_id == user.user_id,
+                    PasswordGroups.user_id == user_id,
                     PasswordGroups.is_root == true()
                 )
             )
@@ -279,11 +583,17 @@ class PasswordGroupMethods:
         
         new_group = PasswordGroups(
             group_name=group_name,
-            user_id=user.user_id,
+            user_id=user_id,
             parent_id=existing_parent_id,
-            is_root=True if not parent_id else False
+            is_root=True if not parent_id else False,
+            revision=await self.parent.sync.next_revision(session, user_id)
         )
         session.add(new_group)
+        await session.flush()
+
+        await self._link_new_group(session, new_group.group_id, existing_parent_id)
+        if existing_parent_id:
+            await self._add_child_counts(session, existing_parent_id, 1, 0)
 
         group_public = GroupPublicModify(
             group_name=group_name,
@@ -294,86 +604,139 @@ class PasswordGroupMethods:
         await session.commit()
         return group_public
     
-    async def get_children_of_root(self, session: AsyncSession, username: str) -> GroupPublicGet:
-        user: Users = await self.parent.get_user(session, username)
-        if not user:
-            raise ValueError("user does not exist")
-
+    async def get_children_of_root(self, session: AsyncSession, user_id: uuid.UUID) -> GroupPublicGet:
         result = await session.exec(
             select(PasswordGroups)
             .where(
-                PasswordGroups.user_id == user.user_id,
+                PasswordGroups.user_id == user_id,
                 PasswordGroups.is_root == true()
             )
+            .options(*GROUP_LISTING_LOAD)
         )
         root_group = result.one()
         child_models: list[GroupPublicChildren] = []
 
-        await session.refresh(root_group)
         for child in root_group.child_groups:
-            child_model = GroupPublicChildren(
+            child_model = GroupPublicChildren.model_construct(
                 group_name=child.group_name,
                 parent_id=child.parent_id,
-                group_id=child.group_id
+                group_id=child.group_id,
+                **_group_counts(child)
             )
             child_models.append(child_model)
         
-        model = GroupPublicGet(
+        model = GroupPublicGet.model_construct(
             group_name=root_group.group_name,
             parent_id=None,
             group_id=root_group.group_id,
-            child_groups=child_models
+            child_groups=child_models,
+            **_group_counts(root_group)
         )
 
         return model
 
-    async def get_children_of_group(self, session: AsyncSession, username: str, group_id: uuid.UUID) -> GroupPublicGet:
-        user: Users = await self.parent.get_user(session, username)
-        if not user:
-            raise ValueError("user does not exist")
-
+    async def get_children_of_group(self, session: AsyncSession, user_id: uuid.UUID, group_id: uuid.UUID) -> GroupPublicGet:
         result = await session.exec(
             select(PasswordGroups)
             .where(
-                PasswordGroups.user_id == user.user_id,
+                PasswordGroups.user_id == user_id,
                 PasswordGroups.group_id == group_id
             )
+            .options(*GROUP_LISTING_LOAD)
         )
         group = result.one()
 
-        if group.is_root:
-            # Make it so that getting children of /groups/{root_id} is an alias of /groups/
-            return await self.get_children_of_root(session, username)
-        
+        # /groups/{root_id}/children is an alias of /groups/, the Root group has no parent_id
         child_models: list[GroupPublicChildren] = []
-        await session.refresh(group)
-
         for child in group.child_groups:
-            child_model = GroupPublicChildren(
+            child_model = GroupPublicChildren.model_construct(
                 group_name=child.group_name,
                 parent_id=child.parent_id,
-                group_id=child.group_id
+                group_id=child.group_id,
+                **_group_counts(child)
             )
             child_models.append(child_model)
         
-        model = GroupPublicGet(
+        model = GroupPublicGet.model_construct(
             group_name=group.group_name,
             parent_id=group.parent_id,
             group_id=group.group_id,
-            child_groups=child_models
+            child_groups=child_models,
+            **_group_counts(group)
         )
 
         return model
 
-    async def delete_group(self, session: AsyncSession, username: str, group_id: uuid.UUID) -> bool:
-        user: Users = await self.parent.get_user(session, username)
-        if not user:
-            raise ValueError("user does not exist")
+    async def get_group_tree(
+        self, session: AsyncSession,
+        user_id: uuid.UUID, group_id: uuid.UUID,
+        depth: int = MAX_GROUP_TREE_DEPTH
+    ) -> GroupTreeNode:
+        """Returns the subtree under `group_id`, down to `depth` levels below it.
 
+        The whole subtree is fetched with one query on `GroupClosure`.
+        """
+        statement = (
+            select(
+                PasswordGroups.group_id, PasswordGroups.parent_id,
+                PasswordGroups.group_name, GroupClosure.depth,
+                PasswordGroups.entry_count, PasswordGroups.child_count,
+                PasswordGroups.subtree_entry_count
+            )
+            .join(GroupClosure, GroupClosure.descendant_id == PasswordGroups.group_id)
+            .where(
+                PasswordGroups.user_id == user_id,
+                GroupClosure.ancestor_id == group_id,
+                GroupClosure.depth <= depth
+            )
+        )
+        result = await session.exec(statement.order_by(GroupClosure.depth))
+        rows = result.all()
+
+        if not rows:
+            raise ValueError("group does not exist")
+
+        nodes: dict[uuid.UUID, GroupTreeNode] = {}
+        for row in rows:
+            # Guards against a parent_id cycle looping back into the tree
+            if row.group_id in nodes:
+                continue
+
+            node = GroupTreeNode.model_construct(
+                group_name=row.group_name,
+                parent_id=row.parent_id,
+                group_id=row.group_id,
+                child_groups=[],
+                **_group_counts(row)
+            )
+            nodes[row.group_id] = node
+
+            if row.depth > 0:
+                nodes[row.parent_id].child_groups.append(node)
+
+        return nodes[group_id]
+
+    async def get_all_groups(self, session: AsyncSession, user_id: uuid.UUID) -> list[tuple[uuid.UUID, uuid.UUID | None, str]]:
+        """Returns `(group_id, parent_id, group_name)` of every group the user has."""
+        result = await session.exec(
+            select(PasswordGroups.group_id, PasswordGroups.parent_id, PasswordGroups.group_name)
+            .where(PasswordGroups.user_id == user_id)
+        )
+        return [tuple(row) for row in result.all()]
+
+    async def delete_group(
+        self, session: AsyncSession, 
+        user_id: uuid.UUID, group_id: uuid.UUID
+    ) -> GroupDeleteJob | bool:
+        """Deletes a group and everything inside it.
+
+        Subtrees with at least `GROUP_DELETE_ASYNC_THRESHOLD` groups and entries are only
+        hidden and queued, the returned job is purged in batches by `purge_delete_job`.
+        """
         result = await session.exec(
             select(PasswordGroups)
             .where(
-                PasswordGroups.user_id == user.user_id,
+                PasswordGroups.user_id == user_id,
                 PasswordGroups.group_id == group_id
             )
         )
@@ -382,30 +745,154 @@ class PasswordGroupMethods:
         if group.is_root:
             return False
         
-        await session.delete(group)
+        # Every group of the subtree gets a tombstone, a client may not know the subtree's
+        # current shape if groups were moved into it since its last sync
+        result = await session.exec(
+            select(GroupClosure.descendant_id)
+            .where(GroupClosure.ancestor_id == group_id)
+            .order_by(GroupClosure.depth)
+        )
+        subtree_ids: list[uuid.UUID] = list(result.all())
+
+        revision: int = await self.parent.sync.next_revision(session, user_id, len(subtree_ids))
+        await self.parent.sync.add_tombstones(session, user_id, 'group', subtree_ids, revision)
+
+        await self._add_child_counts(session, group.parent_id, -1, -group.subtree_entry_count)
+
+        total_groups: int = len(subtree_ids)
+        total_entries: int = group.subtree_entry_count
+        if total_groups + total_entries < settings.GROUP_DELETE_ASYNC_THRESHOLD:
+            await session.delete(group)
+            await session.commit()
+
+            return True
+
+        # Clearing the owner hides the whole subtree at once without touching its entries
+        await session.exec(
+            update(PasswordGroups)
+            .where(PasswordGroups.group_id.in_(_subtree_ids(group_id)))
+            .values(user_id=None)
+            .execution_options(synchronize_session=False)
+        )
+
+        job = GroupDeleteJobs(
+            user_id=user_id, group_id=group_id,
+            total_groups=total_groups, total_entries=total_entries
+        )
+        job_public = GroupDeleteJob.model_validate(job, from_attributes=True)
+
+        session.add(job)
         await session.commit()
 
-        return True
+        return job_public
+
+    async def get_delete_job(
+        self, session: AsyncSession, 
+        user_id: uuid.UUID, job_id: uuid.UUID
+    ) -> GroupDeleteJob | None:
+        result = await session.exec(
+            select(GroupDeleteJobs)
+            .where(
+                GroupDeleteJobs.user_id == user_id,
+                GroupDeleteJobs.job_id == job_id
+            )
+        )
+        job: GroupDeleteJobs | None = result.one_or_none()
+        if not job:
+            return None
+
+        return GroupDeleteJob.model_validate(job, from_attributes=True)
+
+    async def get_pending_delete_jobs(self, session: AsyncSession) -> list[uuid.UUID]:
+        result = await session.exec(
+            select(GroupDeleteJobs.job_id)
+            .where(GroupDeleteJobs.status == 'pending')
+            .order_by(GroupDeleteJobs.created_at)
+        )
+        return list(result.all())
+
+    async def purge_delete_job(self, session: AsyncSession, job_id: uuid.UUID, batch_size: int) -> bool:
+        """Deletes up to `batch_size` entries, or groups once the entries are gone, of a job.
+
+        Groups go one level at a time from the deepest, so the foreign key cascade of
+        each one only removes its closure rows. Returns True once the job is done.
+        """
+        result = await session.exec(
+            select(GroupDeleteJobs.group_id, GroupDeleteJobs.status)
+            .where(GroupDeleteJobs.job_id == job_id)
+        )
+        group_id, status = result.one()
+
+        if status == 'done':
+            return True
+
+        # Progress is added in SQL, so workers purging the same job don't overwrite each other
+        update_job = update(GroupDeleteJobs).where(GroupDeleteJobs.job_id == job_id)
+
+        doomed_entries = (
+            select(PasswordEntry.entry_id)
+            .where(PasswordEntry.group_id.in_(_subtree_ids(group_id)))
+            .limit(batch_size)
+        )
+        result = await session.exec(
+            delete(PasswordEntry)
+            .where(PasswordEntry.entry_id.in_(doomed_entries.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            await session.exec(
+                update_job.values(deleted_entries=GroupDeleteJobs.deleted_entries + result.rowcount)
+            )
+            await session.commit()
+            return False
+
+        deepest_level = (
+            select(func.max(GroupClosure.depth))
+            .where(GroupClosure.ancestor_id == group_id)
+            .scalar_subquery()
+        )
+        doomed_groups = (
+            select(GroupClosure.descendant_id)
+            .where(
+                GroupClosure.ancestor_id == group_id,
+                GroupClosure.depth == deepest_level
+            )
+            .limit(batch_size)
+        )
+        result = await session.exec(
+            delete(PasswordGroups)
+            .where(PasswordGroups.group_id.in_(doomed_groups.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            await session.exec(
+                update_job.values(deleted_groups=GroupDeleteJobs.deleted_groups + result.rowcount)
+            )
+        else:
+            await session.exec(
+                update_job.where(GroupDeleteJobs.status == 'pending')
+                .values(status='done', finished_at=datetime.now(timezone.utc))
+            )
+
+        await session.commit()
+        return not result.rowcount
 
     async def rename_group(
         self, session: AsyncSession, 
-        username: str, group_id: uuid.UUID, 
+        user_id: uuid.UUID, group_id: uuid.UUID, 
         new_name: str
     ) -> GroupPublicModify:
-        user: Users = await self.parent.get_user(session, username)
-        if not user:
-            raise ValueError("user does not exist")
-
         result = await session.exec(
             select(PasswordGroups)
             .where(
-                PasswordGroups.user_id == user.user_id,
+                PasswordGroups.user_id == user_id,
                 PasswordGroups.group_id == group_id
             )
         )
         group = result.one()
 
         group.group_name = new_name
+        group.revision = await self.parent.sync.next_revision(session, user_id)
         session.add(group)
 
         group_public = GroupPublicModify(
@@ -419,17 +906,13 @@ class PasswordGroupMethods:
     
     async def move_to_new_parent(
         self, session: AsyncSession,
-        username: str, group_id: uuid.UUID,
+        user_id: uuid.UUID, group_id: uuid.UUID,
         new_parent_id: uuid.UUID
     ) -> GroupPublicModify | bool:
-        user: Users = await self.parent.get_user(session, username)
-        if not user:
-            raise ValueError("user does not exist")
-
         result = await session.exec(
             select(PasswordGroups)
             .where(
-                PasswordGroups.user_id == user.user_id,
+                PasswordGroups.user_id == user_id,
                 PasswordGroups.group_id == group_id
             )
         )
@@ -441,7 +924,7 @@ class PasswordGroupMethods:
         result = await session.exec(
             select(PasswordGroups)
             .where(
-                PasswordGroups.user_id == user.user_id,
+                PasswordGroups.user_id == user_id,
                 PasswordGroups.group_id == new_parent_id
             )
         )
@@ -449,10 +932,24 @@ class PasswordGroupMethods:
 
         if not parent_model:
             return False
-        
+
+        if await self.is_in_subtree(session, user_id, group_id, new_parent_id):
+            raise ValueError("new parent is the group itself or one of its subgroups")
+
+        moved_depth: int = await self._group_depth(session, new_parent_id) + 1 + await self._subtree_height(session, group_id)
+        if moved_depth > MAX_GROUP_TREE_DEPTH:
+            raise GroupTooDeepError(f"groups can't be nested more than {MAX_GROUP_TREE_DEPTH} levels deep")
+
+        old_parent_id: uuid.UUID = group.parent_id
         group.parent_id = parent_model.group_id
+        group.revision = await self.parent.sync.next_revision(session, user_id)
         session.add(group)
 
+        await self._relink_subtree(session, group_id, new_parent_id)
+
+        await self._add_child_counts(session, old_parent_id, -1, -group.subtree_entry_count)
+        await self._add_child_counts(session, new_parent_id, 1, group.subtree_entry_count)
+
         group_public = GroupPublicModify(
             group_name=group.group_name,
             parent_id=parent_model.group_id,
@@ -462,15 +959,265 @@ class PasswordGroupMethods:
         await session.commit()
         return group_public
 
-    async def check_group_exists(self, session: AsyncSession, username: str, group_id: uuid.UUID) -> bool:
-        user: Users = await self.parent.get_user(session, username)
-        if not user:
-            raise ValueError("user does not exist")
+    async def get_ancestors(self, session: AsyncSession, user_id: uuid.UUID, group_id: uuid.UUID) -> list[GroupPublic]:
+        """Returns the path from the Root group down to `group_id`, both included."""
+        result = await session.exec(
+            select(PasswordGroups.group_id, PasswordGroups.parent_id, PasswordGroups.group_name)
+            .join(GroupClosure, GroupClosure.ancestor_id == PasswordGroups.group_id)
+            .where(
+                PasswordGroups.user_id == user_id,
+                GroupClosure.descendant_id == group_id
+            )
+            .order_by(GroupClosure.depth.desc())
+        )
+        return [
+            GroupPublic.model_construct(group_id=group_id, parent_id=parent_id, group_name=group_name)
+            for group_id, parent_id, group_name in result.all()
+        ]
+
+    async def is_in_subtree(
+        self, session: AsyncSession, user_id: uuid.UUID,
+        ancestor_id: uuid.UUID, group_id: uuid.UUID
+    ) -> bool:
+        """Checks if `group_id` is `ancestor_id` or one of its descendants."""
+        result = await session.exec(
+            select(GroupClosure.depth)
+            .join(PasswordGroups, PasswordGroups.group_id == GroupClosure.ancestor_id)
+            .where(
+                PasswordGroups.user_id == user_id,
+                GroupClosure.ancestor_id == ancestor_id,
+                GroupClosure.descendant_id == group_id
+            )
+        )
+        return result.one_or_none() is not None
+
+    async def _group_depth(self, session: AsyncSession, group_id: uuid.UUID) -> int:
+        """Levels between the Root group and `group_id`."""
+        result = await session.exec(
+            select(func.max(GroupClosure.depth)).where(GroupClosure.descendant_id == group_id)
+        )
+        return result.one() or 0
+
+    async def _subtree_height(self, session: AsyncSession, group_id: uuid.UUID) -> int:
+        """Levels between `group_id` and its deepest subgroup."""
+        # Subtrees queued for deletion keep their closure rows until purged
+        result = await session.exec(
+            select(func.max(GroupClosure.depth))
+            .join(PasswordGroups, PasswordGroups.group_id == GroupClosure.descendant_id)
+            .where(
+                GroupClosure.ancestor_id == group_id,
+                PasswordGroups.user_id.is_not(None)
+            )
+        )
+        return result.one() or 0
+
+    async def _link_new_group(self, session: AsyncSession, group_id: uuid.UUID, parent_id: uuid.UUID | None) -> None:
+        """Adds the closure rows of a new leaf group, without committing."""
+        await session.exec(
+            insert(GroupClosure),
+            params=[{'ancestor_id': group_id, 'descendant_id': group_id, 'depth': 0}]
+        )
+        if not parent_id:
+            return
+
+        await session.exec(
+            insert(GroupClosure).from_select(
+                ['ancestor_id', 'descendant_id', 'depth'],
+                select(
+                    GroupClosure.ancestor_id,
+                    literal(group_id, GroupClosure.descendant_id.type),
+                    GroupClosure.depth + 1
+                )
+                .where(GroupClosure.descendant_id == parent_id)
+            )
+        )
+
+    async def _relink_subtree(self, session: AsyncSession, group_id: uuid.UUID, new_parent_id: uuid.UUID) -> None:
+        """Moves the closure rows of a subtree under a new parent, without committing."""
+        subtree = _subtree_ids(group_id)
+
+        # Drop the links from the old ancestors, links inside the subtree stay as they are
+        await session.exec(
+            delete(GroupClosure)
+            .where(
+                GroupClosure.descendant_id.in_(subtree),
+                GroupClosure.ancestor_id.not_in(subtree)
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        new_ancestors = aliased(GroupClosure)
+        subtree_links = aliased(GroupClosure)
+        await session.exec(
+            insert(GroupClosure).from_select(
+                ['ancestor_id', 'descendant_id', 'depth'],
+                select(
+                    new_ancestors.ancestor_id, subtree_links.descendant_id,
+                    new_ancestors.depth + subtree_links.depth + 1
+                )
+                .join(subtree_links, true())  # Every new ancestor with every subtree link
+                .where(
+                    new_ancestors.descendant_id == new_parent_id,
+                    subtree_links.ancestor_id == group_id
+                )
+            )
+        )
+
+    async def add_entry_counts(self, session: AsyncSession, deltas: Counter[uuid.UUID]) -> None:
+        """Adds entries to the counts of their groups and of every ancestor, without committing.
+
+        `deltas` maps group IDs to the number of entries created (or deleted if negative).
+        """
+        deltas = Counter({group_id: delta for group_id, delta in deltas.items() if delta})
+        if not deltas:
+            return
+
+        result = await session.exec(
+            select(GroupClosure.ancestor_id, GroupClosure.descendant_id)
+            .where(GroupClosure.descendant_id.in_(deltas))
+        )
+        subtree_deltas: Counter[uuid.UUID] = Counter()
+        for ancestor_id, descendant_id in result.all():
+            subtree_deltas[ancestor_id] += deltas[descendant_id]
+
+        await session.exec(
+            update(PasswordGroups)
+            .where(PasswordGroups.group_id.in_(subtree_deltas))
+            .values(
+                entry_count=PasswordGroups.entry_count + case(deltas, value=PasswordGroups.group_id, else_=0),
+                subtree_entry_count=PasswordGroups.subtree_entry_count + case(subtree_deltas, value=PasswordGroups.group_id)
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def _add_child_counts(
+        self, session: AsyncSession, parent_id: uuid.UUID | None,
+        children: int, entries: int
+    ) -> None:
+        """Counts a subtree with `entries` entries in or out of `parent_id`, without committing."""
+        if not parent_id:
+            return
+
+        if entries:
+            groups = select(GroupClosure.ancestor_id).where(GroupClosure.descendant_id == parent_id)
+        else:
+            groups = [parent_id]
+
+        await session.exec(
+            update(PasswordGroups)
+            .where(PasswordGroups.group_id.in_(groups))
+            .values(
+                child_count=PasswordGroups.child_count + case((PasswordGroups.group_id == parent_id, children), else_=0),
+                subtree_entry_count=PasswordGroups.subtree_entry_count + entries
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    async def recount_groups(self, session: AsyncSession, user_id: uuid.UUID | None = None) -> int:
+        """Recounts every group from scratch, or only the user's, and returns how many were wrong.
+
+        Groups queued for deletion are skipped and do not count towards their parents.
+        """
+        visible = PasswordGroups.user_id == user_id if user_id else PasswordGroups.user_id.is_not(None)
+        result = await session.exec(
+            select(
+                PasswordGroups.group_id, PasswordGroups.entry_count,
+                PasswordGroups.child_count, PasswordGroups.subtree_entry_count
+            )
+            .where(visible)
+        )
+        stored: dict[uuid.UUID, tuple[int, int, int]] = {
+            group_id: counts for group_id, *counts in result.all()
+        }
+
+        result = await session.exec(
+            select(PasswordEntry.group_id, func.count())
+            .join(PasswordGroups)
+            .where(visible)
+            .group_by(PasswordEntry.group_id)
+        )
+        entry_counts: dict[uuid.UUID, int] = dict(result.all())
+
+        result = await session.exec(
+            select(PasswordGroups.parent_id, func.count())
+            .where(visible, PasswordGroups.parent_id.is_not(None))
+            .group_by(PasswordGroups.parent_id)
+        )
+        child_counts: dict[uuid.UUID, int] = dict(result.all())
 
+        result = await session.exec(
+            select(GroupClosure.ancestor_id, func.count(PasswordEntry.entry_id))
+            .join(PasswordGroups, PasswordGroups.group_id == GroupClosure.descendant_id)
+            .join(PasswordEntry, PasswordEntry.group_id == GroupClosure.descendant_id)
+            .where(visible)
+            .group_by(GroupClosure.ancestor_id)
+        )
+        subtree_counts: dict[uuid.UUID, int] = dict(result.all())
+
+        fixed_rows: list[dict] = []
+        for group_id, counts in stored.items():
+            expected = (
+                entry_counts.get(group_id, 0), child_counts.get(group_id, 0),
+                subtree_counts.get(group_id, 0)
+            )
+            if tuple(counts) != expected:
+                fixed_rows.append({
+                    'group_id': group_id, 'entry_count': expected[0],
+                    'child_count': expected[1], 'subtree_entry_count': expected[2]
+                })
+
+        if fixed_rows:
+            await session.exec(update(PasswordGroups), params=fixed_rows)
+            await session.commit()
+
+        return len(fixed_rows)
+
+    async def ensure_closure(self, session: AsyncSession) -> None:
+        """Rebuilds `GroupClosure` from `parent_id` if it is missing groups, like after upgrading."""
+        result = await session.exec(select(func.count()).select_from(PasswordGroups))
+        group_count: int = result.one()
+
+        result = await session.exec(
+            select(func.count()).select_from(GroupClosure).where(GroupClosure.depth == 0)
+        )
+        if result.one() == group_count:
+            return
+
+        closure = (
+            select(
+                PasswordGroups.group_id.label('ancestor_id'),
+                PasswordGroups.group_id.label('descendant_id'),
+                literal_column('0', Integer).label('depth')
+            )
+            .cte('closure', recursive=True)
+        )
+        closure = closure.union_all(
+            select(closure.c.ancestor_id, PasswordGroups.group_id, closure.c.depth + 1)
+            .join(PasswordGroups, PasswordGroups.parent_id == closure.c.descendant_id)
+            .where(closure.c.depth < MAX_GROUP_TREE_DEPTH)  # Stops parent_id cycles made before moves were checked
+        )
+
+        await session.exec(delete(GroupClosure).execution_options(synchronize_session=False))
+        await session.exec(
+            insert(GroupClosure).from_select(
+                ['ancestor_id', 'descendant_id', 'depth'],
+                select(closure.c.ancestor_id, closure.c.descendant_id, func.min(closure.c.depth))
+                .group_by(closure.c.ancestor_id, closure.c.descendant_id)
+            )
+        )
+        await session.commit()
+
+        fixed_count: int = await self.recount_groups(session)
+        logger.info(
+            "Rebuilt the group closure table for %d groups, recounted %d of them",
+            group_count, fixed_count
+        )
+
+    async def check_group_exists(self, session: AsyncSession, user_id: uuid.UUID, group_id: uuid.UUID) -> bool:
         result = await session.exec(
             select(PasswordGroups)
             .where(
-                PasswordGroups.user_id == user.user_id,
+                PasswordGroups.user_id == user_id,
                 PasswordGroups.group_id == group_id
             )
         )
@@ -480,15 +1227,11 @@ class PasswordGroupMethods:
         
         return True
     
-    async def check_group_is_root(self, session: AsyncSession, username: str, group_id: uuid.UUID) -> bool:
-        user: Users = await self.parent.get_user(session, username)
-        if not user:
-            raise ValueError("user does not exist")
-
+    async def check_group_is_root(self, session: AsyncSession, user_id: uuid.UUID, group_id: uuid.UUID) -> bool:
         result = await session.exec(
             select(PasswordGroups)
             .where(
-                PasswordGroups.user_id == user.user_id,
+                PasswordGroups.user_id == user_id,
                 PasswordGroups.group_id == group_id
             )
         )
@@ -509,30 +1252,32 @@ class PasswordEntryMethods:
 
     async def create_entry(
         self, session: AsyncSession, 
-        username: str, group_id: uuid.UUID,
+        user_id: uuid.UUID, group_id: uuid.UUID,
         entry_name: str, entry_username: str,
         entry_password: str, entry_url: str
     ) -> EntryPublicGet:
-        user: Users = await self.parent.get_user(session, username)
-        if not user:
-            raise ValueError("user does not exist")
-
         result = await session.exec(
             select(PasswordGroups)
             .where(
-                PasswordGroups.user_id == user.user_id,
+                PasswordGroups.user_id == user_id,
                 PasswordGroups.group_id == group_id
             )
         )
         group = result.one()
 
-        # TODO: Encrypt password entries so its safer in the database
+        row: dict = {
+            'entry_id': uuid.uuid4(), 'entry_username': entry_username,
+            'entry_password': entry_password, 'entry_url': entry_url
+        }
+        await self.encrypt_rows(session, user_id, [row])
+
         new_entry = PasswordEntry(
-            entry_name=entry_name, entry_username=entry_username,
-            entry_password=entry_password, entry_url=entry_url,
-            group_id=group.group_id
+            **row, entry_name=entry_name,
+            group_id=group.group_id,
+            revision=await self.parent.sync.next_revision(session, user_id)
         )
         session.add(new_entry)
+        await self.parent.groups.add_entry_counts(session, Counter({group_id: 1}))
 
         entry_public = EntryPublicGet(
             entry_id=new_entry.entry_id, entry_name=entry_name,
@@ -545,57 +1290,77 @@ class PasswordEntryMethods:
     
     async def get_entries_by_group(
         self, session: AsyncSession, 
-        username: str, group_id: uuid.UUID,
-        amount: int = 100, offset: int = 0
-    ) -> list[EntryPublicGet]:
-        user: Users = await self.parent.get_user(session, username)
-        if not user:
-            raise ValueError("user does not exist")
+        user_id: uuid.UUID, group_id: uuid.UUID,
+        amount: int = 100, cursor: str | None = None
+    ) -> EntryPage:
+        """Returns one page of entries ordered by `(entry_name, entry_id)`.
 
-        result = await session.exec(
-            select(PasswordGroups)
+        Pass the `next_cursor` of the previous page as `cursor` to continue after it,
+        raises InvalidCursorError if the cursor is malformed.
+        """
+        statement = (
+            select(PasswordEntry)
+            .join(PasswordGroups)
             .where(
-                PasswordGroups.user_id == user.user_id,
-                PasswordGroups.group_id == group_id
+                PasswordGroups.user_id == user_id,
+                PasswordEntry.group_id == group_id
             )
         )
-        existing_group = result.one()
 
-        result = await session.exec(
-            select(PasswordEntry, PasswordGroups)
-            .join(PasswordGroups)
-            .where(
-                PasswordEntry.group_id == existing_group.group_id
+        if cursor:
+            match decode_cursor(cursor):
+                case [str(last_name), str(last_id)]:
+                    try:
+                        last_key = (last_name, uuid.UUID(last_id))
+                    except ValueError as exc:
+                        raise InvalidCursorError("cursor is invalid") from exc
+                case _:
+                    raise InvalidCursorError("cursor is invalid")
+
+            statement = statement.where(
+                tuple_(PasswordEntry.entry_name, PasswordEntry.entry_id) > tuple_(*last_key)
             )
-            .limit(amount)
-            .offset(offset)
+
+        # Fetch one extra row to know if there is a next page
+        result = await session.exec(
+            statement
+            .options(*ENTRY_PAGE_LOAD)
+            .order_by(PasswordEntry.entry_name, PasswordEntry.entry_id)
+            .limit(amount + 1)
         )
         entries = result.all()
 
-        entries_public: list[EntryPublicGet] = []
-        for entry, group in entries:
-            entry_public = EntryPublicGet(
-                entry_name=entry.entry_name, entry_username=entry.entry_username,
-                entry_password=entry.entry_password, entry_url=entry.entry_url,
-                entry_id=entry.entry_id, group_id=group.group_id
-            )
-            entries_public.append(entry_public)
-        
-        return entries_public
+        next_cursor: str | None = None
+        if len(entries) > amount:
+            entries = entries[:amount]
+            next_cursor = encode_cursor(entries[-1].entry_name, entries[-1].entry_id)
+
+        rows: list[dict] = [
+            {
+                'entry_id': entry.entry_id, 'group_id': entry.group_id,
+                'entry_name': entry.entry_name, 'entry_username': entry.entry_username,
+                'entry_password': entry.entry_password, 'entry_url': entry.entry_url,
+                'encrypted': entry.encrypted
+            }
+            for entry in entries
+        ]
+        await self.decrypt_rows(session, user_id, rows)
+
+        # Rows were validated when written, so the page is built without re-validating them
+        entries_public: list[EntryPublicGet] = [
+            EntryPublicGet.model_construct(**row) for row in rows
+        ]
+        return EntryPage.model_construct(entries=entries_public, next_cursor=next_cursor)
     
     async def delete_entry_by_id(
         self, session: AsyncSession, 
-        username: str, entry_id: uuid.UUID
+        user_id: uuid.UUID, entry_id: uuid.UUID
     ) -> bool:
-        user: Users = await self.parent.get_user(session, username)
-        if not user:
-            raise ValueError("user does not exist")
-
         result = await session.exec(
             select(PasswordEntry)
             .join(PasswordGroups)
             .where(
-                PasswordGroups.user_id == user.user_id,
+                PasswordGroups.user_id == user_id,
                 PasswordEntry.entry_id == entry_id
             )
         )
@@ -604,6 +1369,10 @@ class PasswordEntryMethods:
         if not entry:
             return False
 
+        revision: int = await self.parent.sync.next_revision(session, user_id)
+        await self.parent.sync.add_tombstones(session, user_id, 'entry', [entry.entry_id], revision)
+        await self.parent.groups.add_entry_counts(session, Counter({entry.group_id: -1}))
+
         await session.delete(entry)
         await session.commit()
         
@@ -611,19 +1380,15 @@ class PasswordEntryMethods:
     
     async def update_entry_data(
         self, session: AsyncSession, 
-        username: str, entry_id: uuid.UUID,
+        user_id: uuid.UUID, entry_id: uuid.UUID,
         entry_name: str, entry_username: str,
         entry_password: str, entry_url: str
     ) -> EntryPublicGet | bool:
-        user: Users = await self.parent.get_user(session, username)
-        if not user:
-            raise ValueError("user does not exist")
-
         result = await session.exec(
             select(PasswordEntry)
             .join(PasswordGroups)
             .where(
-                PasswordGroups.user_id == user.user_id,
+                PasswordGroups.user_id == user_id,
                 PasswordEntry.entry_id == entry_id
             )
         )
@@ -632,21 +1397,446 @@ class PasswordEntryMethods:
         if not entry:
             return False
         
+        row: dict = {
+            'entry_id': entry.entry_id, 'entry_username': entry_username,
+            'entry_password': entry_password, 'entry_url': entry_url
+        }
+        await self.encrypt_rows(session, user_id, [row])
+
         entry.entry_name = entry_name
-        entry.entry_username = entry_username
+        entry.entry_username = row['entry_username']
 
-        entry.entry_password = entry_password
-        entry.entry_url = entry_url
+        entry.entry_password = row['entry_password']
+        entry.entry_url = row['entry_url']
+        entry.encrypted = True
 
+        entry.revision = await self.parent.sync.next_revision(session, user_id)
         session.add(entry)
 
         entry_public = EntryPublicGet(
             entry_id=entry.entry_id, entry_name=entry_name,
             entry_username=entry_username, entry_password=entry_password,
-            entry_url=entry_url, group_id=entry.group.group_id
+            entry_url=entry_url, group_id=entry.group_id
         )
         await session.commit()
         return entry_public
 
+    async def insert_entry_rows(self, session: AsyncSession, user_id: uuid.UUID, rows: list[tuple]) -> None:
+        """Inserts already validated entry rows without committing.
+
+        Rows are tuples of plaintext values in `ENTRY_COPY_COLUMNS` order without the trailing
+        revision, and the caller must have checked that their groups belong to the user. Uses
+        binary COPY on asyncpg connections.
+        """
+        row_dicts: list[dict] = [dict(zip(ENTRY_COPY_COLUMNS, row)) for row in rows]
+        await self.encrypt_rows(session, user_id, row_dicts)
+
+        first_revision: int = await self.parent.sync.next_revision(session, user_id, len(rows))
+        for offset, row in enumerate(row_dicts):
+            row['revision'] = first_revision + offset
+
+        await self.parent.groups.add_entry_counts(session, Counter(row['group_id'] for row in row_dicts))
+
+        connection = await session.connection()
+        if connection.dialect.driver == 'asyncpg':
+            raw_connection = await connection.get_raw_connection()
+            await raw_connection.driver_connection.copy_records_to_table(
+                PasswordEntry.__tablename__,
+                records=[tuple(row[column] for column in ENTRY_COPY_COLUMNS) for row in row_dicts],
+                columns=ENTRY_COPY_COLUMNS
+            )
+            return
+
+        await session.exec(insert(PasswordEntry), params=row_dicts)
+
+    async def encrypt_legacy_entries(self, session: AsyncSession, batch_size: int = 1000) -> int:
+        """Encrypts entries written before encryption was added, one batch per transaction.
+
+        Revisions are left alone since the values themselves don't change. Returns how
+        many entries were encrypted.
+        """
+        encrypted_count: int = 0
+        while True:
+            result = await session.exec(
+                select(
+                    PasswordGroups.user_id, PasswordEntry.entry_id,
+                    PasswordEntry.entry_username, PasswordEntry.entry_password,
+                    PasswordEntry.entry_url
+                )
+                .join(PasswordGroups)
+                .where(PasswordEntry.encrypted == false(), PasswordGroups.user_id.is_not(None))
+                .limit(batch_size)
+            )
+            rows_by_user: dict[uuid.UUID, list[dict]] = {}
+            for user_id, entry_id, entry_username, entry_password, entry_url in result.all():
+                rows_by_user.setdefault(user_id, []).append({
+                    'entry_id': entry_id, 'entry_username': entry_username,
+                    'entry_password': entry_password, 'entry_url': entry_url
+                })
+
+            if not rows_by_user:
+                break
+
+            for user_id, rows in rows_by_user.items():
+                await self.encrypt_rows(session, user_id, rows)
+                await session.exec(update(PasswordEntry), params=rows)
+                encrypted_count += len(rows)
+
+            await session.commit()
+
+        if encrypted_count:
+            logger.info("Encrypted %d entries written before entry encryption", encrypted_count)
+
+        return encrypted_count
+
+    async def encrypt_rows(self, session: AsyncSession, user_id: uuid.UUID, rows: list[dict]) -> None:
+        """Encrypts the entry fields of row dicts in place, creating the user's data key if needed."""
+        if not rows:
+            return
+
+        data_key: 'AESGCM' = await self.parent.users.get_data_key(session, user_id, create=True)
+        if len(rows) < CRYPTO_THREAD_MIN_ROWS:
+            self.parent.cipher.encrypt_rows(data_key, rows)
+        else:
+            await asyncio.to_thread(self.parent.cipher.encrypt_rows, data_key, rows)
+
+    async def decrypt_rows(self, session: AsyncSession, user_id: uuid.UUID, rows: list[dict]) -> None:
+        """Decrypts the entry fields of row dicts in place, a whole page at a time.
+
+        Large batches run on a worker thread so AES-GCM never blocks the event loop.
+        """
+        if not rows:
+            return
+
+        data_key: 'AESGCM | None' = await self.parent.users.get_data_key(session, user_id)
+        if not data_key:
+            # Nothing can be encrypted before the user has a key
+            for row in rows:
+                del row['encrypted']
+            return
+
+        if len(rows) < CRYPTO_THREAD_MIN_ROWS:
+            self.parent.cipher.decrypt_rows(data_key, rows)
+        else:
+            await asyncio.to_thread(self.parent.cipher.decrypt_rows, data_key, rows)
+
+    async def apply_bulk_operations(
+        self, session: AsyncSession,
+        user_id: uuid.UUID, operations: list[BulkEntryOperation]
+    ) -> list[BulkEntryResult]:
+        """Applies entry creates, updates and deletes in a single transaction.
+
+        Ownership of every referenced group and entry is checked up front with one
+        query each, operations that fail the check are skipped and reported in
+        their result instead of aborting the whole request.
+        """
+        group_ids: set[uuid.UUID] = {
+            operation.group_id for operation in operations
+            if isinstance(operation, BulkEntryCreate)
+        }
+        entry_ids: set[uuid.UUID] = {
+            operation.entry_id for operation in operations
+            if not isinstance(operation, BulkEntryCreate)
+        }
+
+        owned_groups: set[uuid.UUID] = set()
+        if group_ids:
+            result = await session.exec(
+                select(PasswordGroups.group_id)
+                .where(
+                    PasswordGroups.user_id == user_id,
+                    PasswordGroups.group_id.in_(group_ids)
+                )
+            )
+            owned_groups = set(result.all())
+
+        owned_entries: dict[uuid.UUID, uuid.UUID] = {}
+        if entry_ids:
+            result = await session.exec(
+                select(PasswordEntry.entry_id, PasswordEntry.group_id)
+                .join(PasswordGroups)
+                .where(
+                    PasswordGroups.user_id == user_id,
+                    PasswordEntry.entry_id.in_(entry_ids)
+                )
+            )
+            owned_entries = dict(result.all())
+
+        new_rows: list[dict] = []
+        changed_rows: list[dict] = []
+        deleted_ids: list[uuid.UUID] = []
+
+        touched_entries: set[uuid.UUID] = set()
+        results: list[BulkEntryResult] = []
+
+        for index, operation in enumerate(operations):
+            detail: str | None = None
+            match operation:
+                case BulkEntryCreate(group_id=group_id, data=data):
+                    entry_id = uuid.uuid4()
+                    if group_id not in owned_groups:
+                        detail = "Group not found"
+                    else:
+                        new_rows.append({
+                            'entry_id': entry_id, 'group_id': group_id,
+                            'entry_name': data.entry_name, 'entry_username': data.entry_username,
+                            'entry_password': data.entry_password, 'entry_url': str(data.entry_url)
+                        })
+                case BulkEntryUpdate(entry_id=entry_id) | BulkEntryDelete(entry_id=entry_id):
+                    if entry_id not in owned_entries:
+                        detail = "Password entry not found"
+                    elif entry_id in touched_entries:
+                        detail = "Password entry is already changed by an earlier operation"
+                    elif isinstance(operation, BulkEntryUpdate):
+                        data = operation.data
+                        changed_rows.append({
+                            'entry_id': entry_id,
+                            'entry_name': data.entry_name, 'entry_username': data.entry_username,
+                            'entry_password': data.entry_password, 'entry_url': str(data.entry_url)
+                        })
+                    else:
+                        deleted_ids.append(entry_id)
+
+                    touched_entries.add(entry_id)
+
+            results.append(BulkEntryResult(
+                index=index, op=operation.op,
+                success=detail is None,
+                entry_id=entry_id if detail is None else None,
+                detail=detail
+            ))
+
+        await self.encrypt_rows(session, user_id, new_rows + changed_rows)
+
+        # Every changed row gets its own revision, tombstones included
+        change_count: int = len(new_rows) + len(changed_rows) + len(deleted_ids)
+        if change_count:
+            revision: int = await self.parent.sync.next_revision(session, user_id, change_count)
+            for row in new_rows + changed_rows:
+                row['revision'] = revision
+                revision += 1
+
+            await self.parent.sync.add_tombstones(session, user_id, 'entry', deleted_ids, revision)
+
+            count_deltas: Counter[uuid.UUID] = Counter(row['group_id'] for row in new_rows)
+            count_deltas.subtract(owned_entries[entry_id] for entry_id in deleted_ids)
+            await self.parent.groups.add_entry_counts(session, count_deltas)
+
+        # Multi-row INSERT, bulk UPDATE by primary key and one DELETE ... IN
+        if new_rows:
+            await session.exec(insert(PasswordEntry), params=new_rows)
+        if changed_rows:
+            await session.exec(update(PasswordEntry), params=changed_rows)
+        if deleted_ids:
+            await session.exec(
+                delete(PasswordEntry)
+                .where(PasswordEntry.entry_id.in_(deleted_ids))
+            )
+
+        await session.commit()
+        return results
+
+
+
+class VaultMethods:
+    def __init__(self, parent: MainDatabase):
+        self.parent = parent
+        self.async_engine = parent.async_engine
+
+    async def export_records(
+        self, session: AsyncSession, user_id: uuid.UUID,
+        batch_size: int = 1000
+    ) -> AsyncIterator[list[dict]]:
+        """Yields the user's groups and then their entries in batches of plain dicts.
+
+        Rows are read through server-side cursors, so memory use stays constant
+        regardless of vault size. Groups are ordered so a parent always comes
+        before its children.
+        """
+        root_id = (
+            select(PasswordGroups.group_id)
+            .where(PasswordGroups.user_id == user_id, PasswordGroups.is_root == true())
+            .scalar_subquery()
+        )
+        group_rows = await session.stream(
+            select(PasswordGroups.group_id, PasswordGroups.parent_id, PasswordGroups.group_name)
+            .join(GroupClosure, GroupClosure.descendant_id == PasswordGroups.group_id)
+            .where(PasswordGroups.user_id == user_id, GroupClosure.ancestor_id == root_id)
+            .order_by(GroupClosure.depth)
+            .execution_options(yield_per=batch_size)
+        )
+        async for partition in group_rows.partitions():
+            yield [
+                {
+                    'type': 'group', 'group_id': str(group_id),
+                    'parent_id': str(parent_id) if parent_id else None,
+                    'group_name': group_name
+                }
+                for group_id, parent_id, group_name in partition
+            ]
+
+        # Fetched before the entry cursor is opened, since it can't share the connection
+        data_key: 'AESGCM | None' = await self.parent.users.get_data_key(session, user_id)
+        entry_rows = await session.stream(
+            select(
+                PasswordEntry.entry_id, PasswordEntry.group_id,
+                PasswordEntry.entry_name, PasswordEntry.entry_username,
+                PasswordEntry.entry_password, PasswordEntry.entry_url,
+                PasswordEntry.encrypted
+            )
+            .join(PasswordGroups)
+            .where(PasswordGroups.user_id == user_id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for partition in entry_rows.partitions():
+            records: list[dict] = [
+                {
+                    'type': 'entry', 'entry_id': entry.entry_id,
+                    'group_id': str(entry.group_id), 'entry_name': entry.entry_name,
+                    'entry_username': entry.entry_username,
+                    'entry_password': entry.entry_password,
+                    'entry_url': entry.entry_url, 'encrypted': entry.encrypted
+                }
+                for entry in partition
+            ]
+            if data_key:
+                await asyncio.to_thread(self.parent.cipher.decrypt_rows, data_key, records)
+            else:
+                for record in records:
+                    del record['encrypted']
+
+            for record in records:
+                record['entry_id'] = str(record['entry_id'])
+
+            yield records
+
+
+
+class SyncMethods:
+    def __init__(self, parent: MainDatabase):
+        self.parent = parent
+        self.async_engine = parent.async_engine
+
+    async def next_revision(self, session: AsyncSession, user_id: uuid.UUID, count: int = 1) -> int:
+        """Reserves `count` consecutive revisions for the user and returns the first one.
+
+        Bumping the counter locks the user row until the transaction ends, so a user's
+        changes are committed in the same order as their revisions.
+        """
+        result = await session.exec(
+            update(Users)
+            .where(Users.user_id == user_id)
+            .values(revision=Users.revision + count)
+            .returning(Users.revision)
+            .execution_options(synchronize_session=False)
+        )
+        return result.scalar_one() - count + 1
+
+    async def get_revision(self, session: AsyncSession, user_id: uuid.UUID) -> int:
+        result = await session.exec(
+            select(Users.revision).where(Users.user_id == user_id)
+        )
+        return result.one()
+
+    async def add_tombstones(
+        self, session: AsyncSession, user_id: uuid.UUID,
+        object_type: typing.Literal['group', 'entry'],
+        object_ids: list[uuid.UUID], first_revision: int
+    ) -> None:
+        """Records deleted objects with consecutive revisions, without committing."""
+        if not object_ids:
+            return
+
+        await session.exec(
+            insert(SyncTombstones),
+            params=[
+                {
+                    'tombstone_id': uuid.uuid4(), 'user_id': user_id,
+                    'object_type': object_type, 'object_id': object_id,
+                    'revision': first_revision + offset
+                }
+                for offset, object_id in enumerate(object_ids)
+            ]
+        )
+
+    async def get_changes(
+        self, session: AsyncSession, user_id: uuid.UUID,
+        since: int, limit: int = 500
+    ) -> SyncPage:
+        """Returns up to `limit` group, entry and delete changes with a revision above `since`."""
+        group_result = await session.exec(
+            select(
+                PasswordGroups.group_id, PasswordGroups.parent_id,
+                PasswordGroups.group_name, PasswordGroups.revision
+            )
+            .where(
+                PasswordGroups.user_id == user_id,
+                PasswordGroups.revision > since
+            )
+            .order_by(PasswordGroups.revision)
+            .limit(limit + 1)
+        )
+        entry_result = await session.exec(
+            select(PasswordEntry)
+            .join(PasswordGroups)
+            .where(
+                PasswordGroups.user_id == user_id,
+                PasswordEntry.revision > since
+            )
+            .options(*ENTRY_PAGE_LOAD)
+            .order_by(PasswordEntry.revision)
+            .limit(limit + 1)
+        )
+        tombstone_result = await session.exec(
+            select(SyncTombstones)
+            .where(
+                SyncTombstones.user_id == user_id,
+                SyncTombstones.revision > since
+            )
+            .order_by(SyncTombstones.revision)
+            .limit(limit + 1)
+        )
+
+        # Revisions are unique per user, so merging by revision gives a stable page boundary
+        changes: list[SyncGroup | SyncEntry | SyncTombstone] = [
+            SyncGroup.model_construct(
+                group_id=group.group_id, parent_id=group.parent_id,
+                group_name=group.group_name, revision=group.revision
+            )
+            for group in group_result.all()
+        ]
+        entry_rows: list[dict] = [
+            {
+                'entry_id': entry.entry_id, 'group_id': entry.group_id,
+                'entry_name': entry.entry_name, 'entry_username': entry.entry_username,
+                'entry_password': entry.entry_password, 'entry_url': entry.entry_url,
+                'revision': entry.revision, 'encrypted': entry.encrypted
+            }
+            for entry in entry_result.all()
+        ]
+        await self.parent.entries.decrypt_rows(session, user_id, entry_rows)
+
+        changes.extend(SyncEntry.model_construct(**row) for row in entry_rows)
+        changes.extend(
+            SyncTombstone.model_construct(
+                object_type=tombstone.object_type,
+                object_id=tombstone.object_id,
+                revision=tombstone.revision
+            )
+            for tombstone in tombstone_result.all()
+        )
+        changes.sort(key=lambda change: change.revision)
+
+        has_more: bool = len(changes) > limit
+        changes = changes[:limit]
+
+        return SyncPage.model_construct(
+            groups=[change for change in changes if isinstance(change, SyncGroup)],
+            entries=[change for change in changes if isinstance(change, SyncEntry)],
+            deleted=[change for change in changes if isinstance(change, SyncTombstone)],
+            next_since=changes[-1].revision if changes else since,
+            has_more=has_more
+        )
+
 
-database: MainDatabase = MainDatabase(async_engine)
+database: MainDatabase = MainDatabase(async_engine, replica_engines)
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import multiprocessing
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections.abc import Callable
+from typing import Any
+
+# Workers import this module, so it must not pull in the app settings or database
+from .metrics import metrics
+from ..models.pwdcontext import pwd_context
+
+logger: logging.Logger = logging.getLogger("password_manager")
+
+
+class HashPoolFullError(Exception):
+    """Raised when the password hashing queue is already at its maximum depth."""
+
+
+class HashPoolBrokenError(HashPoolFullError):
+    """Raised when the pool broke again right after being replaced, callers should retry later."""
+
+
+def _timed_hash(password: str) -> tuple[str, float]:
+    started: float = time.perf_counter()
+    hashed_pw: str = pwd_context.hash(password)
+
+    return hashed_pw, time.perf_counter() - started
+
+
+def _timed_verify_and_update(password: str, hashed_pw: str) -> tuple[tuple[bool, str | None], float]:
+    started: float = time.perf_counter()
+    result: tuple[bool, str | None] = pwd_context.verify_and_update(password, hashed_pw)
+
+    return result, time.perf_counter() - started
+
+
+class PasswordHasher:
+    """Runs argon2 hashing in a dedicated process pool with a bounded queue.
+
+    At most `workers + max_queue` hashes are in flight, further calls fail fast
+    with `HashPoolFullError` instead of queueing without limit. A worker dying
+    breaks the whole pool, so it is replaced and the call retried once.
+    """
+    def __init__(self, workers: int, max_queue: int):
+        self.workers: int = workers
+        self.max_queue: int = max_queue
+
+        self._executor: ProcessPoolExecutor | None = None
+        self._in_flight: int = 0
+
+        self.completed: int = 0
+        self.rejected: int = 0
+        self.restarts: int = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def start(self) -> None:
+        if self._executor:
+            return
+
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn')
+        )
+
+    def shutdown(self) -> None:
+        if not self._executor:
+            return
+
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+    async def _run(self, operation: str, func: Callable[..., tuple[Any, float]], *args: Any) -> Any:
+        if self._in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HashPoolFullError("password hashing queue is full")
+
+        self.start()
+        loop = asyncio.get_running_loop()
+
+        self._in_flight += 1
+        submitted: float = time.perf_counter()
+        try:
+            executor: ProcessPoolExecutor = self._executor
+            try:
+                result, hash_seconds = await loop.run_in_executor(executor, func, *args)
+            except BrokenProcessPool:
+                self._replace_broken_pool(executor)
+
+                executor = self._executor
+                try:
+                    result, hash_seconds = await loop.run_in_executor(executor, func, *args)
+                except BrokenProcessPool as exc:
+                    self._replace_broken_pool(executor)
+                    raise HashPoolBrokenError("password hashing pool is restarting") from exc
+        finally:
+            self._in_flight -= 1
+
+        # Everything that is not hashing is time spent waiting for a worker
+        total_seconds: float = time.perf_counter() - submitted
+        self.completed += 1
+
+        metrics.hash_seconds.observe(hash_seconds, operation)
+        metrics.hash_queue_wait_seconds.observe(max(total_seconds - hash_seconds, 0.0), operation)
+
+        return result
+
+    def _replace_broken_pool(self, broken: ProcessPoolExecutor) -> None:
+        # Calls that failed on the same pool replace it only once
+        if self._executor is not broken:
+            self.start()
+            return
+
+        logger.warning("Password hashing worker died, replacing the process pool")
+        self.restarts += 1
+
+        self.shutdown()
+        self.start()
+
+    async def hash(self, password: str) -> str:
+        return await self._run('hash', _timed_hash, password)
+
+    async def verify_and_update(self, password: str, hashed_pw: str) -> tuple[bool, str | None]:
+        return await self._run('verify', _timed_verify_and_update, password, hashed_pw)
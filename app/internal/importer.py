@@ -0,0 +1,285 @@
+import codecs
+import csv
+import json
+import logging
+import time
+import uuid
+
+from collections.abc import AsyncIterator
+
+from asyncpg import PostgresError
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .database import database, GroupTooDeepError, MAX_GROUP_TREE_DEPTH
+from ..models.entries import EntryCreate
+from ..models.vault import ImportFormat, ImportReport, ImportRowError
+
+logger: logging.Logger = logging.getLogger("password_manager")
+
+DEFAULT_BATCH_SIZE: int = 5000
+MAX_REPORTED_ERRORS: int = 100
+
+# Header of the CSV format, `group_path` is relative to Root like "Work/Servers"
+CSV_COLUMNS: tuple[str, ...] = (
+    'group_path', 'entry_name', 'entry_username',
+    'entry_password', 'entry_url'
+)
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Splits a stream of UTF-8 bytes into lines without reading it all into memory."""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    pending: str = ''
+
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split('\n')
+
+        for line in lines:
+            yield line.removesuffix('\r')
+
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending.removesuffix('\r')
+
+
+class VaultImporter:
+    """Loads CSV or NDJSON export data into a user's vault.
+
+    Groups that do not exist yet are created, matching existing groups by name
+    under the same parent. Entries are validated one by one and written in
+    batches, a rejected row is reported without aborting the rest of the load.
+    """
+    def __init__(
+        self, session: AsyncSession, user_id: uuid.UUID,
+        batch_size: int = DEFAULT_BATCH_SIZE
+    ):
+        self.session: AsyncSession = session
+        self.user_id: uuid.UUID = user_id
+        self.batch_size: int = batch_size
+
+        self._root_id: uuid.UUID | None = None
+        self._children: dict[tuple[uuid.UUID, str], uuid.UUID] = {}
+        self._pending: list[tuple[int, tuple]] = []
+
+        self.rows_imported: int = 0
+        self.rows_rejected: int = 0
+        self.groups_created: int = 0
+        self.errors: list[ImportRowError] = []
+
+    async def run(self, chunks: AsyncIterator[bytes], import_format: ImportFormat) -> ImportReport:
+        """Imports the whole stream, raises ValueError if it cannot be parsed at all."""
+        started: float = time.perf_counter()
+        await self._load_groups()
+
+        lines: AsyncIterator[str] = iter_lines(chunks)
+        match import_format:
+            case ImportFormat.csv:
+                records = self._parse_csv(lines)
+            case ImportFormat.ndjson:
+                records = self._parse_ndjson(lines)
+
+        async for line_number, group_id, record in records:
+            await self._add_entry(line_number, group_id, record)
+
+        await self._flush()
+
+        elapsed: float = time.perf_counter() - started
+        return ImportReport(
+            rows_imported=self.rows_imported,
+            rows_rejected=self.rows_rejected,
+            groups_created=self.groups_created,
+            elapsed_seconds=round(elapsed, 3),
+            rows_per_second=round(self.rows_imported / elapsed, 1) if elapsed else 0.0,
+            errors=self.errors
+        )
+
+    def _reject(self, line_number: int, detail: str) -> None:
+        self.rows_rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(ImportRowError(line=line_number, detail=detail))
+
+    async def _load_groups(self) -> None:
+        groups = await database.groups.get_all_groups(self.session, self.user_id)
+        for group_id, parent_id, group_name in groups:
+            if parent_id is None:
+                self._root_id = group_id
+                continue
+
+            # Keep the first group when siblings share a name
+            self._children.setdefault((parent_id, group_name), group_id)
+
+        # Ends the read transaction, so later writes don't start from an old snapshot
+        await self.session.commit()
+
+    async def _get_child_group(self, parent_id: uuid.UUID, group_name: str) -> uuid.UUID:
+        key: tuple[uuid.UUID, str] = (parent_id, group_name)
+        if key not in self._children:
+            async with database.writer():
+                try:
+                    group = await database.groups.create_group(
+                        self.session, self.user_id,
+                        group_name, parent_id=parent_id
+                    )
+                except GroupTooDeepError:
+                    await self.session.rollback()
+                    raise
+            self._children[key] = group.group_id
+            self.groups_created += 1
+
+        return self._children[key]
+
+    async def _parse_csv(self, lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, uuid.UUID, dict]]:
+        header: list[str] | None = None
+        buffered: str = ''
+
+        line_number: int = 0
+        record_line: int = 0
+
+        async for line in lines:
+            line_number += 1
+            if not buffered:
+                record_line = line_number
+
+            # An odd number of quotes means a quoted field continues on the next line
+            buffered = f'{buffered}\n{line}' if buffered else line
+            if buffered.count('"') % 2:
+                continue
+
+            text, buffered = buffered, ''
+            if not text.strip():
+                continue
+
+            fields: list[str] = next(csv.reader([text]))
+            if header is None:
+                missing: set[str] = set(CSV_COLUMNS) - set(fields)
+                if missing:
+                    raise ValueError(f"CSV header is missing columns: {', '.join(sorted(missing))}")
+
+                header = fields
+                continue
+
+            if len(fields) != len(header):
+                self._reject(record_line, f"Expected {len(header)} columns, got {len(fields)}")
+                continue
+
+            record: dict[str, str] = dict(zip(header, fields))
+            group_id: uuid.UUID = self._root_id
+            try:
+                for group_name in record['group_path'].split('/'):
+                    if group_name.strip():
+                        group_id = await self._get_child_group(group_id, group_name.strip())
+            except GroupTooDeepError:
+                self._reject(record_line, f"Group path is more than {MAX_GROUP_TREE_DEPTH} levels deep")
+                continue
+
+            yield record_line, group_id, record
+
+        if buffered:
+            self._reject(record_line, "Unterminated quoted field")
+
+    async def _parse_ndjson(self, lines: AsyncIterator[str]) -> AsyncIterator[tuple[int, uuid.UUID, dict]]:
+        # Group IDs in the export are mapped to the groups they were imported into
+        group_map: dict[str, uuid.UUID] = {}
+        line_number: int = 0
+
+        async for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+
+            try:
+                record = json.loads(line)
+            except ValueError:
+                self._reject(line_number, "Invalid JSON")
+                continue
+
+            if not isinstance(record, dict):
+                self._reject(line_number, "Record is not a JSON object")
+                continue
+
+            match record.get('type'):
+                case 'header':
+                    continue
+                case 'group':
+                    exported_id = record.get('group_id')
+                    parent_id = record.get('parent_id')
+                    group_name = record.get('group_name')
+
+                    if parent_id is None:
+                        group_map[exported_id] = self._root_id
+                    elif parent_id not in group_map:
+                        self._reject(line_number, "Group references an unknown parent group")
+                    elif not isinstance(group_name, str) or not group_name:
+                        self._reject(line_number, "Group name is invalid")
+                    else:
+                        try:
+                            group_map[exported_id] = await self._get_child_group(group_map[parent_id], group_name)
+                        except GroupTooDeepError:
+                            self._reject(line_number, f"Group is more than {MAX_GROUP_TREE_DEPTH} levels deep")
+                case 'entry':
+                    group_id: uuid.UUID | None = group_map.get(record.get('group_id'))
+                    if not group_id:
+                        self._reject(line_number, "Entry references an unknown group")
+                        continue
+
+                    yield line_number, group_id, record
+                case _:
+                    self._reject(line_number, "Unknown record type")
+
+    async def _add_entry(self, line_number: int, group_id: uuid.UUID, record: dict) -> None:
+        try:
+            entry = EntryCreate.model_validate({
+                field: record.get(field) for field in EntryCreate.model_fields
+            })
+        except ValidationError as exc:
+            detail: str = '; '.join(
+                f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}"
+                for error in exc.errors()
+            )
+            self._reject(line_number, detail)
+            return
+
+        row: tuple = (
+            uuid.uuid4(), group_id, entry.entry_name,
+            entry.entry_username, entry.entry_password, str(entry.entry_url)
+        )
+        self._pending.append((line_number, row))
+
+        if len(self._pending) >= self.batch_size:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        # Queued per batch, other writers get a turn while the next batch is parsed
+        async with database.writer():
+            await self._insert_batch(pending)
+
+    async def _insert_batch(self, pending: list[tuple[int, tuple]]) -> None:
+        try:
+            await database.entries.insert_entry_rows(
+                self.session, self.user_id, [row for _, row in pending]
+            )
+            await self.session.commit()
+
+            self.rows_imported += len(pending)
+            return
+        except (SQLAlchemyError, PostgresError):
+            await self.session.rollback()
+            logger.warning("Import batch of %d rows failed, retrying row by row", len(pending), exc_info=True)
+
+        # Slow path to find the rows the database refuses
+        for line_number, row in pending:
+            try:
+                await database.entries.insert_entry_rows(self.session, self.user_id, [row])
+                await self.session.commit()
+
+                self.rows_imported += 1
+            except (SQLAlchemyError, PostgresError):
+                await self.session.rollback()
+                self._reject(line_number, "Rejected by the database")
@@ -0,0 +1,65 @@
+import copy
+import logging
+import queue
+
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler
+
+import orjson
+
+
+class DroppingQueueHandler(QueueHandler):
+    """`QueueHandler` on a bounded queue that never blocks the caller.
+
+    Once the queue is half full only every `sample_rate`-th record below WARNING
+    is kept, and records that find the queue full are dropped. Both are counted
+    in `dropped`.
+    """
+    def __init__(self, log_queue: queue.Queue, sample_rate: int):
+        super().__init__(log_queue)
+        self.sample_rate: int = max(sample_rate, 1)
+        self.sample_above: int = log_queue.maxsize // 2
+
+        self.dropped: int = 0
+        self._sampled: int = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting is left to the listener thread, only the arguments are merged
+        # now since they can change after the call returns
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if record.levelno < logging.WARNING and self.queue.qsize() >= self.sample_above:
+            self._sampled += 1
+            if self._sampled % self.sample_rate:
+                self.dropped += 1
+                return
+
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+    def format(self, record: logging.LogRecord) -> str:
+        data: dict = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'module': record.module,
+            'function': record.funcName,
+            'process': record.process,
+            'message': record.getMessage()
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exception'] = record.exc_text
+
+        return orjson.dumps(data).decode('utf-8')
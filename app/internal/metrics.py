@@ -0,0 +1,249 @@
+import bisect
+import time
+
+from collections.abc import Callable, Iterator
+from typing import Any, TypeVar
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.routing import BaseRoute, NoMatchFound
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1,
+    0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0
+)
+HASH_BUCKETS: tuple[float, ...] = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+POOL_WAIT_BUCKETS: tuple[float, ...] = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+MetricT = TypeVar('MetricT', 'Counter', 'Histogram')
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(label_names: tuple[str, ...], label_values: tuple[str, ...], extra: str = '') -> str:
+    pairs: list[str] = [
+        f'{name}="{_escape(value)}"'
+        for name, value in zip(label_names, label_values)
+    ]
+    if extra:
+        pairs.append(extra)
+
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    metric_type: str = 'counter'
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()):
+        self.name: str = name
+        self.documentation: str = documentation
+        self.label_names: tuple[str, ...] = label_names
+
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def set(self, value: float, *label_values: str) -> None:
+        """Sets the value directly, used by collectors copying a total kept elsewhere."""
+        self._values[label_values] = value
+
+    def render(self) -> Iterator[str]:
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} {self.metric_type}'
+        for label_values, value in self._values.items():
+            yield f'{self.name}{_format_labels(self.label_names, label_values)} {value}'
+
+
+class Gauge(Counter):
+    metric_type: str = 'gauge'
+
+    def dec(self, *label_values: str, amount: float = 1) -> None:
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram:
+    """Histogram with fixed buckets, an observation is one bisect and three additions."""
+    def __init__(
+        self, name: str, documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        self.name: str = name
+        self.documentation: str = documentation
+        self.label_names: tuple[str, ...] = label_names
+        self.buckets: tuple[float, ...] = buckets
+
+        # Per label set: [count per bucket (last one is +Inf), sum]
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        series = self._values.get(label_values)
+        if not series:
+            series = self._values[label_values] = ([0] * (len(self.buckets) + 1), [0.0])
+
+        counts, total = series
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+
+    def render(self) -> Iterator[str]:
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} histogram'
+        for label_values, (counts, total) in self._values.items():
+            cumulative: int = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                labels: str = _format_labels(self.label_names, label_values, f'le="{bound}"')
+                yield f'{self.name}_bucket{labels} {cumulative}'
+
+            labels = _format_labels(self.label_names, label_values)
+            yield f'{self.name}_sum{labels} {total[0]}'
+            yield f'{self.name}_count{labels} {cumulative}'
+
+
+class MetricsRegistry:
+    """Holds the application metrics and renders them in the Prometheus text format.
+
+    Values owned by other objects (pool status, cache counters) are copied in
+    by collectors when `/metrics` is scraped, so the hot paths never
+    touch them.
+    """
+    def __init__(self):
+        self._metrics: list[Counter | Histogram] = []
+        self._collectors: list[Callable[[], None]] = []
+
+        self.request_seconds: Histogram = self.add(Histogram(
+            'pm_http_request_duration_seconds', 'HTTP request latency by route',
+            ('method', 'route', 'status')
+        ))
+        self.requests_in_flight: Gauge = self.add(Gauge(
+            'pm_http_requests_in_flight', 'HTTP requests currently being served'
+        ))
+
+        self.pool_wait_seconds: Histogram = self.add(Histogram(
+            'pm_db_pool_wait_seconds', 'Time spent waiting to check out a database connection',
+            buckets=POOL_WAIT_BUCKETS
+        ))
+        self.pool_connections: Gauge = self.add(Gauge(
+            'pm_db_pool_connections', 'Database pool connections by state', ('state',)
+        ))
+
+        self.hash_seconds: Histogram = self.add(Histogram(
+            'pm_password_hash_duration_seconds', 'Time argon2 spent hashing in the process pool',
+            ('operation',), HASH_BUCKETS
+        ))
+        self.hash_queue_wait_seconds: Histogram = self.add(Histogram(
+            'pm_password_hash_queue_wait_seconds', 'Time a password hash waited for a free process',
+            ('operation',), POOL_WAIT_BUCKETS
+        ))
+        self.hash_pool: Gauge = self.add(Gauge(
+            'pm_password_hash_pool', 'Password hashing pool state', ('state',)
+        ))
+
+        self.login_limiter_checks: Counter = self.add(Counter(
+            'pm_login_limiter_checks_total', 'Login rate limit checks by limit and result', ('limit', 'result')
+        ))
+        self.login_limiter_keys: Gauge = self.add(Gauge(
+            'pm_login_limiter_keys', 'Buckets tracked by a login rate limit', ('limit',)
+        ))
+
+        self.cache_lookups: Counter = self.add(Counter(
+            'pm_cache_lookups_total', 'In-memory cache lookups by result', ('cache', 'result')
+        ))
+        self.cache_size: Gauge = self.add(Gauge(
+            'pm_cache_entries', 'Items held by an in-memory cache', ('cache',)
+        ))
+
+        self.log_records_dropped: Counter = self.add(Counter(
+            'pm_log_records_dropped_total', 'Log records dropped or sampled out by the log queue'
+        ))
+
+    def add(self, metric: MetricT) -> MetricT:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+
+        return '\n'.join(lines) + '\n'
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """`AsyncAdaptedQueuePool` that records how long each checkout waited."""
+    def _do_get(self) -> Any:
+        started: float = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.pool_wait_seconds.observe(time.perf_counter() - started)
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request by its route template.
+
+    Requests that match no route share one label so unknown paths cannot
+    grow the number of series.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app: ASGIApp = app
+        self._route_labels: dict[int, str] = {}  # By `id()`, routes live as long as the app
+
+    def _route_label(self, scope: Scope) -> str:
+        route: BaseRoute | None = scope.get('route')
+        if route is None:
+            return 'unmatched'
+
+        label: str | None = self._route_labels.get(id(route))
+        if label is None:
+            # Newer FastAPI keeps included routers nested, so `route.path` and its parameters can
+            # miss their prefixes. Reversing the route by name gives the full template on every version
+            placeholders: dict[str, str] = {name: f'{{{name}}}' for name in scope.get('path_params', {})}
+            try:
+                label = str(scope['app'].url_path_for(route.name, **placeholders))
+            except NoMatchFound:
+                label = route.path
+
+            self._route_labels[id(route)] = label
+
+        return label
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status_code: int = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+
+            await send(message)
+
+        metrics.requests_in_flight.inc()
+        started: float = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.requests_in_flight.dec()
+
+            metrics.request_seconds.observe(
+                time.perf_counter() - started,
+                scope['method'], self._route_label(scope), str(status_code)
+            )
+
+
+metrics: MetricsRegistry = MetricsRegistry()
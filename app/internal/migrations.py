@@ -0,0 +1,151 @@
+import logging
+
+from collections import Counter
+
+from sqlalchemy import Connection, bindparam, inspect, select, update
+from sqlmodel import SQLModel
+
+from .crypto import CIPHERTEXT_PREFIX, ENCRYPTED_ENTRY_FIELDS
+from ..models.dbtables import Users, PasswordGroups, PasswordEntry
+
+logger: logging.Logger = logging.getLogger("password_manager")
+
+# Columns added to tables that already existed in v0.1.0, `create_all` only creates missing
+# tables. Definitions are valid for ALTER TABLE ... ADD COLUMN on both Postgres and SQLite
+ADDED_COLUMNS: tuple[tuple[str, str, str], ...] = (
+    ('users', 'revision', 'BIGINT NOT NULL DEFAULT 0'),
+    ('users', 'wrapped_data_key', 'VARCHAR(100)'),
+    ('passwordgroups', 'revision', 'BIGINT NOT NULL DEFAULT 0'),
+    ('passwordgroups', 'entry_count', 'INTEGER NOT NULL DEFAULT 0'),
+    ('passwordgroups', 'child_count', 'INTEGER NOT NULL DEFAULT 0'),
+    ('passwordgroups', 'subtree_entry_count', 'INTEGER NOT NULL DEFAULT 0'),
+    ('passwordentry', 'revision', 'BIGINT NOT NULL DEFAULT 0'),
+    ('passwordentry', 'encrypted', 'BOOLEAN NOT NULL DEFAULT FALSE'),
+)
+COUNT_COLUMNS: frozenset[str] = frozenset({
+    'passwordgroups.entry_count', 'passwordgroups.child_count', 'passwordgroups.subtree_entry_count'
+})
+
+
+def create_schema(conn: Connection) -> set[str]:
+    """Creates missing tables and upgrades existing ones, returns the `table.column` names added."""
+    existing_tables: set[str] = set(inspect(conn).get_table_names())
+    SQLModel.metadata.create_all(conn)
+
+    if 'users' not in existing_tables:
+        return set()
+
+    added: set[str] = _add_columns(conn)
+    if conn.dialect.name == 'postgresql':
+        _drop_group_owner_not_null(conn)
+    elif _group_owner_required(conn):
+        logger.warning(
+            "passwordgroups.user_id can't be made nullable on SQLite, "
+            "recreate the database if large group deletions fail"
+        )
+
+    # Indexes of new columns, and indexes added to existing tables
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+    if {'passwordgroups.revision', 'passwordentry.revision'} & added:
+        _backfill_revisions(conn)
+
+    if 'passwordentry.encrypted' in added and 'users.wrapped_data_key' not in added:
+        _mark_encrypted_entries(conn)
+
+    if added:
+        logger.info("Upgraded the database schema, added %s", ', '.join(sorted(added)))
+
+    return added
+
+
+def _add_columns(conn: Connection) -> set[str]:
+    inspector = inspect(conn)
+    columns: dict[str, set[str]] = {}
+
+    added: set[str] = set()
+    for table_name, column_name, definition in ADDED_COLUMNS:
+        if table_name not in columns:
+            columns[table_name] = {column['name'] for column in inspector.get_columns(table_name)}
+
+        if column_name in columns[table_name]:
+            continue
+
+        conn.exec_driver_sql(f'ALTER TABLE {table_name} ADD COLUMN {column_name} {definition}')
+        added.add(f'{table_name}.{column_name}')
+
+    return added
+
+
+def _group_owner_required(conn: Connection) -> bool:
+    user_id = next(column for column in inspect(conn).get_columns('passwordgroups') if column['name'] == 'user_id')
+    return not user_id['nullable']
+
+
+def _drop_group_owner_not_null(conn: Connection) -> None:
+    # Groups waiting for a background delete have no owner
+    if _group_owner_required(conn):
+        conn.exec_driver_sql('ALTER TABLE passwordgroups ALTER COLUMN user_id DROP NOT NULL')
+
+
+def _backfill_revisions(conn: Connection) -> None:
+    """Gives rows from before the sync feed unique revisions, so a full sync returns them.
+
+    Groups come before entries, and each user's revision is moved past their last row.
+    """
+    groups = PasswordGroups.__table__
+    entries = PasswordEntry.__table__
+    users = Users.__table__
+
+    next_revisions: Counter = Counter()
+
+    group_rows: list[dict] = []
+    for user_id, group_id in conn.execute(
+        select(groups.c.user_id, groups.c.group_id)
+        .where(groups.c.revision == 0, groups.c.user_id.is_not(None))
+    ):
+        next_revisions[user_id] += 1
+        group_rows.append({'row_id': group_id, 'row_revision': next_revisions[user_id]})
+
+    entry_rows: list[dict] = []
+    for user_id, entry_id in conn.execute(
+        select(groups.c.user_id, entries.c.entry_id)
+        .join(groups, groups.c.group_id == entries.c.group_id)
+        .where(entries.c.revision == 0, groups.c.user_id.is_not(None))
+    ):
+        next_revisions[user_id] += 1
+        entry_rows.append({'row_id': entry_id, 'row_revision': next_revisions[user_id]})
+
+    if group_rows:
+        conn.execute(
+            update(groups).where(groups.c.group_id == bindparam('row_id'))
+            .values(revision=bindparam('row_revision')),
+            group_rows
+        )
+    if entry_rows:
+        conn.execute(
+            update(entries).where(entries.c.entry_id == bindparam('row_id'))
+            .values(revision=bindparam('row_revision')),
+            entry_rows
+        )
+    if next_revisions:
+        conn.execute(
+            update(users).where(users.c.user_id == bindparam('row_id'))
+            .values(revision=users.c.revision + bindparam('row_revision')),
+            [{'row_id': user_id, 'row_revision': revision} for user_id, revision in next_revisions.items()]
+        )
+
+
+def _mark_encrypted_entries(conn: Connection) -> None:
+    """Flags entries encrypted before the `encrypted` column existed.
+
+    Only databases that already had data keys can hold ciphertext, v0.1.0 ones are all plaintext.
+    """
+    entries = PasswordEntry.__table__
+    conn.execute(
+        update(entries)
+        .where(*(entries.c[field].startswith(CIPHERTEXT_PREFIX) for field in ENCRYPTED_ENTRY_FIELDS))
+        .values(encrypted=True)
+    )
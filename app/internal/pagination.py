@@ -0,0 +1,29 @@
+import base64
+import binascii
+import json
+import uuid
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor was not made by `encode_cursor`."""
+
+
+def encode_cursor(*values: str | int | uuid.UUID) -> str:
+    """Encodes the sort key of the last row on a page into an opaque cursor."""
+    key: list[str | int] = [str(value) if isinstance(value, uuid.UUID) else value for value in values]
+    raw: bytes = json.dumps(key, separators=(',', ':')).encode('utf-8')
+
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> list[str | int]:
+    padded: str = cursor + '=' * (-len(cursor) % 4)
+    try:
+        key = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError, binascii.Error) as exc:
+        raise InvalidCursorError("cursor is invalid") from exc
+
+    if not isinstance(key, list):
+        raise InvalidCursorError("cursor is invalid")
+
+    return key
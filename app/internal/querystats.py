@@ -0,0 +1,111 @@
+import logging
+import time
+import typing
+
+from collections import Counter
+from contextvars import ContextVar
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import settings
+
+if typing.TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger: logging.Logger = logging.getLogger("password_manager")
+
+REPORTED_STATEMENTS: int = 5
+
+
+class QueryStats:
+    """Number of queries and time spent in the database during one request."""
+    __slots__ = ('count', 'seconds', 'statements')
+
+    def __init__(self):
+        self.count: int = 0
+        self.seconds: float = 0.0
+        self.statements: Counter[str] = Counter()
+
+    def repeated_statements(self) -> list[tuple[str, int]]:
+        """Statements run more than once, the usual sign of an N+1 loop."""
+        return [
+            (statement, count)
+            for statement, count in self.statements.most_common(REPORTED_STATEMENTS)
+            if count > 1
+        ]
+
+
+# Set by `QueryBudgetMiddleware`, queries outside of a request (background tasks) are not counted
+current_stats: ContextVar[QueryStats | None] = ContextVar('current_stats', default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if current_stats.get() is not None:
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats: QueryStats | None = current_stats.get()
+    if stats is None:
+        return
+
+    started: list[float] = conn.info.get('query_started')
+    if started:
+        stats.seconds += time.perf_counter() - started.pop()
+
+    stats.count += 1
+    stats.statements[statement] += 1
+
+
+def install_query_hooks(async_engine: 'AsyncEngine') -> None:
+    """Registers the counting hooks on an engine, safe to call more than once."""
+    sync_engine = async_engine.sync_engine
+    if event.contains(sync_engine, 'before_cursor_execute', _before_cursor_execute):
+        return
+
+    event.listen(sync_engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(sync_engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+class QueryBudgetMiddleware:
+    """ASGI middleware counting the SQL queries each request runs.
+
+    Outside of `prod`, the totals are sent back as `X-DB-Query-Count` and a
+    `Server-Timing` entry. A request running more than `QUERY_BUDGET` queries
+    is logged with its most repeated statements.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app: ASGIApp = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = current_stats.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            if message['type'] == 'http.response.start' and settings.ENVIRONMENT != 'prod':
+                headers = MutableHeaders(scope=message)
+                headers['X-DB-Query-Count'] = str(stats.count)
+                headers.append('Server-Timing', f'db;dur={stats.seconds * 1000:.2f}')
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_stats.reset(token)
+
+        if 0 < settings.QUERY_BUDGET < stats.count:
+            repeated: str = ''.join(
+                f"\n  {count}x {' '.join(statement.split())}"
+                for statement, count in stats.repeated_statements()
+            )
+            logger.warning(
+                "%s %s ran %d queries (budget %d) in %.1f ms, repeated statements:%s",
+                scope['method'], scope['path'], stats.count, settings.QUERY_BUDGET,
+                stats.seconds * 1000, repeated or ' none'
+            )
@@ -0,0 +1,85 @@
+import time
+
+from collections import OrderedDict
+
+from .config import settings
+from .metrics import metrics
+
+
+class TokenBucketLimiter:
+    """In-memory token buckets keyed by string, one bucket per key.
+
+    Each bucket holds up to `capacity` tokens and refills at `refill_rate`
+    tokens per second. Only the `max_keys` most recently used buckets are
+    kept, an evicted key starts again with a full bucket.
+    """
+    def __init__(self, capacity: float, refill_rate: float, max_keys: int):
+        self.capacity: float = capacity
+        self.refill_rate: float = refill_rate
+        self.max_keys: int = max_keys
+
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self.allowed: int = 0
+        self.rejected: int = 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def acquire(self, key: str) -> float:
+        """Takes a token for `key`, returns 0 if allowed or the seconds until one is available."""
+        now: float = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (self.capacity, now))
+
+        tokens = min(self.capacity, tokens + (now - updated_at) * self.refill_rate)
+        if tokens >= 1:
+            tokens -= 1
+            retry_after: float = 0.0
+            self.allowed += 1
+        else:
+            retry_after = (1 - tokens) / self.refill_rate
+            self.rejected += 1
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        return retry_after
+
+
+class LoginRateLimiter:
+    """Throttles login attempts per client IP and per username before any hashing is done."""
+    def __init__(self):
+        self.enabled: bool = settings.LOGIN_RATE_LIMIT_ENABLED
+        self.by_ip = TokenBucketLimiter(
+            settings.LOGIN_IP_BURST,
+            settings.LOGIN_IP_PER_MINUTE / 60,
+            settings.LOGIN_LIMITER_MAX_KEYS
+        )
+        self.by_username = TokenBucketLimiter(
+            settings.LOGIN_USERNAME_BURST,
+            settings.LOGIN_USERNAME_PER_MINUTE / 60,
+            settings.LOGIN_LIMITER_MAX_KEYS
+        )
+
+    def check(self, username: str, client_ip: str | None) -> float:
+        """Returns 0 if the attempt may proceed, otherwise the seconds to wait."""
+        if not self.enabled:
+            return 0.0
+
+        if client_ip:
+            retry_after: float = self.by_ip.acquire(client_ip)
+            if retry_after:
+                return retry_after
+
+        return self.by_username.acquire(username)
+
+    def collect_metrics(self) -> None:
+        for limit_name, limiter in (('ip', self.by_ip), ('username', self.by_username)):
+            metrics.login_limiter_checks.set(limiter.allowed, limit_name, 'allowed')
+            metrics.login_limiter_checks.set(limiter.rejected, limit_name, 'rejected')
+            metrics.login_limiter_keys.set(len(limiter), limit_name)
+
+
+login_limiter = LoginRateLimiter()
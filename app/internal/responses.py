@@ -0,0 +1,28 @@
+import typing
+
+import orjson
+
+from fastapi.responses import JSONResponse
+from pydantic import AnyUrl, BaseModel
+
+
+def _encode_trusted(obj: typing.Any) -> typing.Any:
+    # Called by orjson for types it does not know, nested models are written field by field
+    if isinstance(obj, BaseModel):
+        return obj.__dict__
+
+    if isinstance(obj, AnyUrl):
+        return str(obj)
+
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response for read endpoints that return already trusted data.
+
+    Models built with `model_construct()` from database rows are encoded with orjson as
+    they are, skipping the validation FastAPI does on a returned value. Endpoints
+    returning this should still set `response_model` so the OpenAPI schema is kept.
+    """
+    def render(self, content: typing.Any) -> bytes:
+        return orjson.dumps(content, default=_encode_trusted)
@@ -0,0 +1,135 @@
+import asyncio
+import contextlib
+import logging
+import uuid
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .config import settings
+from .database import database
+
+logger: logging.Logger = logging.getLogger("password_manager")
+
+
+class SessionReaper:
+    """Periodically deletes expired `UserSessions` rows in bounded batches.
+
+    Every worker runs its own reaper, deleting the same expired rows twice is harmless.
+    """
+    def __init__(self, interval: float, batch_size: int):
+        self.interval: float = interval
+        self.batch_size: int = batch_size
+
+        self._task: asyncio.Task | None = None
+        self.purged_total: int = 0
+
+    def start(self) -> None:
+        if self.interval <= 0 or self._task:
+            return
+
+        self._task = asyncio.create_task(self._run(), name='session-reaper')
+
+    async def stop(self) -> None:
+        if not self._task:
+            return
+
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+
+        self._task = None
+
+    async def purge_once(self) -> int:
+        purged: int = 0
+        async with AsyncSession(database.async_engine) as session:
+            while True:
+                async with database.writer():
+                    batch_purged: int = await database.sessions.purge_expired_sessions(session, self.batch_size)
+                purged += batch_purged
+
+                if batch_purged < self.batch_size:
+                    break
+
+                # Let requests waiting on the same tables through between batches
+                await asyncio.sleep(0)
+
+        self.purged_total += purged
+        return purged
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                purged: int = await self.purge_once()
+                if purged:
+                    logger.info("Purged %d expired sessions", purged)
+            except Exception:
+                logger.error("Could not purge expired sessions:", exc_info=True)
+
+            await asyncio.sleep(self.interval)
+
+
+class GroupPurger:
+    """Purges the subtrees of queued `GroupDeleteJobs` in bounded batches.
+
+    Queuing a job wakes the purger of the same worker, the interval picks up jobs
+    left over from a restart or queued by another worker.
+    """
+    def __init__(self, interval: float, batch_size: int):
+        self.interval: float = interval
+        self.batch_size: int = batch_size
+
+        self._task: asyncio.Task | None = None
+        self._wakeup: asyncio.Event = asyncio.Event()
+
+    def start(self) -> None:
+        if self._task:
+            return
+
+        self._task = asyncio.create_task(self._run(), name='group-purger')
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    async def stop(self) -> None:
+        if not self._task:
+            return
+
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+
+        self._task = None
+
+    async def purge_once(self) -> int:
+        """Runs every pending job to completion and returns how many there were."""
+        async with AsyncSession(database.async_engine) as session:
+            job_ids: list[uuid.UUID] = await database.groups.get_pending_delete_jobs(session)
+            for job_id in job_ids:
+                while True:
+                    async with database.writer():
+                        job_done: bool = await database.groups.purge_delete_job(session, job_id, self.batch_size)
+
+                    if job_done:
+                        break
+
+                    # Let requests waiting on the same tables through between batches
+                    await asyncio.sleep(0)
+
+        return len(job_ids)
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                finished: int = await self.purge_once()
+                if finished:
+                    logger.info("Finished %d group delete jobs", finished)
+            except Exception:
+                logger.error("Could not purge deleted groups:", exc_info=True)
+
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), self.interval if self.interval > 0 else None)
+
+
+session_reaper = SessionReaper(settings.SESSION_REAPER_INTERVAL, settings.SESSION_REAPER_BATCH_SIZE)
+group_purger = GroupPurger(settings.GROUP_PURGER_INTERVAL, settings.GROUP_DELETE_BATCH_SIZE)
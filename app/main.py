@@ -8,7 +8,11 @@ from fastapi import FastAPI
 from .version import __version__
 from .internal.database import database
 from .internal.config import log_conf, settings
-from .routers import main
+from .internal.metrics import metrics, MetricsMiddleware
+from .internal.querystats import QueryBudgetMiddleware
+from .internal.ratelimit import login_limiter
+from .internal.tasks import session_reaper, group_purger
+from .routers import main, metrics as metrics_router
 
 
 @asynccontextmanager
@@ -22,9 +26,19 @@ async def app_lifespan(app: FastAPI) -> AsyncIterator[None]:
         logger.critical("Database startup failed:", exc_info=True)
         raise
 
+    session_reaper.start()
+    group_purger.start()
+
+    if settings.METRICS_ENABLED:
+        metrics.add_collector(database.collect_metrics)
+        metrics.add_collector(log_conf.collect_metrics)
+        metrics.add_collector(login_limiter.collect_metrics)
+
     logger.info("Application started, running version '%s'", __version__)
     yield
 
+    await session_reaper.stop()
+    await group_purger.stop()
     try:
         await database.close()
     except Exception:
@@ -32,6 +46,7 @@ async def app_lifespan(app: FastAPI) -> AsyncIterator[None]:
         raise
 
     logger.info("Application stopped")
+    log_conf.stop_logging()
 
 
 app = FastAPI(
@@ -47,3 +62,8 @@ app = FastAPI(
     }
 )
 app.include_router(main.router)
+app.add_middleware(QueryBudgetMiddleware)
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router.router)
@@ -1,8 +1,11 @@
+import uuid
+
 from typing import Literal
 from pydantic import BaseModel
 
 
 class UserInfo(BaseModel):
+    user_id: uuid.UUID
     username: str
 
 
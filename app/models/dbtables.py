@@ -3,7 +3,7 @@ import uuid
 import secrets
 
 from datetime import datetime, timedelta, timezone
-from sqlmodel import Column, SQLModel, Field, DateTime, Relationship, TypeDecorator
+from sqlmodel import Column, SQLModel, Field, DateTime, Relationship, TypeDecorator, Index, BigInteger
 
 
 class TZDateTime(TypeDecorator):
@@ -29,15 +29,23 @@ class UserBase(SQLModel):
     hashed_password: str = Field(max_length=100, nullable=False)
 
 
+# Relationships are never loaded implicitly, each query in `internal/database.py`
+# picks what it needs through one of the loader profiles defined there.
 class Users(UserBase, table=True):
+    # Last sync revision handed out to this user's groups, entries and tombstones
+    revision: int = Field(default=0, nullable=False, sa_type=BigInteger)
+
+    # Data key for the user's entries, wrapped by `ENTRY_MASTER_KEY`
+    wrapped_data_key: str | None = Field(default=None, max_length=100)
+
     sessions: list['UserSessions'] = Relationship(
         back_populates='user', 
-        sa_relationship_kwargs={'lazy': 'selectin'},
+        sa_relationship_kwargs={'lazy': 'raise'},
         passive_deletes='all'
     )
     groups: list['PasswordGroups'] = Relationship(
         back_populates='user',
-        sa_relationship_kwargs={'lazy': 'selectin'},
+        sa_relationship_kwargs={'lazy': 'raise'},
         passive_deletes='all'
     )
 
@@ -59,7 +67,7 @@ class UserSessions(SQLModel, table=True):
     user_id: uuid.UUID = Field(foreign_key='users.user_id', ondelete='CASCADE')
     user: Users = Relationship(
         back_populates='sessions', 
-        sa_relationship_kwargs={'lazy': 'selectin'}
+        sa_relationship_kwargs={'lazy': 'raise'}
     )
 
 
@@ -68,35 +76,85 @@ class PasswordGroups(SQLModel, table=True):
     group_id: uuid.UUID = Field(primary_key=True, default_factory=uuid.uuid4)
     group_name: str = Field(min_length=1, nullable=False, index=True)
 
-    user_id: uuid.UUID = Field(foreign_key='users.user_id', ondelete='CASCADE')
+    # NULL while the group is waiting to be purged by a `GroupDeleteJobs` row, which hides
+    # it from every query filtering on the owner. It still cascades through `parent_id`
+    user_id: uuid.UUID | None = Field(foreign_key='users.user_id', ondelete='CASCADE')
     parent_id: uuid.UUID | None = Field(foreign_key='passwordgroups.group_id', ondelete='CASCADE')
 
     is_root: bool = Field(default=False, nullable=False)
+    revision: int = Field(default=0, nullable=False, index=True, sa_type=BigInteger)
+
+    # Kept up to date by every write, `PasswordGroupMethods.recount_groups()` repairs drift
+    entry_count: int = Field(default=0, nullable=False)
+    child_count: int = Field(default=0, nullable=False)
+    subtree_entry_count: int = Field(default=0, nullable=False)
 
     # Self-referential relationships
     parent_group: Optional['PasswordGroups'] = Relationship(
         back_populates='child_groups',
-        sa_relationship_kwargs={'lazy': 'selectin', 'remote_side': 'PasswordGroups.group_id'}
+        sa_relationship_kwargs={'lazy': 'raise', 'remote_side': 'PasswordGroups.group_id'}
     )
     child_groups: list['PasswordGroups'] = Relationship(
         back_populates='parent_group',
-        sa_relationship_kwargs={'lazy': 'selectin'},
+        sa_relationship_kwargs={'lazy': 'raise'},
         passive_deletes='all'
     )
 
     entries: list['PasswordEntry'] = Relationship(
         back_populates='group',
-        sa_relationship_kwargs={'lazy': 'selectin'},
+        sa_relationship_kwargs={'lazy': 'raise'},
         passive_deletes='all'
     )
     user: Users = Relationship(
         back_populates='groups', 
-        sa_relationship_kwargs={'lazy': 'selectin'}
+        sa_relationship_kwargs={'lazy': 'raise'}
+    )
+
+
+# Every (ancestor, descendant) pair of the group hierarchy, a group is its own ancestor at depth 0.
+# Kept in sync by `PasswordGroupMethods` on create and move, deletes cascade from `PasswordGroups`
+class GroupClosure(SQLModel, table=True):
+    __table_args__ = (
+        Index('ix_groupclosure_descendant', 'descendant_id', 'depth'),
+    )
+
+    ancestor_id: uuid.UUID = Field(
+        primary_key=True, foreign_key='passwordgroups.group_id', ondelete='CASCADE'
+    )
+    descendant_id: uuid.UUID = Field(
+        primary_key=True, foreign_key='passwordgroups.group_id', ondelete='CASCADE'
+    )
+    depth: int = Field(nullable=False)
+
+
+# Large group deletions purged in batches by `GroupPurger`, the row is kept as the job's status
+class GroupDeleteJobs(SQLModel, table=True):
+    job_id: uuid.UUID = Field(primary_key=True, default_factory=uuid.uuid4)
+    user_id: uuid.UUID = Field(foreign_key='users.user_id', ondelete='CASCADE', index=True)
+
+    group_id: uuid.UUID = Field(nullable=False)  # Not a foreign key, the group is gone when the job is done
+    status: str = Field(max_length=10, nullable=False, default='pending', index=True)  # 'pending' or 'done'
+
+    total_groups: int = Field(nullable=False)
+    total_entries: int = Field(nullable=False)
+    deleted_groups: int = Field(default=0, nullable=False)
+    deleted_entries: int = Field(default=0, nullable=False)
+
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_column=Column(TZDateTime)
     )
+    finished_at: datetime | None = Field(default=None, sa_column=Column(TZDateTime))
 
 
-# TODO: Add metadata and encryption
+# TODO: Add metadata
+# `entry_username`, `entry_password` and `entry_url` hold ciphertext, see `internal/crypto.py`
 class PasswordEntry(SQLModel, table=True):
+    __table_args__ = (
+        # Stable sort key for keyset pagination of a group's entries
+        Index('ix_passwordentry_group_page', 'group_id', 'entry_name', 'entry_id'),
+    )
+
     entry_id: uuid.UUID = Field(primary_key=True, default_factory=uuid.uuid4)
     entry_name: str = Field(min_length=1, nullable=False, index=True)
 
@@ -104,9 +162,28 @@ class PasswordEntry(SQLModel, table=True):
     entry_password: str = Field(nullable=False)
     
     entry_url: str = Field(nullable=False)
+    revision: int = Field(default=0, nullable=False, index=True, sa_type=BigInteger)
+
+    # Rows from before entry encryption are False until `encrypt_legacy_entries` rewrites them
+    encrypted: bool = Field(default=False, nullable=False)
 
     group_id: uuid.UUID = Field(foreign_key='passwordgroups.group_id', ondelete='CASCADE')
     group: PasswordGroups = Relationship(
         back_populates='entries',
-        sa_relationship_kwargs={'lazy': 'selectin'}
+        sa_relationship_kwargs={'lazy': 'raise'}
+    )
+
+
+# Records deleted groups and entries so sync clients can drop them,
+# a group tombstone also covers everything that was inside the group
+class SyncTombstones(SQLModel, table=True):
+    __table_args__ = (
+        Index('ix_synctombstones_user_revision', 'user_id', 'revision'),
     )
+
+    tombstone_id: uuid.UUID = Field(primary_key=True, default_factory=uuid.uuid4)
+    user_id: uuid.UUID = Field(foreign_key='users.user_id', ondelete='CASCADE')
+
+    object_type: str = Field(max_length=10, nullable=False)  # 'group' or 'entry'
+    object_id: uuid.UUID = Field(nullable=False)
+    revision: int = Field(nullable=False, sa_type=BigInteger)
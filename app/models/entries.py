@@ -1,9 +1,12 @@
 import uuid
 
-from typing import Annotated
+from typing import Annotated, Literal
 from pydantic import BaseModel, Field, AnyUrl
 
 
+BULK_MAX_OPERATIONS: int = 5000
+
+
 class EntryBase(BaseModel):
     entry_name: Annotated[str, Field(min_length=1)]
     entry_username: str
@@ -23,3 +26,48 @@ class EntryUpdate(EntryBase):
 class EntryPublicGet(EntryBase):
     entry_id: uuid.UUID
     group_id: uuid.UUID
+
+
+class EntryPage(BaseModel):
+    entries: list[EntryPublicGet]
+    next_cursor: str | None  # None on the last page
+
+
+class BulkEntryCreate(BaseModel):
+    op: Literal['create']
+    group_id: uuid.UUID
+    data: EntryCreate
+
+
+class BulkEntryUpdate(BaseModel):
+    op: Literal['update']
+    entry_id: uuid.UUID
+    data: EntryUpdate
+
+
+class BulkEntryDelete(BaseModel):
+    op: Literal['delete']
+    entry_id: uuid.UUID
+
+
+BulkEntryOperation = Annotated[
+    BulkEntryCreate | BulkEntryUpdate | BulkEntryDelete,
+    Field(discriminator='op')
+]
+
+
+class BulkEntryRequest(BaseModel):
+    operations: Annotated[list[BulkEntryOperation], Field(min_length=1, max_length=BULK_MAX_OPERATIONS)]
+
+
+class BulkEntryResult(BaseModel):
+    index: int  # Position of the operation in the request
+    op: Literal['create', 'update', 'delete']
+    success: bool
+
+    entry_id: uuid.UUID | None
+    detail: str | None = None  # Reason the operation was skipped
+
+
+class BulkEntryResponse(BaseModel):
+    results: list[BulkEntryResult]
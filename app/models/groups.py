@@ -1,5 +1,6 @@
 import uuid
-from typing import Annotated
+from datetime import datetime
+from typing import Annotated, Literal
 from pydantic import BaseModel, Field
 
 
@@ -20,6 +21,12 @@ class GroupPublic(GroupBase):
     group_id: uuid.UUID
 
 
+class GroupCounts(BaseModel):
+    entry_count: int
+    child_count: int
+    subtree_entry_count: int  # Entries in the group and all of its subgroups
+
+
 class GroupPublicModify(GroupPublic):
     """
     Leave out `child_groups` list for operations like create and rename.
@@ -27,15 +34,19 @@ class GroupPublicModify(GroupPublic):
     pass
 
 
-class GroupPublicGet(GroupPublic):
+class GroupPublicGet(GroupCounts, GroupPublic):
     child_groups: list['GroupPublicChildren']
 
 
 # Leave out child_groups intentionally
-class GroupPublicChildren(GroupPublic):
+class GroupPublicChildren(GroupCounts, GroupPublic):
     parent_id: uuid.UUID
 
 
+class GroupTreeNode(GroupCounts, GroupPublic):
+    child_groups: list['GroupTreeNode']
+
+
 # Simple models
 class GroupRename(BaseModel):
     new_name: GroupName
@@ -43,3 +54,18 @@ class GroupRename(BaseModel):
 
 class GroupMove(BaseModel):
     new_parent_id: uuid.UUID
+
+
+class GroupDeleteJob(BaseModel):
+    """Progress of a large group deletion running in the background."""
+    job_id: uuid.UUID
+    group_id: uuid.UUID
+    status: Literal['pending', 'done']
+
+    total_groups: int
+    total_entries: int
+    deleted_groups: int
+    deleted_entries: int
+
+    created_at: datetime
+    finished_at: datetime | None
@@ -0,0 +1,31 @@
+import uuid
+
+from typing import Literal
+from pydantic import BaseModel
+
+from .entries import EntryPublicGet
+from .groups import GroupPublic
+
+
+class SyncGroup(GroupPublic):
+    revision: int
+
+
+class SyncEntry(EntryPublicGet):
+    revision: int
+
+
+class SyncTombstone(BaseModel):
+    object_type: Literal['group', 'entry']
+    object_id: uuid.UUID
+    revision: int
+
+
+class SyncPage(BaseModel):
+    """Changes after a revision, deleting a group also deletes everything inside it."""
+    groups: list[SyncGroup]
+    entries: list[SyncEntry]
+    deleted: list[SyncTombstone]
+
+    next_since: int  # Pass as `since` to get the next page
+    has_more: bool
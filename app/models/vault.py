@@ -0,0 +1,24 @@
+from enum import StrEnum, auto
+from pydantic import BaseModel
+
+
+class ImportFormat(StrEnum):
+    csv = auto()
+    ndjson = auto()  # The format written by GET /export
+
+
+class ImportRowError(BaseModel):
+    line: int
+    detail: str
+
+
+class ImportReport(BaseModel):
+    rows_imported: int
+    rows_rejected: int
+    groups_created: int
+
+    elapsed_seconds: float
+    rows_per_second: float
+
+    # Only the first rejected rows are listed, `rows_rejected` has the full count
+    errors: list[ImportRowError]
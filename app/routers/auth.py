@@ -1,13 +1,18 @@
+import math
+
 from datetime import datetime, timedelta, timezone
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Form
+from fastapi import APIRouter, Depends, HTTPException, Form, Request
 from fastapi.responses import JSONResponse
 from fastapi.security import OAuth2PasswordRequestFormStrict
 
-from ..deps import UserAuthDep, LoggerDep, SessionDep
+from ..deps import UserAuthDep, LoggerDep, SessionDep, UnqueuedSessionDep
 from ..models.auth import AccessTokenError, AccessTokenResponse, AccessTokenErrorCodes, UserInfoPublic
+from ..internal.config import settings
 from ..internal.database import database
+from ..internal.hashing import HashPoolFullError
+from ..internal.ratelimit import login_limiter
 
 router = APIRouter(prefix='/auth', tags=['auth'])
 
@@ -17,12 +22,14 @@ router = APIRouter(prefix='/auth', tags=['auth'])
     response_model=AccessTokenResponse,
     responses={
         400: {'model': AccessTokenError},
-        401: {'model': AccessTokenError}
+        401: {'model': AccessTokenError},
+        429: {'description': 'Too many login attempts for this username or client, retry after `Retry-After` seconds'},
+        503: {'description': 'Too many logins are being processed, retry after `Retry-After` seconds'}
     }
 )
 async def token_login(
     form_data: Annotated[OAuth2PasswordRequestFormStrict, Depends()],
-    logger: LoggerDep, session: SessionDep
+    logger: LoggerDep, session: UnqueuedSessionDep, request: Request
 ):
     """OAuth2 token login."""
     if len(form_data.username) > 30:
@@ -45,10 +52,26 @@ async def token_login(
             status_code=400
         )
 
+    client_ip: str | None = request.client.host if request.client else None
+    retry_after: float = login_limiter.check(form_data.username, client_ip)
+    if retry_after:
+        raise HTTPException(
+            status_code=429, detail="Too many login attempts, try again later",
+            headers={'Retry-After': str(math.ceil(retry_after))}
+        )
+
     expire_offset: timedelta = timedelta(days=15)
     expiry_date: datetime = datetime.now(timezone.utc) + expire_offset
 
-    verified: bool | str = await database.users.verify_user(session, form_data.username, form_data.password)
+    try:
+        verified: bool | str = await database.users.verify_user(session, form_data.username, form_data.password)
+    except HashPoolFullError as exc:
+        logger.warning("Rejecting login of '%s', %s", form_data.username, exc)
+        raise HTTPException(
+            status_code=503, detail="Server is busy, try again later",
+            headers={'Retry-After': str(settings.HASH_POOL_RETRY_AFTER)}
+        )
+
     match verified:
         case True:
             pass
@@ -65,7 +88,9 @@ async def token_login(
             logger.error("Invalid data: %s", verified)
             raise HTTPException(status_code=500, detail="Internal Server Error")
 
-    token: str = await database.sessions.create_session_token(session, form_data.username, expiry_date)
+    # Only queue behind other writers once argon2 is done
+    async with database.writer():
+        token: str = await database.sessions.create_session_token(session, form_data.username, expiry_date)
     logger.info("User '%s' logged in", form_data.username)
 
     return AccessTokenResponse(
@@ -78,12 +103,11 @@ async def token_login(
 @router.post('/revoke')
 async def revoke_login_token(user: UserAuthDep, token: Annotated[str, Form()], session: SessionDep) -> None:
     """OAuth2 token revocation."""
-    token_valid = await database.sessions.check_session_validity(session, token)
-    if not token_valid:
+    token_info = await database.sessions.get_valid_token_info(session, token)
+    if not token_info:
         return
     
-    token_info = await database.sessions.get_token_info(session, token)
-    if token_info.username != user.username:
+    if token_info.user_id != user.user_id:
         return
     
     await database.sessions.revoke_session(session, token)
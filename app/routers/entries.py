@@ -1,14 +1,22 @@
 import uuid
-from fastapi import APIRouter, HTTPException
-from pydantic import NonNegativeInt, PositiveInt
-from ..deps import UserAuthDep, SessionDep, CheckGroupValidDep
+from fastapi import APIRouter, HTTPException, Response
+from pydantic import PositiveInt
+from ..deps import UserAuthDep, SessionDep, CheckGroupValidDep, ETagDep
 from ..internal.database import database
+from ..internal.pagination import InvalidCursorError
+from ..internal.responses import FastJSONResponse
 from ..models.common import GenericSuccess
-from ..models.entries import EntryPublicGet, EntryCreate, EntryUpdate
+from ..models.entries import (
+    EntryPublicGet, EntryCreate, EntryUpdate, EntryPage,
+    BulkEntryRequest, BulkEntryResponse, BulkEntryResult
+)
 
 # This router is under /groups/{group_id}
 router = APIRouter(prefix='/entries')
 
+# Operations that are not tied to a single group, this router is under /api
+bulk_router = APIRouter(prefix='/entries')
+
 
 @router.post('/')
 async def create_password_entry(
@@ -16,7 +24,7 @@ async def create_password_entry(
     user: UserAuthDep, session: SessionDep
 ) -> EntryPublicGet:
     entry_created: EntryPublicGet = await database.entries.create_entry(
-        session, user.username, group_id, data.entry_name,
+        session, user.user_id, group_id, data.entry_name,
         data.entry_username, data.entry_password, str(data.entry_url)
     )
     if not entry_created:
@@ -25,18 +33,22 @@ async def create_password_entry(
     return entry_created
 
 
-@router.get('/')
+@router.get('/', response_model=EntryPage)
 async def get_group_entries(
-    group_id: CheckGroupValidDep, user: UserAuthDep, 
-    session: SessionDep, amount: PositiveInt = 100,
-    offset: NonNegativeInt = 0
-) -> list[EntryPublicGet]:
-    entries_public: list[EntryPublicGet] = await database.entries.get_entries_by_group(
-        session, user.username, group_id,
-        amount=amount, offset=offset
-    )
+    etag: ETagDep, group_id: CheckGroupValidDep, user: UserAuthDep, 
+    session: SessionDep, response: Response,
+    amount: PositiveInt = 100, cursor: str | None = None
+) -> FastJSONResponse:
+    """Returns a page of entries, pass `next_cursor` as `cursor` to get the next one."""
+    try:
+        entry_page: EntryPage = await database.entries.get_entries_by_group(
+            session, user.user_id, group_id,
+            amount=amount, cursor=cursor
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     
-    return entries_public
+    return FastJSONResponse(entry_page, headers=response.headers)
 
 
 @router.delete('/{entry_id}')
@@ -45,7 +57,7 @@ async def delete_password_entry(
     user: UserAuthDep, session: SessionDep
 ) -> GenericSuccess:
     entry_deleted: bool = await database.entries.delete_entry_by_id(
-        session, user.username, entry_id
+        session, user.user_id, entry_id
     )
     if not entry_deleted:
         raise HTTPException(status_code=404, detail="Password entry not found")
@@ -60,10 +72,26 @@ async def change_entry_data(
     user: UserAuthDep, session: SessionDep
 ) -> EntryPublicGet:
     entry_modified: EntryPublicGet | bool = await database.entries.update_entry_data(
-        session, user.username, entry_id, data.entry_name, 
+        session, user.user_id, entry_id, data.entry_name, 
         data.entry_username, data.entry_password, str(data.entry_url)
     )
     if not entry_modified:
         raise HTTPException(status_code=404, detail="Password entry not found")
     
     return entry_modified
+
+
+@bulk_router.post('/bulk')
+async def bulk_change_entries(
+    data: BulkEntryRequest,
+    user: UserAuthDep, session: SessionDep
+) -> BulkEntryResponse:
+    """Creates, updates and deletes entries across groups in one transaction.
+
+    Operations referencing a group or entry the user does not own are skipped,
+    check `success` and `detail` of each result.
+    """
+    results: list[BulkEntryResult] = await database.entries.apply_bulk_operations(
+        session, user.user_id, data.operations
+    )
+    return BulkEntryResponse(results=results)
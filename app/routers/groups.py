@@ -1,42 +1,77 @@
-from fastapi import APIRouter, HTTPException
+import uuid
+from typing import Annotated
 
-from ..deps import UserAuthDep, SessionDep, CheckGroupValidDep
-from ..internal.database import database
+from fastapi import APIRouter, HTTPException, Query, Response
+
+from ..deps import UserAuthDep, SessionDep, CheckGroupValidDep, ETagDep
+from ..internal.database import database, GroupTooDeepError, MAX_GROUP_TREE_DEPTH
+from ..internal.responses import FastJSONResponse
+from ..internal.tasks import group_purger
 from ..models.common import GenericSuccess
 from ..models.groups import (
-    GroupCreate, GroupPublicGet, GroupRename, 
-    GroupPublicModify, GroupMove
+    GroupCreate, GroupPublic, GroupPublicGet, GroupRename, 
+    GroupPublicModify, GroupMove, GroupTreeNode, GroupDeleteJob
 )
 
 router = APIRouter(prefix='/groups', tags=['groups'])
 group_router = APIRouter(prefix='/{group_id}')
 
 
-@router.get('/')
-async def retrieve_top_level_groups(user: UserAuthDep, session: SessionDep) -> GroupPublicGet:
-    groups: GroupPublicGet = await database.groups.get_children_of_root(session, user.username)
-    return groups
+@router.get('/', response_model=GroupPublicGet)
+async def retrieve_top_level_groups(
+    etag: ETagDep, user: UserAuthDep, 
+    session: SessionDep, response: Response
+) -> FastJSONResponse:
+    groups: GroupPublicGet = await database.groups.get_children_of_root(session, user.user_id)
+    return FastJSONResponse(groups, headers=response.headers)
 
 
 @router.post('/')
 async def create_group(data: GroupCreate, user: UserAuthDep, session: SessionDep) -> GroupPublicModify:
-    if not await database.groups.check_group_exists(session, user.username, data.parent_id):
+    if not await database.groups.check_group_exists(session, user.user_id, data.parent_id):
         raise HTTPException(status_code=400, detail="Parent group not found")
     
     # Allow multiple groups with the same name, they will be referenced by their UUID anyway
-    group_created: GroupPublicModify | bool = await database.groups.create_group(
-        session, user.username,
-        data.group_name, parent_id=data.parent_id
-    )
+    try:
+        group_created: GroupPublicModify | bool = await database.groups.create_group(
+            session, user.user_id,
+            data.group_name, parent_id=data.parent_id
+        )
+    except GroupTooDeepError:
+        raise HTTPException(status_code=400, detail=f"Groups cannot be nested more than {MAX_GROUP_TREE_DEPTH} levels deep")
+
     return group_created
 
 
-@group_router.delete('/')
-async def delete_group(group_id: CheckGroupValidDep, user: UserAuthDep, session: SessionDep) -> GenericSuccess:
-    group_deleted: bool = await database.groups.delete_group(session, user.username, group_id)
+@router.get('/delete_jobs/{job_id}')
+async def get_delete_job(job_id: uuid.UUID, user: UserAuthDep, session: SessionDep) -> GroupDeleteJob:
+    """Returns the progress of a group deletion that was answered with 202."""
+    job: GroupDeleteJob | None = await database.groups.get_delete_job(session, user.user_id, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Delete job not found")
+
+    return job
+
+
+@group_router.delete('/', responses={202: {'model': GroupDeleteJob}})
+async def delete_group(
+    group_id: CheckGroupValidDep, user: UserAuthDep, 
+    session: SessionDep, response: Response
+) -> GenericSuccess | GroupDeleteJob:
+    """Deletes the group and everything inside it.
+
+    Large groups are hidden at once and deleted in the background, the response is
+    then 202 with a job to poll at `/groups/delete_jobs/{job_id}`.
+    """
+    group_deleted: GroupDeleteJob | bool = await database.groups.delete_group(session, user.user_id, group_id)
     if not group_deleted:
         raise HTTPException(status_code=400, detail="Cannot delete top-level group")
     
+    if isinstance(group_deleted, GroupDeleteJob):
+        group_purger.wake()
+        response.status_code = 202
+        return group_deleted
+
     return {'success': True}
 
 
@@ -46,21 +81,45 @@ async def rename_group(
     user: UserAuthDep, session: SessionDep
 ) -> GroupPublicModify:
     group_renamed: GroupPublicModify | bool = await database.groups.rename_group(
-        session, user.username, group_id, data.new_name
+        session, user.user_id, group_id, data.new_name
     )
     
     return group_renamed
 
 
-@group_router.get('/children')
+@group_router.get('/children', response_model=GroupPublicGet)
 async def get_group_children(
-    group_id: CheckGroupValidDep, 
-    user: UserAuthDep, session: SessionDep
-) -> GroupPublicGet:
+    etag: ETagDep, group_id: CheckGroupValidDep, 
+    user: UserAuthDep, session: SessionDep,
+    response: Response
+) -> FastJSONResponse:
     groups: GroupPublicGet = await database.groups.get_children_of_group(
-        session, user.username, group_id
+        session, user.user_id, group_id
     )
-    return groups
+    return FastJSONResponse(groups, headers=response.headers)
+
+
+@group_router.get('/tree', response_model=GroupTreeNode)
+async def get_group_tree(
+    etag: ETagDep, group_id: CheckGroupValidDep,
+    user: UserAuthDep, session: SessionDep, response: Response,
+    depth: Annotated[int, Query(ge=0, le=MAX_GROUP_TREE_DEPTH)] = MAX_GROUP_TREE_DEPTH
+) -> FastJSONResponse:
+    """Returns the nested subtree of a group, `depth` levels deep."""
+    tree: GroupTreeNode = await database.groups.get_group_tree(
+        session, user.user_id, group_id,
+        depth=depth
+    )
+    return FastJSONResponse(tree, headers=response.headers)
+
+
+@group_router.get('/ancestors')
+async def get_group_ancestors(
+    group_id: CheckGroupValidDep,
+    user: UserAuthDep, session: SessionDep
+) -> list[GroupPublic]:
+    """Returns the path from the top-level group down to this group."""
+    return await database.groups.get_ancestors(session, user.user_id, group_id)
 
 
 @group_router.post('/move')
@@ -70,12 +129,18 @@ async def move_to_new_parent(
     session: SessionDep
 ) -> GroupPublicModify:
     """Moves the current group to a new parent."""
-    if await database.groups.check_group_is_root(session, user.username, group_id):
+    if await database.groups.check_group_is_root(session, user.user_id, group_id):
         raise HTTPException(status_code=400, detail="Cannot move the top-level group")
     
-    group_moved: GroupPublicModify | bool = await database.groups.move_to_new_parent(
-        session, user.username, group_id, data.new_parent_id
-    )
+    try:
+        group_moved: GroupPublicModify | bool = await database.groups.move_to_new_parent(
+            session, user.user_id, group_id, data.new_parent_id
+        )
+    except GroupTooDeepError:
+        raise HTTPException(status_code=400, detail=f"Groups cannot be nested more than {MAX_GROUP_TREE_DEPTH} levels deep")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cannot move a group into itself or its subgroups")
+
     if not group_moved:
         raise HTTPException(status_code=404, detail="Parent group not found")
     
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from . import auth, groups, utils, entries
+from . import auth, groups, utils, entries, vault, sync
 
 router = APIRouter(prefix='/api')
 router.include_router(auth.router)
@@ -12,6 +12,10 @@ g_name_router.include_router(entries.router)
 g_main_router.include_router(groups.group_router)
 
 router.include_router(g_main_router)
+router.include_router(entries.bulk_router)
+
+router.include_router(vault.router)
+router.include_router(sync.router)
 
 # Utils/misc
 router.include_router(utils.router)
@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ..internal.metrics import metrics
+
+router = APIRouter(tags=['metrics'])
+
+
+@router.get('/metrics', response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics() -> PlainTextResponse:
+    """Prometheus scrape endpoint, in the text exposition format."""
+    return PlainTextResponse(metrics.render(), media_type='text/plain; version=0.0.4')
@@ -0,0 +1,29 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Query
+from pydantic import NonNegativeInt
+
+from ..deps import UserAuthDep, SessionDep
+from ..internal.database import database
+from ..internal.responses import FastJSONResponse
+from ..models.sync import SyncPage
+
+router = APIRouter(prefix='/sync', tags=['sync'])
+
+MAX_SYNC_PAGE_SIZE: int = 5000
+
+
+@router.get('/', response_model=SyncPage)
+async def get_changes(
+    user: UserAuthDep, session: SessionDep,
+    since: NonNegativeInt = 0,
+    limit: Annotated[int, Query(ge=1, le=MAX_SYNC_PAGE_SIZE)] = 500
+) -> FastJSONResponse:
+    """Returns changed groups and entries, and deleted ones, after revision `since`.
+
+    Start with `since=0` and keep passing `next_since` back while `has_more` is true.
+    """
+    changes: SyncPage = await database.sync.get_changes(
+        session, user.user_id, since, limit=limit
+    )
+    return FastJSONResponse(changes)
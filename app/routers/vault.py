@@ -0,0 +1,91 @@
+import json
+import zlib
+
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..deps import UserAuthDep, UnqueuedUserAuthDep, UnqueuedSessionDep, LoggerDep
+from ..internal.database import database
+from ..internal.importer import VaultImporter
+from ..models.common import UserInfo
+from ..models.vault import ImportFormat, ImportReport
+
+router = APIRouter(tags=['vault'])
+
+EXPORT_FORMAT_VERSION: int = 1
+
+
+async def _export_lines(user: UserInfo, compress: bool) -> AsyncIterator[bytes]:
+    # The request session is closed once the endpoint returns, so the stream uses its own
+    async with AsyncSession(database.async_engine) as session:
+        compressor = zlib.compressobj(wbits=31) if compress else None  # wbits=31 writes a gzip container
+        header: dict = {
+            'type': 'header', 'version': EXPORT_FORMAT_VERSION,
+            'username': user.username,
+            'exported_at': datetime.now(timezone.utc).isoformat()
+        }
+
+        chunk: bytes = (json.dumps(header) + '\n').encode('utf-8')
+        yield compressor.compress(chunk) if compressor else chunk
+
+        async for records in database.vault.export_records(session, user.user_id):
+            chunk = ''.join(json.dumps(record) + '\n' for record in records).encode('utf-8')
+            if not compressor:
+                yield chunk
+                continue
+
+            compressed: bytes = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+
+        if compressor:
+            yield compressor.flush()
+
+
+@router.get('/export', response_class=StreamingResponse)
+async def export_vault(user: UserAuthDep, compress: bool = False) -> StreamingResponse:
+    """Streams the whole vault as NDJSON, one group or entry per line.
+
+    The first line is a header, then all groups (parents before children), then all entries.
+    With `compress`, the stream is gzip-encoded on the fly.
+    """
+    headers: dict[str, str] = {'Content-Disposition': 'attachment; filename="vault.ndjson"'}
+    if compress:
+        headers['Content-Encoding'] = 'gzip'
+
+    return StreamingResponse(
+        _export_lines(user, compress),
+        media_type='application/x-ndjson',
+        headers=headers
+    )
+
+
+@router.post('/import')
+async def import_vault(
+    request: Request, user: UnqueuedUserAuthDep,
+    session: UnqueuedSessionDep, logger: LoggerDep,
+    import_format: Annotated[ImportFormat, Query(alias='format')] = ImportFormat.ndjson
+) -> ImportReport:
+    """Imports a CSV file or an NDJSON export sent as the raw request body.
+
+    CSV needs the columns `group_path,entry_name,entry_username,entry_password,entry_url`.
+    Missing groups are created, and invalid rows are listed in the report instead of
+    failing the import.
+    """
+    importer = VaultImporter(session, user.user_id)
+    try:
+        report: ImportReport = await importer.run(request.stream(), import_format)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    logger.info(
+        "User '%s' imported %d entries (%d rejected) at %.1f rows/s",
+        user.username, report.rows_imported,
+        report.rows_rejected, report.rows_per_second
+    )
+    return report
@@ -0,0 +1,61 @@
+"""Compares two `benchmarks.load` JSON reports endpoint by endpoint.
+
+Typical use is one run per database backend on the same machine:
+
+    DATABASE_BACKEND=postgres python -m benchmarks.load --output postgres.json
+    DATABASE_BACKEND=sqlite python -m benchmarks.load --output sqlite.json
+    python -m benchmarks.compare postgres.json sqlite.json
+"""
+import argparse
+import json
+import sys
+
+from pathlib import Path
+
+COMPARED_FIELDS: tuple[str, ...] = ('rps', 'p50_ms', 'p99_ms')
+
+
+def _label(report: dict, path: Path) -> str:
+    return f"{path.stem} ({report.get('database_backend', '?')})"
+
+
+def _change(before: float, after: float) -> str:
+    if not before:
+        return 'n/a'
+
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.compare', description=__doc__.splitlines()[0])
+    parser.add_argument('baseline', type=Path)
+    parser.add_argument('candidate', type=Path)
+    args = parser.parse_args()
+
+    baseline: dict = json.loads(args.baseline.read_text())
+    candidate: dict = json.loads(args.candidate.read_text())
+
+    print(f"baseline:  {_label(baseline, args.baseline)}")
+    print(f"candidate: {_label(candidate, args.candidate)}")
+    print(f"{'endpoint':<16} {'field':<7} {'baseline':>10} {'candidate':>10} {'change':>9}")
+
+    for name, before in baseline['endpoints'].items():
+        after: dict | None = candidate['endpoints'].get(name)
+        if not after:
+            continue
+
+        for field in COMPARED_FIELDS:
+            print(
+                f"{name:<16} {field:<7} {before[field]:>10.2f} {after[field]:>10.2f} "
+                f"{_change(before[field], after[field]):>9}"
+            )
+
+    print(
+        f"{'total':<16} {'rps':<7} {baseline['total_rps']:>10.2f} {candidate['total_rps']:>10.2f} "
+        f"{_change(baseline['total_rps'], candidate['total_rps']):>9}"
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
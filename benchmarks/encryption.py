@@ -0,0 +1,71 @@
+"""Per-entry latency added by encrypting entries at rest.
+
+Times `EntryCipher.encrypt_rows()` and `EntryCipher.decrypt_rows()` on a page of
+entries, inline and through `asyncio.to_thread()` as the list endpoints do.
+
+Run with `python -m benchmarks.encryption [--entries 10000] [--rounds 20]`.
+"""
+import argparse
+import asyncio
+import copy
+import statistics
+import time
+import uuid
+
+from collections.abc import Callable
+
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from app.internal.crypto import EntryCipher
+from benchmarks.serialization import make_rows
+
+
+def measure(func: Callable[[], object], rounds: int) -> float:
+    func()  # Warm up
+
+    timings: list[float] = []
+    for _ in range(rounds):
+        started: float = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', type=int, default=10_000)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    cipher = EntryCipher(AESGCM.generate_key(bit_length=256), cache_size=1)
+    data_key, _ = cipher.new_data_key(uuid.uuid4())
+
+    plaintext_rows: list[dict] = make_rows(args.entries)
+    encrypted_rows: list[dict] = cipher.encrypt_rows(data_key, copy.deepcopy(plaintext_rows))
+
+    results: dict[str, float] = {
+        'encrypt': measure(
+            lambda: cipher.encrypt_rows(data_key, [row.copy() for row in plaintext_rows]),
+            args.rounds
+        ),
+        'decrypt': measure(
+            lambda: cipher.decrypt_rows(data_key, [row.copy() for row in encrypted_rows]),
+            args.rounds
+        ),
+        'decrypt (thread)': measure(
+            lambda: asyncio.run(asyncio.to_thread(
+                cipher.decrypt_rows, data_key, [row.copy() for row in encrypted_rows]
+            )),
+            args.rounds
+        )
+    }
+
+    print(f"{args.entries} entries per page, median of {args.rounds} rounds")
+    for name, seconds in results.items():
+        per_entry_us: float = seconds / args.entries * 1_000_000
+        print(f"  {name:<17} {seconds * 1000:8.2f} ms/page  {per_entry_us:6.2f} us/entry")
+
+
+if __name__ == '__main__':
+    main()
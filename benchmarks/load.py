@@ -0,0 +1,312 @@
+"""Seeded load test of the real FastAPI app.
+
+Seeds the configured database with benchmark users, each owning a group tree
+filled with entries. Concurrent clients then run a weighted mix of logins,
+tree browsing, entry pages and bulk writes. p50/p99 latency and requests per
+second are reported for each endpoint, and optionally written as JSON so runs
+can be compared.
+
+By default requests go through the app in-process with `httpx.ASGITransport`.
+Pass `--base-url` to load a running server instead, which must use the same
+database and have `LOGIN_RATE_LIMIT_ENABLED=false`.
+
+Run with `python -m benchmarks.load [--users 10] [--concurrency 32] [--duration 30] [--output run.json]`,
+set `DATABASE_BACKEND=sqlite` to run against the embedded backend and compare two
+runs with `python -m benchmarks.compare`.
+"""
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import sys
+import time
+import uuid
+
+from collections.abc import Awaitable, Callable
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.internal.config import settings
+from app.internal.database import database
+from app.internal.ratelimit import login_limiter
+from app.main import app, app_lifespan
+from app.models.dbtables import Users
+
+USERNAME_PREFIX: str = 'bench_'
+PASSWORD: str = 'bench-password'
+BULK_SIZE: int = 50
+
+# Relative weight of each scenario in the request mix
+SCENARIOS: dict[str, int] = {
+    'login': 1,
+    'group_tree': 4,
+    'group_children': 8,
+    'entry_page': 10,
+    'bulk_write': 2
+}
+
+
+@dataclass
+class SeededUser:
+    username: str
+    root_id: uuid.UUID
+    group_ids: list[uuid.UUID] = field(default_factory=list)
+
+
+@dataclass
+class Client:
+    http: httpx.AsyncClient
+    user: SeededUser
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+async def seed(users: int, depth: int, fanout: int, entries_per_group: int) -> list[SeededUser]:
+    """Recreates the benchmark users, each with `fanout ** level` groups per level."""
+    seeded: list[SeededUser] = []
+
+    async with AsyncSession(database.async_engine) as session:
+        for index in range(users):
+            username: str = f'{USERNAME_PREFIX}{index}'
+            await database.users.delete_user(session, username)
+            await database.users.add_user(session, username, PASSWORD)
+
+            user: Users = await database.get_user(session, username)
+            user_id: uuid.UUID = user.user_id  # Read before commits expire the instance
+
+            root = await database.groups.get_children_of_root(session, user_id)
+            seeded_user = SeededUser(username, root.group_id, [root.group_id])
+
+            level: list[uuid.UUID] = [root.group_id]
+            for depth_index in range(depth):
+                next_level: list[uuid.UUID] = []
+                for parent_id in level:
+                    for child_index in range(fanout):
+                        group = await database.groups.create_group(
+                            session, user_id,
+                            f'group {depth_index}-{child_index}', parent_id
+                        )
+                        next_level.append(group.group_id)
+
+                seeded_user.group_ids.extend(next_level)
+                level = next_level
+
+            rows: list[tuple] = [
+                (
+                    uuid.uuid4(), group_id, f'entry {entry_index:05d}',
+                    f'user{entry_index}@example.com', 'correct horse battery staple',
+                    f'https://service{entry_index}.example.com/login'
+                )
+                for group_id in seeded_user.group_ids
+                for entry_index in range(entries_per_group)
+            ]
+            if rows:
+                await database.entries.insert_entry_rows(session, user_id, rows)
+                await session.commit()
+
+            seeded.append(seeded_user)
+
+    return seeded
+
+
+async def login(client: Client) -> httpx.Response:
+    response = await client.http.post(
+        '/api/auth/token',
+        data={'username': client.user.username, 'password': PASSWORD, 'grant_type': 'password'}
+    )
+    if response.status_code == 200:
+        client.headers['Authorization'] = f"Bearer {response.json()['access_token']}"
+
+    return response
+
+
+async def group_tree(client: Client, rng: random.Random) -> httpx.Response:
+    return await client.http.get(f'/api/groups/{client.user.root_id}/tree', headers=client.headers)
+
+
+async def group_children(client: Client, rng: random.Random) -> httpx.Response:
+    group_id: uuid.UUID = rng.choice(client.user.group_ids)
+    return await client.http.get(f'/api/groups/{group_id}/children', headers=client.headers)
+
+
+async def entry_page(client: Client, rng: random.Random) -> httpx.Response:
+    group_id: uuid.UUID = rng.choice(client.user.group_ids)
+    return await client.http.get(
+        f'/api/groups/{group_id}/entries/',
+        params={'amount': 100}, headers=client.headers
+    )
+
+
+async def bulk_write(client: Client, rng: random.Random) -> httpx.Response:
+    group_id: uuid.UUID = rng.choice(client.user.group_ids)
+    operations: list[dict] = [
+        {
+            'op': 'create', 'group_id': str(group_id),
+            'data': {
+                'entry_name': f'bulk {rng.getrandbits(32):08x}', 'entry_username': 'bulk@example.com',
+                'entry_password': 'correct horse battery staple', 'entry_url': 'https://bulk.example.com'
+            }
+        }
+        for _ in range(BULK_SIZE)
+    ]
+    return await client.http.post('/api/entries/bulk', json={'operations': operations}, headers=client.headers)
+
+
+SCENARIO_FUNCS: dict[str, Callable[[Client, random.Random], Awaitable[httpx.Response]]] = {
+    'login': lambda client, rng: login(client),
+    'group_tree': group_tree,
+    'group_children': group_children,
+    'entry_page': entry_page,
+    'bulk_write': bulk_write
+}
+
+
+async def worker(
+    client: Client, rng: random.Random, deadline: float,
+    latencies: dict[str, list[float]], errors: dict[str, int]
+) -> None:
+    names: list[str] = list(SCENARIOS)
+    weights: list[int] = list(SCENARIOS.values())
+
+    await login(client)
+    while time.perf_counter() < deadline:
+        name: str = rng.choices(names, weights)[0]
+
+        started: float = time.perf_counter()
+        try:
+            response = await SCENARIO_FUNCS[name](client, rng)
+            failed: bool = response.status_code >= 400
+        except httpx.HTTPError:
+            failed = True
+
+        latencies[name].append(time.perf_counter() - started)
+        if failed:
+            errors[name] += 1
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+
+    rank: int = math.ceil(fraction * len(sorted_values))
+    return sorted_values[max(rank - 1, 0)]
+
+
+def summarize(latencies: dict[str, list[float]], errors: dict[str, int], elapsed: float) -> dict[str, dict]:
+    results: dict[str, dict] = {}
+    for name, values in latencies.items():
+        values.sort()
+        results[name] = {
+            'requests': len(values),
+            'errors': errors[name],
+            'rps': round(len(values) / elapsed, 2),
+            'p50_ms': round(percentile(values, 0.50) * 1000, 3),
+            'p99_ms': round(percentile(values, 0.99) * 1000, 3),
+            'max_ms': round(values[-1] * 1000, 3) if values else 0.0
+        }
+
+    return results
+
+
+async def run(args: argparse.Namespace) -> dict:
+    started_at: datetime = datetime.now(timezone.utc)
+    async with AsyncExitStack() as stack:
+        if args.base_url:
+            await database.setup()
+            stack.push_async_callback(database.close)
+
+            transport = httpx.AsyncHTTPTransport(limits=httpx.Limits(max_connections=args.concurrency))
+            base_url: str = args.base_url
+        else:
+            await stack.enter_async_context(app_lifespan(app))
+            login_limiter.enabled = False
+
+            transport = httpx.ASGITransport(app=app)
+            base_url = 'http://benchmark'
+
+        seed_started: float = time.perf_counter()
+        users: list[SeededUser] = await seed(args.users, args.depth, args.fanout, args.entries)
+        seed_seconds: float = time.perf_counter() - seed_started
+        print(f"Seeded {len(users)} users in {seed_seconds:.1f}s", file=sys.stderr)
+
+        http = await stack.enter_async_context(
+            httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60)
+        )
+
+        latencies: dict[str, list[float]] = {name: [] for name in SCENARIOS}
+        errors: dict[str, int] = dict.fromkeys(SCENARIOS, 0)
+
+        started: float = time.perf_counter()
+        deadline: float = started + args.duration
+        await asyncio.gather(*(
+            worker(
+                Client(http, users[index % len(users)]),
+                random.Random(args.seed + index), deadline,
+                latencies, errors
+            )
+            for index in range(args.concurrency)
+        ))
+        elapsed: float = time.perf_counter() - started
+
+    results: dict[str, dict] = summarize(latencies, errors, elapsed)
+    total_requests: int = sum(result['requests'] for result in results.values())
+
+    return {
+        'started_at': started_at.isoformat(),
+        'python': platform.python_version(),
+        'database_backend': settings.DATABASE_BACKEND,
+        'parameters': {
+            key: value for key, value in vars(args).items()
+            if key != 'output'
+        },
+        'seed_seconds': round(seed_seconds, 3),
+        'elapsed_seconds': round(elapsed, 3),
+        'total_rps': round(total_requests / elapsed, 2),
+        'endpoints': results
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"{'endpoint':<16} {'requests':>9} {'errors':>7} {'rps':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for name, result in report['endpoints'].items():
+        print(
+            f"{name:<16} {result['requests']:>9} {result['errors']:>7} {result['rps']:>9.1f} "
+            f"{result['p50_ms']:>9.2f} {result['p99_ms']:>9.2f}"
+        )
+
+    print(f"total {report['total_rps']:.1f} requests/s over {report['elapsed_seconds']:.1f}s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.load', description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--depth', type=int, default=3, help='Group levels below Root')
+    parser.add_argument('--fanout', type=int, default=3, help='Child groups per group')
+    parser.add_argument('--entries', type=int, default=50, help='Entries per group')
+
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run the mix for')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the request mix')
+
+    parser.add_argument('--base-url', help='Load a running server instead of the in-process app')
+    parser.add_argument('--output', type=Path, help='Write the results to this JSON file')
+    args = parser.parse_args()
+
+    report: dict = asyncio.run(run(args))
+    print_report(report)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=4))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
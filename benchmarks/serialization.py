@@ -0,0 +1,85 @@
+"""Per-entry cost of building and encoding an entry page.
+
+Compares the validated path (one `EntryPublicGet` per row, then FastAPI validating
+and dumping the returned page against its response model) with the trusted path
+(`model_construct()` rows encoded by `FastJSONResponse`).
+
+Run with `python -m benchmarks.serialization [--entries 10000] [--rounds 20]`.
+"""
+import argparse
+import statistics
+import time
+import uuid
+
+from collections.abc import Callable
+
+from pydantic import TypeAdapter
+
+from app.internal.responses import FastJSONResponse
+from app.models.entries import EntryPage, EntryPublicGet
+
+
+def make_rows(count: int) -> list[dict]:
+    group_id: uuid.UUID = uuid.uuid4()
+    return [
+        {
+            'entry_id': uuid.uuid4(), 'group_id': group_id,
+            'entry_name': f'entry {index:06d}', 'entry_username': f'user{index}@example.com',
+            'entry_password': 'correct horse battery staple',
+            'entry_url': f'https://service{index}.example.com/login'
+        }
+        for index in range(count)
+    ]
+
+
+def validated_path(rows: list[dict], page_adapter: TypeAdapter) -> bytes:
+    page = EntryPage(entries=[EntryPublicGet(**row) for row in rows], next_cursor=None)
+
+    # What FastAPI does with a returned value that has a response model
+    validated = page_adapter.validate_python(page, from_attributes=True)
+    return page_adapter.dump_json(validated)
+
+
+def trusted_path(rows: list[dict], page_adapter: TypeAdapter) -> bytes:
+    page = EntryPage.model_construct(
+        entries=[EntryPublicGet.model_construct(**row) for row in rows],
+        next_cursor=None
+    )
+    return FastJSONResponse(page).body
+
+
+def measure(func: Callable[[list[dict], TypeAdapter], bytes], rows: list[dict], rounds: int) -> float:
+    page_adapter: TypeAdapter = TypeAdapter(EntryPage)
+    func(rows, page_adapter)  # Warm up
+
+    timings: list[float] = []
+    for _ in range(rounds):
+        started: float = time.perf_counter()
+        func(rows, page_adapter)
+        timings.append(time.perf_counter() - started)
+
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', type=int, default=10_000)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    rows: list[dict] = make_rows(args.entries)
+    results: dict[str, float] = {
+        'validated': measure(validated_path, rows, args.rounds),
+        'trusted': measure(trusted_path, rows, args.rounds)
+    }
+
+    print(f"{args.entries} entries per page, median of {args.rounds} rounds")
+    for name, seconds in results.items():
+        per_entry_us: float = seconds / args.entries * 1_000_000
+        print(f"  {name:<10} {seconds * 1000:8.2f} ms/page  {per_entry_us:6.2f} us/entry")
+
+    print(f"  speedup    {results['validated'] / results['trusted']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
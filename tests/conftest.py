@@ -0,0 +1,98 @@
+import os
+import tempfile
+import uuid
+
+from collections.abc import Awaitable, Callable, Iterator
+from typing import Any
+
+import pytest
+
+# The settings and engines are created on import, so the environment is set up first
+os.environ.update({
+    'DATA_DIRECTORY': tempfile.mkdtemp(prefix='password_manager_tests_'),
+    'DATABASE_BACKEND': 'sqlite',
+    'LOGIN_RATE_LIMIT_ENABLED': 'false',
+    'SESSION_CACHE_TTL': '0',  # Every request looks its session up, so query counts are stable
+    'LOG_QUEUE_ENABLED': 'false'
+})
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlmodel.ext.asyncio.session import AsyncSession  # noqa: E402
+
+from app.internal.config import settings  # noqa: E402
+from app.internal.database import database  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def client() -> Iterator[TestClient]:
+    with TestClient(app) as test_client:
+        response = test_client.post('/api/auth/token', data={
+            'username': settings.FIRST_USER_NAME,
+            'password': settings.FIRST_USER_PASSWORD,
+            'grant_type': 'password'
+        })
+        assert response.status_code == 200, response.text
+
+        test_client.headers['Authorization'] = f"Bearer {response.json()['access_token']}"
+        yield test_client
+
+
+@pytest.fixture(scope='session')
+def run_db(client: TestClient) -> Callable[[Callable[[AsyncSession], Awaitable[Any]]], Any]:
+    """Runs `func(session)` on the app's event loop and returns its result."""
+    async def with_session(func: Callable[[AsyncSession], Awaitable[Any]]) -> Any:
+        async with AsyncSession(database.async_engine) as session:
+            return await func(session)
+
+    return lambda func: client.portal.call(with_session, func)
+
+
+@pytest.fixture
+def root_id(client: TestClient) -> str:
+    return client.get('/api/groups/').json()['group_id']
+
+
+@pytest.fixture
+def make_group(client: TestClient, root_id: str) -> Callable[..., str]:
+    def make(name: str = 'group', parent_id: str | None = None) -> str:
+        response = client.post('/api/groups/', json={'group_name': name, 'parent_id': parent_id or root_id})
+        assert response.status_code == 200, response.text
+
+        return response.json()['group_id']
+
+    return make
+
+
+@pytest.fixture
+def make_entries(client: TestClient) -> Callable[[str, int], list[str]]:
+    def make(group_id: str, amount: int = 1) -> list[str]:
+        entry_ids: list[str] = []
+        for index in range(amount):
+            response = client.post(f'/api/groups/{group_id}/entries/', json={
+                'entry_name': f'entry {index}', 'entry_username': 'user@example.com',
+                'entry_password': 'correct horse battery staple', 'entry_url': 'https://example.com'
+            })
+            assert response.status_code == 200, response.text
+            entry_ids.append(response.json()['entry_id'])
+
+        return entry_ids
+
+    return make
+
+
+@pytest.fixture
+def make_user(client: TestClient, run_db: Callable) -> Callable[[], tuple[str, dict[str, str]]]:
+    """Adds a user and logs in, returns the username and its Authorization header."""
+    def make() -> tuple[str, dict[str, str]]:
+        username: str = f'user-{uuid.uuid4().hex[:12]}'
+        assert run_db(lambda session: database.users.add_user(session, username, 'hunter22'))
+
+        response = client.post('/api/auth/token', data={
+            'username': username, 'password': 'hunter22', 'grant_type': 'password'
+        })
+        assert response.status_code == 200, response.text
+
+        return username, {'Authorization': f"Bearer {response.json()['access_token']}"}
+
+    return make
@@ -0,0 +1,120 @@
+import uuid
+
+from collections.abc import Callable
+
+from fastapi.testclient import TestClient
+
+from .test_sync import get_changes, latest_revision
+
+
+def entry_data(entry_name: str, entry_password: str = 'hunter2') -> dict:
+    return {
+        'entry_name': entry_name, 'entry_username': 'user@example.com',
+        'entry_password': entry_password, 'entry_url': 'https://example.com'
+    }
+
+
+def run_bulk(client: TestClient, operations: list[dict]) -> list[dict]:
+    response = client.post('/api/entries/bulk', json={'operations': operations})
+    assert response.status_code == 200, response.text
+
+    return response.json()['results']
+
+
+def get_entries(client: TestClient, group_id: str) -> dict[str, dict]:
+    response = client.get(f'/api/groups/{group_id}/entries/')
+    assert response.status_code == 200, response.text
+
+    return {entry['entry_id']: entry for entry in response.json()['entries']}
+
+
+def test_mixed_operations_across_groups(
+    client: TestClient, make_group: Callable[..., str],
+    make_entries: Callable[[str, int], list[str]]
+):
+    group_a: str = make_group('bulk A')
+    group_b: str = make_group('bulk B')
+    updated_id, deleted_id = make_entries(group_a, 2)
+
+    since: int = latest_revision(client)
+    results: list[dict] = run_bulk(client, [
+        {'op': 'create', 'group_id': group_a, 'data': entry_data('created in A', 'secret A')},
+        {'op': 'update', 'entry_id': updated_id, 'data': entry_data('updated', 'new secret')},
+        {'op': 'create', 'group_id': group_b, 'data': entry_data('created in B', 'secret B')},
+        {'op': 'delete', 'entry_id': deleted_id}
+    ])
+
+    assert [result['index'] for result in results] == [0, 1, 2, 3]
+    assert all(result['success'] and result['detail'] is None for result in results)
+    assert [result['entry_id'] for result in results][1::2] == [updated_id, deleted_id]
+
+    # Values come back decrypted, the deleted entry is gone
+    entries_a: dict[str, dict] = get_entries(client, group_a)
+    assert entries_a.keys() == {results[0]['entry_id'], updated_id}
+    assert entries_a[results[0]['entry_id']]['entry_password'] == 'secret A'
+    assert entries_a[updated_id]['entry_name'] == 'updated'
+    assert entries_a[updated_id]['entry_password'] == 'new secret'
+
+    entries_b: dict[str, dict] = get_entries(client, group_b)
+    assert [entry['entry_password'] for entry in entries_b.values()] == ['secret B']
+
+    # One revision per change, tombstones included
+    changes: dict = get_changes(client, since)
+    revisions: list[int] = [
+        change['revision'] for change in changes['entries'] + changes['deleted']
+    ]
+    assert sorted(revisions) == list(range(since + 1, since + 5))
+    assert {tombstone['object_id'] for tombstone in changes['deleted']} == {deleted_id}
+
+
+def test_foreign_and_unknown_ids_are_skipped(
+    client: TestClient, make_group: Callable[..., str],
+    make_entries: Callable[[str, int], list[str]],
+    make_user: Callable[[], tuple[str, dict[str, str]]]
+):
+    _, other_headers = make_user()
+    other_root: str = client.get('/api/groups/', headers=other_headers).json()['group_id']
+
+    response = client.post(f'/api/groups/{other_root}/entries/', json=entry_data('not yours'), headers=other_headers)
+    assert response.status_code == 200, response.text
+    other_entry: str = response.json()['entry_id']
+
+    group_id: str = make_group('bulk skipped')
+    entry_id: str = make_entries(group_id, 1)[0]
+
+    since: int = latest_revision(client)
+    results: list[dict] = run_bulk(client, [
+        {'op': 'create', 'group_id': other_root, 'data': entry_data('foreign group')},
+        {'op': 'create', 'group_id': str(uuid.uuid4()), 'data': entry_data('unknown group')},
+        {'op': 'update', 'entry_id': other_entry, 'data': entry_data('foreign entry')},
+        {'op': 'delete', 'entry_id': str(uuid.uuid4())},
+        {'op': 'update', 'entry_id': entry_id, 'data': entry_data('still applied')}
+    ])
+
+    assert [result['detail'] for result in results] == [
+        "Group not found", "Group not found",
+        "Password entry not found", "Password entry not found", None
+    ]
+    assert [result['entry_id'] for result in results] == [None, None, None, None, entry_id]
+    assert latest_revision(client) == since + 1
+
+    response = client.get(f'/api/groups/{other_root}/entries/', headers=other_headers)
+    assert [entry['entry_name'] for entry in response.json()['entries']] == ['not yours']
+
+
+def test_entry_changed_twice_keeps_the_first_operation(
+    client: TestClient, make_group: Callable[..., str],
+    make_entries: Callable[[str, int], list[str]]
+):
+    group_id: str = make_group('bulk twice')
+    entry_id: str = make_entries(group_id, 1)[0]
+
+    results: list[dict] = run_bulk(client, [
+        {'op': 'update', 'entry_id': entry_id, 'data': entry_data('first')},
+        {'op': 'delete', 'entry_id': entry_id},
+        {'op': 'update', 'entry_id': entry_id, 'data': entry_data('third')}
+    ])
+
+    assert [result['success'] for result in results] == [True, False, False]
+    assert results[1]['detail'] == results[2]['detail'] == "Password entry is already changed by an earlier operation"
+    assert [entry['entry_name'] for entry in get_entries(client, group_id).values()] == ['first']
@@ -0,0 +1,98 @@
+import base64
+import json
+import os
+import uuid
+
+from collections import Counter
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.internal.config import AppSettings
+from app.internal.crypto import decode_master_key
+from app.internal.database import database
+from app.models.dbtables import PasswordEntry
+
+
+def stored_entry(run_db: Callable[..., Any], entry_id: uuid.UUID) -> PasswordEntry:
+    async def load(session: AsyncSession) -> PasswordEntry:
+        result = await session.exec(select(PasswordEntry).where(PasswordEntry.entry_id == entry_id))
+        return result.one()
+
+    return run_db(load)
+
+
+def exported_entries(client: TestClient) -> dict[str, dict]:
+    response = client.get('/api/export')
+    assert response.status_code == 200, response.text
+
+    records: list[dict] = [json.loads(line) for line in response.text.splitlines() if line]
+    return {record['entry_id']: record for record in records if record['type'] == 'entry'}
+
+
+def test_entries_are_stored_encrypted(
+    client: TestClient, run_db: Callable[..., Any],
+    make_group: Callable[..., str], make_entries: Callable[[str, int], list[str]]
+):
+    group_id: str = make_group('encrypted')
+    entry_id: str = make_entries(group_id, 1)[0]
+
+    entry: PasswordEntry = stored_entry(run_db, uuid.UUID(entry_id))
+    assert entry.encrypted
+    assert 'correct horse' not in entry.entry_password
+    assert entry.entry_username != 'user@example.com'
+
+    page: dict = client.get(f'/api/groups/{group_id}/entries/').json()
+    assert page['entries'][0]['entry_password'] == 'correct horse battery staple'
+
+
+def test_legacy_entries_are_read_and_encrypted(
+    client: TestClient, run_db: Callable[..., Any], make_group: Callable[..., str]
+):
+    group_id: str = make_group('legacy')
+    entry_id: uuid.UUID = uuid.uuid4()
+
+    async def insert_legacy_entry(session: AsyncSession) -> None:
+        # Looks like ciphertext, but was stored as plaintext before encryption existed
+        session.add(PasswordEntry(
+            entry_id=entry_id, group_id=uuid.UUID(group_id), entry_name='legacy',
+            entry_username='v1:user', entry_password='v1:hunter2', entry_url='https://example.com'
+        ))
+        await database.groups.add_entry_counts(session, Counter({uuid.UUID(group_id): 1}))
+        await session.commit()
+
+    run_db(insert_legacy_entry)
+
+    page: dict = client.get(f'/api/groups/{group_id}/entries/').json()
+    assert page['entries'][0]['entry_password'] == 'v1:hunter2'
+    assert exported_entries(client)[str(entry_id)]['entry_password'] == 'v1:hunter2'
+
+    assert run_db(database.entries.encrypt_legacy_entries) >= 1
+
+    entry: PasswordEntry = stored_entry(run_db, entry_id)
+    assert entry.encrypted
+    assert entry.entry_password != 'v1:hunter2'
+
+    page = client.get(f'/api/groups/{group_id}/entries/').json()
+    assert (page['entries'][0]['entry_username'], page['entries'][0]['entry_password']) == ('v1:user', 'v1:hunter2')
+    assert 'encrypted' not in exported_entries(client)[str(entry_id)]
+
+
+@pytest.mark.parametrize('master_key', [
+    'correct horse battery staple',  # A passphrase, not base64
+    base64.b64encode(b'too short').decode(),
+])
+def test_master_key_must_be_32_base64_bytes(master_key: str):
+    with pytest.raises(ValidationError, match='ENTRY_MASTER_KEY'):
+        AppSettings(ENTRY_MASTER_KEY=master_key)
+
+
+def test_master_key_is_used_as_is():
+    master_key: bytes = os.urandom(32)
+    assert decode_master_key(base64.b64encode(master_key).decode()) == master_key
@@ -0,0 +1,65 @@
+from collections.abc import Callable
+
+import pytest
+
+from fastapi.testclient import TestClient
+
+from app.internal.database import database
+from app.internal.pagination import encode_cursor
+
+
+def create_entry(client: TestClient, group_id: str, entry_name: str) -> str:
+    response = client.post(f'/api/groups/{group_id}/entries/', json={
+        'entry_name': entry_name, 'entry_username': 'user@example.com',
+        'entry_password': 'hunter2', 'entry_url': 'https://example.com'
+    })
+    assert response.status_code == 200, response.text
+
+    return response.json()['entry_id']
+
+
+def test_pages_return_every_entry_once(client: TestClient, make_group: Callable[..., str]):
+    group_id: str = make_group('paged duplicates')
+    entry_ids: list[str] = [
+        create_entry(client, group_id, entry_name)
+        for entry_name in ['same', 'same', 'same', 'other', 'other', 'last', 'same']
+    ]
+
+    seen: list[dict] = []
+    cursor: str | None = None
+    while True:
+        params: dict = {'amount': 2, **({'cursor': cursor} if cursor else {})}
+        page: dict = client.get(f'/api/groups/{group_id}/entries/', params=params).json()
+
+        assert len(page['entries']) <= 2
+        seen.extend(page['entries'])
+
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+
+    assert sorted(entry['entry_id'] for entry in seen) == sorted(entry_ids)
+    assert [entry['entry_name'] for entry in seen] == sorted(entry['entry_name'] for entry in seen)
+
+
+@pytest.mark.parametrize('cursor', ['not a cursor', encode_cursor('same', 'not-a-uuid'), encode_cursor(1)])
+def test_invalid_cursor(client: TestClient, make_group: Callable[..., str], cursor: str):
+    group_id: str = make_group('bad cursor')
+
+    response = client.get(f'/api/groups/{group_id}/entries/', params={'cursor': cursor})
+    assert response.status_code == 400, response.text
+    assert response.json()['detail'] == "Invalid cursor"
+
+
+def test_other_errors_are_not_reported_as_a_bad_cursor(
+    client: TestClient, make_group: Callable[..., str], monkeypatch: pytest.MonkeyPatch
+):
+    group_id: str = make_group('broken page')
+    create_entry(client, group_id, 'entry')
+
+    async def failing_decrypt(*args) -> None:
+        raise ValueError("Incorrect padding")
+
+    monkeypatch.setattr(database.entries, 'decrypt_rows', failing_decrypt)
+    with pytest.raises(ValueError, match="Incorrect padding"):
+        client.get(f'/api/groups/{group_id}/entries/')
@@ -0,0 +1,94 @@
+from collections.abc import Callable
+
+import pytest
+
+from fastapi.testclient import TestClient
+
+# Session lookup and the user's revision, nothing else runs before the 304
+NOT_MODIFIED_QUERIES: int = 2
+
+
+def get_etag(client: TestClient, url: str) -> str:
+    response = client.get(url)
+    assert response.status_code == 200, response.text
+
+    return response.headers['ETag']
+
+
+@pytest.mark.parametrize('endpoint', ['entries/', 'children', 'tree'])
+def test_matching_etag_is_not_modified(
+    client: TestClient, make_group: Callable[..., str],
+    make_entries: Callable[[str, int], list[str]], endpoint: str
+):
+    group_id: str = make_group('cached')
+    make_entries(group_id, 3)
+
+    url: str = f'/api/groups/{group_id}/{endpoint}'
+    response = client.get(url, headers={'If-None-Match': get_etag(client, url)})
+
+    assert response.status_code == 304
+    assert response.content == b''
+    assert int(response.headers['X-DB-Query-Count']) <= NOT_MODIFIED_QUERIES
+
+
+@pytest.mark.parametrize('if_none_match', ['W/{etag}', '"other", {etag}', '*'])
+def test_weak_listed_and_wildcard_etags_match(client: TestClient, make_group: Callable[..., str], if_none_match: str):
+    url: str = f"/api/groups/{make_group('cached')}/children"
+    etag: str = get_etag(client, url)
+
+    response = client.get(url, headers={'If-None-Match': if_none_match.format(etag=etag)})
+    assert response.status_code == 304
+
+
+def test_other_etag_is_answered_in_full(client: TestClient, make_group: Callable[..., str]):
+    url: str = f"/api/groups/{make_group('cached')}/children"
+
+    response = client.get(url, headers={'If-None-Match': '"stale"'})
+    assert response.status_code == 200
+    assert response.json()['child_groups'] == []
+
+
+def test_writes_change_the_etag(
+    client: TestClient, make_group: Callable[..., str],
+    make_entries: Callable[[str, int], list[str]]
+):
+    group_id: str = make_group('changing')
+    url: str = f'/api/groups/{group_id}/entries/'
+    seen: list[str] = [get_etag(client, url)]
+
+    def changed_etag() -> str:
+        etag: str = get_etag(client, url)
+        assert etag not in seen
+        seen.append(etag)
+
+        return etag
+
+    entry_id: str = make_entries(group_id, 1)[0]
+    changed_etag()
+
+    response = client.put(f'/api/groups/{group_id}/entries/{entry_id}', json={
+        'entry_name': 'renamed', 'entry_username': 'user', 'entry_password': 'hunter2',
+        'entry_url': 'https://example.com'
+    })
+    assert response.status_code == 200, response.text
+    changed_etag()
+
+    assert client.delete(f'/api/groups/{group_id}/entries/{entry_id}').status_code == 200
+    changed_etag()
+
+    child_id: str = make_group('child', group_id)
+    changed_etag()
+
+    response = client.put(f'/api/groups/{child_id}/', json={'new_name': 'renamed child'})
+    assert response.status_code == 200, response.text
+    changed_etag()
+
+    grandchild_id: str = make_group('grandchild', child_id)
+    changed_etag()
+
+    response = client.post(f'/api/groups/{grandchild_id}/move', json={'new_parent_id': group_id})
+    assert response.status_code == 200, response.text
+    changed_etag()
+
+    assert client.delete(f'/api/groups/{child_id}/').status_code == 200
+    changed_etag()
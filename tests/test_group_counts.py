@@ -0,0 +1,131 @@
+"""The stored group counts must match a full recount after every kind of write."""
+import time
+
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+
+from fastapi.testclient import TestClient
+
+from app.internal.config import settings
+from app.internal.database import database
+
+
+@pytest.fixture
+def assert_counts_match(run_db: Callable[..., Any]) -> Callable[[], None]:
+    def check() -> None:
+        # Returns how many groups it had to fix, which also resets them for the next test
+        assert run_db(database.groups.recount_groups) == 0
+
+    return check
+
+
+def wait_for_delete_job(client: TestClient, job_id: str, timeout: float = 10) -> dict:
+    deadline: float = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job: dict = client.get(f'/api/groups/delete_jobs/{job_id}').json()
+        if job['status'] == 'done':
+            return job
+
+        time.sleep(0.05)
+
+    raise AssertionError(f"Delete job {job_id} did not finish in {timeout} seconds")
+
+
+def test_create_group(
+    make_group: Callable[..., str], make_entries: Callable[[str, int], list[str]],
+    assert_counts_match: Callable[[], None]
+):
+    top: str = make_group('counted top')
+    make_entries(make_group('counted child', top), 3)
+    make_entries(top, 2)
+
+    assert_counts_match()
+
+
+def test_move_group(
+    client: TestClient, make_group: Callable[..., str],
+    make_entries: Callable[[str, int], list[str]], assert_counts_match: Callable[[], None]
+):
+    source: str = make_group('move source')
+    moved: str = make_group('moved', source)
+    make_entries(make_group('moved child', moved), 2)
+    target: str = make_group('move target', make_group('move target parent'))
+
+    response = client.post(f'/api/groups/{moved}/move', json={'new_parent_id': target})
+    assert response.status_code == 200, response.text
+
+    assert_counts_match()
+
+
+def test_sync_delete(
+    client: TestClient, make_group: Callable[..., str],
+    make_entries: Callable[[str, int], list[str]], assert_counts_match: Callable[[], None]
+):
+    parent: str = make_group('sync delete parent')
+    deleted: str = make_group('sync deleted', parent)
+    make_entries(make_group('sync deleted child', deleted), 2)
+
+    response = client.delete(f'/api/groups/{deleted}/')
+    assert response.status_code == 200, response.text
+
+    assert_counts_match()
+
+
+def test_async_delete_and_purge(
+    client: TestClient, make_group: Callable[..., str], make_entries: Callable[[str, int], list[str]],
+    assert_counts_match: Callable[[], None], monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(settings, 'GROUP_DELETE_ASYNC_THRESHOLD', 1)
+
+    parent: str = make_group('async delete parent')
+    deleted: str = make_group('async deleted', parent)
+    for index in range(3):
+        make_entries(make_group(f'async deleted child {index}', deleted), 2)
+
+    response = client.delete(f'/api/groups/{deleted}/')
+    assert response.status_code == 202, response.text
+
+    job: dict = wait_for_delete_job(client, response.json()['job_id'])
+    assert (job['deleted_groups'], job['deleted_entries']) == (4, 6)
+
+    assert_counts_match()
+
+
+def test_bulk_create_and_delete(
+    client: TestClient, make_group: Callable[..., str],
+    make_entries: Callable[[str, int], list[str]], assert_counts_match: Callable[[], None]
+):
+    first: str = make_group('bulk first')
+    second: str = make_group('bulk second', first)
+    existing: list[str] = make_entries(second, 3)
+
+    entry: dict = {
+        'entry_name': 'bulk', 'entry_username': 'user@example.com',
+        'entry_password': 'hunter2', 'entry_url': 'https://example.com'
+    }
+    response = client.post('/api/entries/bulk', json={'operations': [
+        {'op': 'create', 'group_id': first, 'data': entry},
+        {'op': 'create', 'group_id': second, 'data': entry},
+        *({'op': 'delete', 'entry_id': entry_id} for entry_id in existing[:2])
+    ]})
+    assert response.status_code == 200, response.text
+    assert all(result['success'] for result in response.json()['results'])
+
+    assert_counts_match()
+
+
+def test_csv_import(client: TestClient, assert_counts_match: Callable[[], None]):
+    body: str = '\n'.join([
+        'group_path,entry_name,entry_username,entry_password,entry_url',
+        'Imported,top,user,password,https://example.com',
+        'Imported/Servers,db,admin,password,https://db.example.com',
+        'Imported/Servers/Old,legacy,admin,password,https://old.example.com',
+        'Imported/Servers,web,admin,password,https://web.example.com'
+    ])
+    response = client.post('/api/import', params={'format': 'csv'}, content=body.encode())
+    assert response.status_code == 200, response.text
+    assert response.json()['rows_imported'] == 4
+
+    assert_counts_match()
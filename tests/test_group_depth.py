@@ -0,0 +1,76 @@
+from collections.abc import Callable
+
+import pytest
+
+from fastapi.testclient import TestClient
+
+from app.internal import database as database_module
+from app.internal.config import settings
+from app.internal.tasks import group_purger
+
+
+@pytest.fixture
+def max_depth(monkeypatch: pytest.MonkeyPatch) -> int:
+    monkeypatch.setattr(database_module, 'MAX_GROUP_TREE_DEPTH', 3)
+    return 3
+
+
+def test_create_group_past_the_limit(client: TestClient, make_group: Callable[..., str], max_depth: int):
+    parent_id: str | None = None
+    for level in range(max_depth):
+        parent_id = make_group(f'level {level + 1}', parent_id)
+
+    response = client.post('/api/groups/', json={'group_name': 'too deep', 'parent_id': parent_id})
+    assert response.status_code == 400, response.text
+
+
+def test_move_group_past_the_limit(client: TestClient, make_group: Callable[..., str], max_depth: int):
+    first: str = make_group('first level')
+    second: str = make_group('second level', first)
+
+    moved: str = make_group('moved')
+    make_group('moved child', moved)
+
+    response = client.post(f'/api/groups/{moved}/move', json={'new_parent_id': second})
+    assert response.status_code == 400, response.text
+    assert 'nested' in response.json()['detail']
+
+    response = client.post(f'/api/groups/{moved}/move', json={'new_parent_id': first})
+    assert response.status_code == 200, response.text
+
+
+def test_import_rejects_rows_past_the_limit(client: TestClient, max_depth: int):
+    body: str = '\n'.join([
+        'group_path,entry_name,entry_username,entry_password,entry_url',
+        'Deep/Deeper/Deepest/Too deep,rejected,user,password,https://example.com',
+        'Deep/Deeper/Deepest,imported,user,password,https://example.com'
+    ])
+    response = client.post('/api/import', params={'format': 'csv'}, content=body.encode())
+    assert response.status_code == 200, response.text
+
+    report: dict = response.json()
+    assert (report['rows_imported'], report['rows_rejected']) == (1, 1)
+    assert report['errors'][0]['line'] == 2
+
+
+def test_subtree_queued_for_deletion_does_not_count(
+    client: TestClient, make_group: Callable[..., str],
+    max_depth: int, monkeypatch: pytest.MonkeyPatch
+):
+    # Keep the subtree hidden but unpurged while moving its former parent
+    monkeypatch.setattr(settings, 'GROUP_DELETE_ASYNC_THRESHOLD', 1)
+    monkeypatch.setattr(group_purger, 'wake', lambda: None)
+
+    first: str = make_group('first level')
+    moved: str = make_group('moved')
+    deleted: str = make_group('deleted child', moved)
+    make_group('deleted grandchild', deleted)
+
+    response = client.delete(f'/api/groups/{deleted}/')
+    assert response.status_code == 202, response.text
+
+    try:
+        response = client.post(f'/api/groups/{moved}/move', json={'new_parent_id': first})
+        assert response.status_code == 200, response.text
+    finally:
+        client.portal.call(group_purger.purge_once)
@@ -0,0 +1,43 @@
+import asyncio
+import os
+import signal
+
+import pytest
+
+from app.internal.hashing import HashPoolBrokenError, PasswordHasher
+
+
+def _crash(*args) -> None:
+    os._exit(1)
+
+
+def test_pool_is_replaced_after_a_worker_dies():
+    async def run() -> None:
+        hasher = PasswordHasher(workers=1, max_queue=10)
+        try:
+            hashed_pw: str = await hasher.hash('hunter2')
+            for pid in list(hasher._executor._processes):
+                os.kill(pid, signal.SIGKILL)
+
+            valid, _ = await hasher.verify_and_update('hunter2', hashed_pw)
+            assert valid
+            assert hasher.restarts == 1
+        finally:
+            hasher.shutdown()
+
+    asyncio.run(run())
+
+
+def test_pool_that_keeps_breaking_fails_the_call():
+    async def run() -> None:
+        hasher = PasswordHasher(workers=1, max_queue=10)
+        try:
+            with pytest.raises(HashPoolBrokenError):
+                await hasher._run('hash', _crash)
+
+            assert hasher.restarts == 2
+            assert await hasher.hash('still works')
+        finally:
+            hasher.shutdown()
+
+    asyncio.run(run())
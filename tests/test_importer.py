@@ -0,0 +1,27 @@
+import pytest
+
+from fastapi.testclient import TestClient
+
+from app.internal.database import database
+from app.internal.importer import VaultImporter
+
+
+def test_import_only_holds_the_writer_to_write(client: TestClient, monkeypatch: pytest.MonkeyPatch):
+    held_while_parsing: list[bool] = []
+    add_entry = VaultImporter._add_entry
+
+    async def recording_add_entry(self: VaultImporter, *args) -> None:
+        held_while_parsing.append(database._write_lock.locked())
+        await add_entry(self, *args)
+
+    monkeypatch.setattr(VaultImporter, '_add_entry', recording_add_entry)
+
+    body: str = '\n'.join([
+        'group_path,entry_name,entry_username,entry_password,entry_url',
+        *(f'Writer test,entry {index},user,password,https://example.com' for index in range(3))
+    ])
+    response = client.post('/api/import', params={'format': 'csv'}, content=body.encode())
+    assert response.status_code == 200, response.text
+    assert response.json()['rows_imported'] == 3
+
+    assert held_while_parsing == [False, False, False]
@@ -0,0 +1,39 @@
+from collections.abc import Callable
+
+from fastapi.testclient import TestClient
+
+from app.internal.ratelimit import TokenBucketLimiter, login_limiter
+
+
+def test_hash_queue_wait_is_exported(client: TestClient):
+    # The session fixture logged in, which verified a password in the pool
+    body: str = client.get('/metrics').text
+
+    assert 'pm_password_hash_queue_wait_seconds_count{operation="verify"}' in body
+    assert 'pm_password_hash_pool{state="completed"}' in body
+
+
+def test_login_limiter_is_exported(client: TestClient):
+    limiter = TokenBucketLimiter(capacity=1, refill_rate=0.001, max_keys=10)
+    assert limiter.acquire('client') == 0
+    assert limiter.acquire('client') > 0
+
+    original, login_limiter.by_ip = login_limiter.by_ip, limiter
+    try:
+        body: str = client.get('/metrics').text
+    finally:
+        login_limiter.by_ip = original
+
+    assert 'pm_login_limiter_checks_total{limit="ip",result="allowed"} 1' in body
+    assert 'pm_login_limiter_checks_total{limit="ip",result="rejected"} 1' in body
+    assert 'pm_login_limiter_keys{limit="ip"} 1' in body
+
+
+def test_request_latency_uses_the_full_route_template(client: TestClient, make_group: Callable[..., str]):
+    group_id: str = make_group('metrics')
+    assert client.get(f'/api/groups/{group_id}/entries/').status_code == 200
+
+    body: str = client.get('/metrics').text
+    assert 'route="/api/groups/{group_id}/entries/"' in body
+    assert 'route="/entries/"' not in body
+    assert 'route="/api/auth/token"' in body
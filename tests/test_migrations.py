@@ -0,0 +1,80 @@
+import uuid
+
+from pathlib import Path
+
+from sqlalchemy import create_engine, inspect
+
+from app.internal.migrations import create_schema
+
+# The tables as v0.1.0 created them on SQLite
+V0_1_0_SCHEMA: tuple[str, ...] = (
+    """CREATE TABLE users (
+        user_id CHAR(32) NOT NULL PRIMARY KEY,
+        username VARCHAR(30) NOT NULL UNIQUE,
+        hashed_password VARCHAR(100) NOT NULL
+    )""",
+    """CREATE TABLE usersessions (
+        session_token VARCHAR(45) NOT NULL PRIMARY KEY,
+        expiry_date DATETIME,
+        created_at DATETIME,
+        user_id CHAR(32) NOT NULL REFERENCES users (user_id) ON DELETE CASCADE
+    )""",
+    """CREATE TABLE passwordgroups (
+        group_id CHAR(32) NOT NULL PRIMARY KEY,
+        group_name VARCHAR NOT NULL,
+        user_id CHAR(32) NOT NULL REFERENCES users (user_id) ON DELETE CASCADE,
+        parent_id CHAR(32) REFERENCES passwordgroups (group_id) ON DELETE CASCADE,
+        is_root BOOLEAN NOT NULL
+    )""",
+    """CREATE TABLE passwordentry (
+        entry_id CHAR(32) NOT NULL PRIMARY KEY,
+        entry_name VARCHAR NOT NULL,
+        entry_username VARCHAR NOT NULL,
+        entry_password VARCHAR NOT NULL,
+        entry_url VARCHAR NOT NULL,
+        group_id CHAR(32) NOT NULL REFERENCES passwordgroups (group_id) ON DELETE CASCADE
+    )"""
+)
+
+
+def test_v0_1_0_database_is_upgraded(tmp_path: Path):
+    engine = create_engine(f'sqlite:///{tmp_path / "v0.1.0.db"}')
+    user_id, root_id, child_id, entry_id = (uuid.uuid4().hex for _ in range(4))
+
+    with engine.begin() as conn:
+        for statement in V0_1_0_SCHEMA:
+            conn.exec_driver_sql(statement)
+
+        conn.exec_driver_sql("INSERT INTO users VALUES (?, 'user', 'hash')", (user_id,))
+        conn.exec_driver_sql(
+            "INSERT INTO passwordgroups VALUES (?, 'root', ?, NULL, 1), (?, 'child', ?, ?, 0)",
+            (root_id, user_id, child_id, user_id, root_id)
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO passwordentry VALUES (?, 'entry', 'v1:name', 'v1:password', 'v1:url', ?)",
+            (entry_id, child_id)
+        )
+
+    with engine.begin() as conn:
+        added: set[str] = create_schema(conn)
+
+    assert 'passwordgroups.subtree_entry_count' in added
+    assert 'users.wrapped_data_key' in added
+
+    with engine.begin() as conn:
+        # Nothing left to do the second time
+        assert create_schema(conn) == set()
+
+        index_names: set[str] = {index['name'] for index in inspect(conn).get_indexes('passwordentry')}
+        group_revisions: list[int] = [
+            revision for revision, in conn.exec_driver_sql('SELECT revision FROM passwordgroups')
+        ]
+        entry_revision, entry_encrypted = conn.exec_driver_sql('SELECT revision, encrypted FROM passwordentry').one()
+        user_revision: int = conn.exec_driver_sql('SELECT revision FROM users').scalar_one()
+
+    assert 'ix_passwordentry_group_page' in index_names
+    assert sorted([*group_revisions, entry_revision]) == [1, 2, 3]
+    assert user_revision == 3
+
+    # v0.1.0 never encrypted entries, so they are left for `encrypt_legacy_entries`
+    assert not entry_encrypted
@@ -0,0 +1,65 @@
+"""Each listing must run a fixed number of queries, however much data it returns."""
+from collections.abc import Callable
+
+import pytest
+
+from fastapi.testclient import TestClient
+
+# Session lookup, ETag revision and group check, then at most two for the listing itself
+LISTING_QUERIES: int = 5
+
+
+def query_count(client: TestClient, url: str, **params) -> int:
+    response = client.get(url, params=params)
+    assert response.status_code == 200, response.text
+
+    return int(response.headers['X-DB-Query-Count'])
+
+
+def make_subtree(make_group: Callable[..., str], make_entries: Callable[[str, int], list[str]], size: int) -> str:
+    """A group with `size` children, each with `size` children and entries."""
+    top_id: str = make_group('top')
+    for index in range(size):
+        child_id: str = make_group(f'child {index}', top_id)
+        make_entries(child_id, size)
+
+        for grandchild_index in range(size):
+            make_group(f'grandchild {grandchild_index}', child_id)
+
+    make_entries(top_id, size)
+    return top_id
+
+
+@pytest.mark.parametrize('endpoint', ['children', 'tree', 'entries/'])
+def test_group_endpoints_do_not_scale_with_data(
+    client: TestClient, make_group: Callable[..., str],
+    make_entries: Callable[[str, int], list[str]], endpoint: str
+):
+    small_id: str = make_subtree(make_group, make_entries, 1)
+    large_id: str = make_subtree(make_group, make_entries, 4)
+
+    small_count: int = query_count(client, f'/api/groups/{small_id}/{endpoint}')
+    large_count: int = query_count(client, f'/api/groups/{large_id}/{endpoint}')
+
+    assert small_count == large_count
+    assert large_count <= LISTING_QUERIES
+
+
+def test_top_level_listing(client: TestClient, make_group: Callable[..., str]):
+    before: int = query_count(client, '/api/groups/')
+    for index in range(5):
+        make_group(f'top level {index}')
+
+    assert query_count(client, '/api/groups/') == before
+    assert before <= LISTING_QUERIES
+
+
+def test_entry_pages(client: TestClient, make_group: Callable[..., str], make_entries: Callable[[str, int], list[str]]):
+    group_id: str = make_group('paged')
+    make_entries(group_id, 12)
+
+    first_page = client.get(f'/api/groups/{group_id}/entries/', params={'amount': 5})
+    cursor: str = first_page.json()['next_cursor']
+
+    assert int(first_page.headers['X-DB-Query-Count']) <= LISTING_QUERIES
+    assert query_count(client, f'/api/groups/{group_id}/entries/', amount=5, cursor=cursor) <= LISTING_QUERIES
@@ -0,0 +1,62 @@
+import itertools
+import time
+
+from collections.abc import Callable
+
+import pytest
+
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.internal.cache import STICKY_COOKIE, StickyClients
+from app.internal.config import settings
+from app.internal.database import create_engine, database
+
+
+@pytest.fixture
+def read_engines(monkeypatch: pytest.MonkeyPatch) -> tuple[AsyncEngine, list[AsyncEngine]]:
+    """Adds a "replica" on the same database and records the engine each read gets."""
+    replica: AsyncEngine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+    monkeypatch.setattr(database, 'replica_engines', [replica])
+    monkeypatch.setattr(database, '_replica_cycle', itertools.cycle([replica]))
+
+    chosen: list[AsyncEngine] = []
+    read_engine = database.read_engine
+
+    def recording_read_engine(*args) -> AsyncEngine:
+        chosen.append(read_engine(*args))
+        return chosen[-1]
+
+    monkeypatch.setattr(database, 'read_engine', recording_read_engine)
+    return replica, chosen
+
+
+def test_cookie_keeps_reads_on_the_primary_across_workers(
+    client: TestClient, make_group: Callable[..., str],
+    read_engines: tuple[AsyncEngine, list[AsyncEngine]], monkeypatch: pytest.MonkeyPatch
+):
+    replica, chosen = read_engines
+    group_id: str = make_group('sticky')
+    assert STICKY_COOKIE in client.cookies
+
+    # The next read lands on a worker that never saw the write
+    monkeypatch.setattr(database, 'sticky_clients', StickyClients(
+        settings.REPLICA_STICKY_SECONDS, settings.REPLICA_STICKY_MAX_CLIENTS
+    ))
+    assert client.get(f'/api/groups/{group_id}/children').status_code == 200
+    assert chosen[-1] is database.async_engine
+
+    client.cookies.delete(STICKY_COOKIE, path='/api')
+    assert client.get(f'/api/groups/{group_id}/children').status_code == 200
+    assert chosen[-1] is replica
+
+
+@pytest.mark.parametrize('offset, sticky', [(1, True), (-1, False), (3600, False)])
+def test_cookie_deadline(offset: float, sticky: bool):
+    sticky_clients = StickyClients(window=5, max_size=10)
+    assert sticky_clients.cookie_is_sticky(str(time.time() + offset)) is sticky
+
+
+@pytest.mark.parametrize('cookie', [None, '', 'nan', 'inf', 'soon'])
+def test_malformed_cookie_is_ignored(cookie: str | None):
+    assert not StickyClients(window=5, max_size=10).cookie_is_sticky(cookie)
@@ -0,0 +1,55 @@
+from collections.abc import Callable, Iterator
+
+import pytest
+
+from fastapi.testclient import TestClient
+
+from app.internal.cache import SessionCache
+from app.internal.database import database
+
+
+@pytest.fixture
+def session_cache(monkeypatch: pytest.MonkeyPatch) -> Iterator[SessionCache]:
+    """Turns the session cache on, conftest disables it for stable query counts."""
+    cache: SessionCache = database.sessions.cache
+    monkeypatch.setattr(cache, 'ttl', 60)
+
+    yield cache
+    cache.clear()
+
+
+def cached_login(
+    client: TestClient, session_cache: SessionCache,
+    make_user: Callable[[], tuple[str, dict[str, str]]]
+) -> tuple[str, dict[str, str]]:
+    username, headers = make_user()
+    assert client.get('/api/auth/test_auth', headers=headers).status_code == 200
+
+    token: str = headers['Authorization'].removeprefix('Bearer ')
+    assert session_cache.get(token)
+
+    return username, headers
+
+
+def test_revoked_token_is_rejected_immediately(
+    client: TestClient, session_cache: SessionCache,
+    make_user: Callable[[], tuple[str, dict[str, str]]]
+):
+    _, headers = cached_login(client, session_cache, make_user)
+    token: str = headers['Authorization'].removeprefix('Bearer ')
+
+    response = client.post('/api/auth/revoke', data={'token': token}, headers=headers)
+    assert response.status_code == 200, response.text
+
+    assert session_cache.get(token) is None
+    assert client.get('/api/auth/test_auth', headers=headers).status_code == 401
+
+
+def test_deleted_user_is_rejected_immediately(
+    client: TestClient, session_cache: SessionCache, run_db: Callable,
+    make_user: Callable[[], tuple[str, dict[str, str]]]
+):
+    username, headers = cached_login(client, session_cache, make_user)
+    assert run_db(lambda session: database.users.delete_user(session, username))
+
+    assert client.get('/api/auth/test_auth', headers=headers).status_code == 401
@@ -0,0 +1,62 @@
+from collections.abc import Callable
+
+from fastapi.testclient import TestClient
+
+
+def get_changes(client: TestClient, since: int) -> dict:
+    response = client.get('/api/sync/', params={'since': since})
+    assert response.status_code == 200, response.text
+
+    return response.json()
+
+
+def latest_revision(client: TestClient) -> int:
+    page: dict = get_changes(client, 0)
+    while page['has_more']:
+        page = get_changes(client, page['next_since'])
+
+    return page['next_since']
+
+
+def test_deleting_a_group_tombstones_groups_moved_into_it(
+    client: TestClient, make_group: Callable[..., str],
+    make_entries: Callable[[str, int], list[str]]
+):
+    group_b: str = make_group('B')
+    group_b_child: str = make_group('B child', group_b)
+    make_entries(group_b_child, 2)
+    group_c: str = make_group('C')
+
+    since: int = latest_revision(client)
+
+    response = client.post(f'/api/groups/{group_b}/move', json={'new_parent_id': group_c})
+    assert response.status_code == 200, response.text
+
+    response = client.delete(f'/api/groups/{group_c}/')
+    assert response.status_code == 200, response.text
+
+    page: dict = get_changes(client, since)
+    deleted: set[str] = {tombstone['object_id'] for tombstone in page['deleted']}
+
+    assert {group_c, group_b, group_b_child} <= deleted
+    assert len({change['revision'] for change in page['deleted']}) == len(page['deleted'])
+
+
+def test_paging_does_not_skip_subtree_tombstones(client: TestClient, make_group: Callable[..., str]):
+    top: str = make_group('paged top')
+    children: list[str] = [make_group(f'paged child {index}', top) for index in range(5)]
+
+    since: int = latest_revision(client)
+    assert client.delete(f'/api/groups/{top}/').status_code == 200
+
+    deleted: set[str] = set()
+    while True:
+        response = client.get('/api/sync/', params={'since': since, 'limit': 2})
+        page: dict = response.json()
+
+        deleted.update(tombstone['object_id'] for tombstone in page['deleted'])
+        since = page['next_since']
+        if not page['has_more']:
+            break
+
+    assert deleted == {top, *children}